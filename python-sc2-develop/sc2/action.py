@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from itertools import groupby
-from typing import TYPE_CHECKING, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Tuple, Union
 
 from s2clientprotocol import raw_pb2 as raw_pb
 
@@ -13,6 +12,32 @@ if TYPE_CHECKING:
     from sc2.unit_command import UnitCommand
 
 
+def group_actions(action_iter: Iterable[UnitCommand]) -> List[Tuple[tuple, List[UnitCommand]]]:
+    """
+    Groups unit commands by their combining tuple in a single pass.
+    A command joins the last group with the same key, unless its unit already has a command in a later group.
+    Then a new group is started, so that e.g. 'move, attack, move' of one unit is not sent as 'move, attack'.
+
+    :param action_iter:
+    """
+    groups: List[Tuple[tuple, List[UnitCommand]]] = []
+    # Combining tuple to the index of the last group with that key
+    group_index_of_key: Dict[tuple, int] = {}
+    # Unit tag to the index of the group of its last command
+    group_index_of_unit: Dict[int, int] = {}
+    for action in action_iter:
+        key = action.combining_tuple
+        tag = action.unit.tag
+        index = group_index_of_key.get(key)
+        if index is None or index < group_index_of_unit.get(tag, -1):
+            index = len(groups)
+            groups.append((key, []))
+            group_index_of_key[key] = index
+        groups[index][1].append(action)
+        group_index_of_unit[tag] = index
+    return groups
+
+
 # pylint: disable=R0912
 def combine_actions(action_iter):
     """
@@ -23,8 +48,11 @@ def combine_actions(action_iter):
         UnitCommand(AbilityId.TRAINQUEEN_QUEEN, Unit(name='Lair', tag=4359979012), None, False),
         UnitCommand(AbilityId.TRAINQUEEN_QUEEN, Unit(name='Hatchery', tag=4359454723), None, False),
     ]
+
+    Commands with the same ability, target and queue flag are combined into one action, even if other commands
+    were issued in between. The commands of each unit are still sent in the order they were issued.
     """
-    for key, items in groupby(action_iter, key=lambda a: a.combining_tuple):
+    for key, items in group_actions(action_iter):
         ability: AbilityId
         target: Union[None, Point2, Unit]
         queue: bool
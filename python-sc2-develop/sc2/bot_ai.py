@@ -6,9 +6,11 @@ import random
 import warnings
 from collections import Counter
 from functools import cached_property
-from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple, Union
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Set, Tuple, Union
 
+import numpy as np
 from loguru import logger
+from scipy import ndimage
 
 from sc2.bot_ai_internal import BotAIInternal
 from sc2.cache import property_cache_once_per_frame
@@ -16,10 +18,10 @@ from sc2.constants import (
     CREATION_ABILITY_FIX,
     EQUIVALENTS_FOR_TECH_PROGRESS,
     PROTOSS_TECH_REQUIREMENT,
-    TERRAN_STRUCTURES_REQUIRE_SCV,
     TERRAN_TECH_REQUIREMENT,
     ZERG_TECH_REQUIREMENT,
 )
+from sc2.cost_table import FIXED_UNIT_COSTS, Item
 from sc2.data import Alert, Race, Result, Target
 from sc2.dicts.unit_research_abilities import RESEARCH_INFO
 from sc2.dicts.unit_train_build_abilities import TRAIN_INFO
@@ -29,7 +31,8 @@ from sc2.game_data import AbilityData, Cost
 from sc2.ids.ability_id import AbilityId
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.upgrade_id import UpgradeId
-from sc2.position import Point2
+from sc2.position import Point2, Rect
+from sc2.saturation_manager import SaturationManager
 from sc2.unit import Unit
 from sc2.units import Units
 
@@ -272,103 +275,23 @@ class BotAI(BotAIInternal):
         ratio is bigger than `resource_ratio`, this function prefer filling gas_buildings
         first, if it is lower, it will prefer sending workers to minerals first.
 
+        Uses 'self.saturation_manager', which is created on the first call if it was not set.
+        It remembers which resource each worker mines, so only new, idle or misplaced workers receive commands,
+        see saturation_manager.py
+
         NOTE: This function is far from optimal, if you really want to have
         refined worker control, you should write your own distribution function.
-        For example long distance mining control and moving workers if a base was killed
-        are not being handled.
-
-        WARNING: This is quite slow when there are lots of workers or multiple bases.
+        For example long distance mining is not being handled, workers that mine away from
+        the ready townhalls are left alone.
 
         :param resource_ratio:"""
         if not self.mineral_field or not self.workers or not self.townhalls.ready:
             return
-        worker_pool = self.workers.idle
-        bases = self.townhalls.ready
-        gas_buildings = self.gas_buildings.ready
-
-        # list of places that need more workers
-        deficit_mining_places = []
-
-        for mining_place in bases | gas_buildings:
-            difference = mining_place.surplus_harvesters
-            # perfect amount of workers, skip mining place
-            if not difference:
-                continue
-            if mining_place.has_vespene:
-                # get all workers that target the gas extraction site
-                # or are on their way back from it
-                local_workers = self.workers.filter(
-                    lambda unit: unit.order_target == mining_place.tag or
-                    (unit.is_carrying_vespene and unit.order_target == bases.closest_to(mining_place).tag)
-                )
-            else:
-                # get tags of minerals around expansion
-                local_minerals_tags = {
-                    mineral.tag
-                    for mineral in self.mineral_field if mineral.distance_to(mining_place) <= 8
-                }
-                # get all target tags a worker can have
-                # tags of the minerals he could mine at that base
-                # get workers that work at that gather site
-                local_workers = self.workers.filter(
-                    lambda unit: unit.order_target in local_minerals_tags or
-                    (unit.is_carrying_minerals and unit.order_target == mining_place.tag)
-                )
-            # too many workers
-            if difference > 0:
-                for worker in local_workers[:difference]:
-                    worker_pool.append(worker)
-            # too few workers
-            # add mining place to deficit bases for every missing worker
-            else:
-                deficit_mining_places += [mining_place for _ in range(-difference)]
-
-        # prepare all minerals near a base if we have too many workers
-        # and need to send them to the closest patch
-        if len(worker_pool) > len(deficit_mining_places):
-            all_minerals_near_base = [
-                mineral for mineral in self.mineral_field
-                if any(mineral.distance_to(base) <= 8 for base in self.townhalls.ready)
-            ]
-        # distribute every worker in the pool
-        for worker in worker_pool:
-            # as long as have workers and mining places
-            if deficit_mining_places:
-                # choose only mineral fields first if current mineral to gas ratio is less than target ratio
-                if self.vespene and self.minerals / self.vespene < resource_ratio:
-                    possible_mining_places = [place for place in deficit_mining_places if not place.vespene_contents]
-                # else prefer gas
-                else:
-                    possible_mining_places = [place for place in deficit_mining_places if place.vespene_contents]
-                # if preferred type is not available any more, get all other places
-                if not possible_mining_places:
-                    possible_mining_places = deficit_mining_places
-                # find closest mining place
-                current_place = min(deficit_mining_places, key=lambda place: place.distance_to(worker))
-                # remove it from the list
-                deficit_mining_places.remove(current_place)
-                # if current place is a gas extraction site, go there
-                if current_place.vespene_contents:
-                    worker.gather(current_place)
-                # if current place is a gas extraction site,
-                # go to the mineral field that is near and has the most minerals left
-                else:
-                    local_minerals = (
-                        mineral for mineral in self.mineral_field if mineral.distance_to(current_place) <= 8
-                    )
-                    # local_minerals can be empty if townhall is misplaced
-                    target_mineral = max(local_minerals, key=lambda mineral: mineral.mineral_contents, default=None)
-                    if target_mineral:
-                        worker.gather(target_mineral)
-            # more workers to distribute than free mining spots
-            # send to closest if worker is doing nothing
-            elif worker.is_idle and all_minerals_near_base:
-                target_mineral = min(all_minerals_near_base, key=lambda mineral: mineral.distance_to(worker))
-                worker.gather(target_mineral)
-            else:
-                # there are no deficit mining places and worker is not idle
-                # so dont move him
-                pass
+        if self.saturation_manager is None:
+            # Declared in _initialize_variables
+            self.saturation_manager = SaturationManager(self)  # pylint: disable=W0201
+        prefer_minerals = self.vespene and self.minerals / self.vespene < resource_ratio
+        self.saturation_manager.update(prefer_gas=not prefer_minerals)
 
     @property_cache_once_per_frame
     def owned_expansions(self) -> Dict[Point2, Unit]:
@@ -398,6 +321,10 @@ class BotAI(BotAIInternal):
             baneling_supply_cost = self.calculate_supply_cost(UnitTypeId.BANELING) # Is 0
 
         :param unit_type:"""
+        if self.cost_table:
+            supply_cost = self.cost_table.supply_cost(unit_type)
+            if supply_cost is not None:
+                return supply_cost
         if unit_type in {UnitTypeId.ZERGLING}:
             return 1
         if unit_type in {UnitTypeId.BANELING}:
@@ -439,6 +366,10 @@ class BotAI(BotAIInternal):
 
         :param unit_type:
         """
+        if self.cost_table:
+            unit_value = self.cost_table.unit_value(unit_type)
+            if unit_value is not None:
+                return unit_value
         unit_data = self.game_data.units[unit_type.value]
         return Cost(unit_data._proto.mineral_cost, unit_data._proto.vespene_cost)
 
@@ -472,17 +403,17 @@ class BotAI(BotAIInternal):
 
         :param item_id:
         """
+        if self.cost_table:
+            # Precomputed at game start with the same corrections as below
+            cost = self.cost_table.cost(item_id)
+            if cost is not None:
+                return cost
         if isinstance(item_id, UnitTypeId):
             # Fix cost for reactor and techlab where the API returns 0 for both
-            if item_id in {UnitTypeId.REACTOR, UnitTypeId.TECHLAB, UnitTypeId.ARCHON, UnitTypeId.BANELING}:
-                if item_id == UnitTypeId.REACTOR:
-                    return Cost(50, 50)
-                if item_id == UnitTypeId.TECHLAB:
-                    return Cost(50, 25)
-                if item_id == UnitTypeId.BANELING:
-                    return Cost(25, 25)
-                if item_id == UnitTypeId.ARCHON:
-                    return self.calculate_unit_value(UnitTypeId.ARCHON)
+            if item_id in FIXED_UNIT_COSTS:
+                return Cost(*FIXED_UNIT_COSTS[item_id])
+            if item_id == UnitTypeId.ARCHON:
+                return self.calculate_unit_value(UnitTypeId.ARCHON)
             unit_data = self.game_data.units[item_id.value]
             # Cost of morphs is automatically correctly calculated by 'calculate_ability_cost'
             return self.game_data.calculate_ability_cost(unit_data.creation_ability.exact_id)
@@ -512,6 +443,12 @@ class BotAI(BotAIInternal):
 
         :param item_id:
         :param check_supply_cost:"""
+        entry = self.cost_table.entry(item_id) if self.cost_table else None
+        if entry is not None:
+            minerals, vespene, supply_cost, _time = entry
+            if minerals > self.minerals or vespene > self.vespene:
+                return False
+            return not (check_supply_cost and supply_cost and supply_cost > self.supply_left)
         cost = self.calculate_cost(item_id)
         if cost.minerals > self.minerals or cost.vespene > self.vespene:
             return False
@@ -521,6 +458,24 @@ class BotAI(BotAIInternal):
                 return False
         return True
 
+    def can_afford_many(self, item_ids: Iterable[Item], check_supply_cost: bool = True) -> np.ndarray:
+        """Like self.can_afford, but checks many unit types, upgrades and abilities at once.
+        Returns a boolean array in the order of 'item_ids'.
+
+        Example::
+
+            options = [UnitTypeId.MARINE, UnitTypeId.MARAUDER, UnitTypeId.REAPER, UpgradeId.STIMPACK]
+            affordable_options = [item for item, affordable in zip(options, self.can_afford_many(options)) if affordable]
+
+        :param item_ids:
+        :param check_supply_cost:"""
+        if not self.cost_table:
+            # Before _prepare_start built the table
+            return np.array([self.can_afford(item_id, check_supply_cost) for item_id in item_ids], dtype=bool)
+        return self.cost_table.can_afford(
+            item_ids, self.minerals, self.vespene, self.supply_left if check_supply_cost else None
+        )
+
     async def can_cast(
         self,
         unit: Unit,
@@ -717,7 +672,6 @@ class BotAI(BotAIInternal):
             return min(possible, key=lambda p: p.distance_to_point2(near))
         return None
 
-    # TODO: improve using cache per frame
     def already_pending_upgrade(self, upgrade_type: UpgradeId) -> float:
         """Check if an upgrade is being researched
 
@@ -737,11 +691,7 @@ class BotAI(BotAIInternal):
         if upgrade_type in self.state.upgrades:
             return 1
         creationAbilityID = self.game_data.upgrades[upgrade_type.value].research_ability.exact_id
-        for structure in self.structures.filter(lambda unit: unit.is_ready):
-            for order in structure.orders:
-                if order.ability.exact_id == creationAbilityID:
-                    return order.progress
-        return 0
+        return self._production_index.structure_order_progress.get(creationAbilityID, 0)
 
     def structure_type_build_progress(self, structure_type: Union[UnitTypeId, int]) -> float:
         """
@@ -783,19 +733,18 @@ class BotAI(BotAIInternal):
             s_type.value
             for s_type in EQUIVALENTS_FOR_TECH_PROGRESS.get(structure_type, set())
         }
+        production_index = self._production_index
+        structure_progress: float = max(
+            (production_index.structure_type_progress.get(value, 0) for value in equiv_values), default=0
+        )
         # SUPPLYDEPOTDROP is not in self.game_data.units, so bot_ai should not check the build progress via creation ability (worker abilities)
         if structure_type_value not in self.game_data.units:
-            return max((s.build_progress for s in self.structures if s._proto.unit_type in equiv_values), default=0)
+            return structure_progress
         creation_ability_data: AbilityData = self.game_data.units[structure_type_value].creation_ability
         if creation_ability_data is None:
             return 0
         creation_ability: AbilityId = creation_ability_data.exact_id
-        max_value = max(
-            [s.build_progress for s in self.structures if s._proto.unit_type in equiv_values] +
-            [self._abilities_count_and_build_progress[1].get(creation_ability, 0)],
-            default=0,
-        )
-        return max_value
+        return max(structure_progress, production_index.ability_max_progress.get(creation_ability, 0))
 
     def tech_requirement_progress(self, structure_type: UnitTypeId) -> float:
         """Returns the tech requirement progress for a specific building
@@ -875,20 +824,16 @@ class BotAI(BotAIInternal):
     def structures_without_construction_SCVs(self) -> Units:
         """Returns all structures that do not have an SCV constructing it.
         Warning: this function may move to become a Units filter."""
-        worker_targets: Set[Union[int, Point2]] = set()
-        for worker in self.workers:
-            # Ignore repairing workers
-            if not worker.is_constructing_scv:
-                continue
-            for order in worker.orders:
-                # When a construction is resumed, the worker.orders[0].target is the tag of the structure, else it is a Point2
-                worker_targets.add(order.target)
-        return self.structures.filter(
-            lambda structure: structure.build_progress < 1
-            # Redundant check?
-            and structure.type_id in TERRAN_STRUCTURES_REQUIRE_SCV and structure.position not in worker_targets and
-            structure.tag not in worker_targets and structure.tag in self._structures_previous_map and self.
-            _structures_previous_map[structure.tag].build_progress == structure.build_progress
+        production_index = self._production_index
+        worker_targets: Set[Union[int, Point2]] = production_index.construction_targets
+        return Units(
+            (
+                structure for structure in production_index.scv_structures
+                if structure.build_progress < 1 and structure.position not in worker_targets
+                and structure.tag not in worker_targets and structure.tag in self._structures_previous_map
+                and self._structures_previous_map[structure.tag].build_progress == structure.build_progress
+            ),
+            self,
         )
 
     async def build(
@@ -985,9 +930,12 @@ class BotAI(BotAIInternal):
             return 0
 
         trained_amount = 0
+        production_index = self._production_index
         # All train structure types: queen can made from hatchery, lair, hive
         train_structure_type: Set[UnitTypeId] = UNIT_TRAINED_FROM[unit_type]
-        train_structures = self.structures if self.race != Race.Zerg else self.structures | self.larva
+        train_structures = Units(production_index.structures_of_types(train_structure_type), self)
+        if self.race == Race.Zerg and UnitTypeId.LARVA in train_structure_type:
+            train_structures.extend(self.larva)
         requires_techlab = any(
             TRAIN_INFO[structure_type][unit_type].get("requires_techlab", False)
             for structure_type in train_structure_type
@@ -1004,8 +952,8 @@ class BotAI(BotAIInternal):
         elif can_have_addons:
             # This should sort the structures in ascending order: first structures with reactor, then naked, then with techlab
             train_structures = train_structures.sorted(
-                key=lambda structure: -1 * (structure.add_on_tag in self.reactor_tags) + 1 *
-                (structure.add_on_tag in self.techlab_tags)
+                key=lambda structure: -1 * (structure.tag in production_index.reactor_structure_tags) + 1 *
+                (structure.tag in production_index.techlab_structure_tags)
             )
 
         structure: Unit
@@ -1016,20 +964,15 @@ class BotAI(BotAIInternal):
             if (
                 # If structure hasn't received an action/order this frame
                 structure.tag not in self.unit_tags_received_action
-                # If structure can train this unit at all
-                and structure.type_id in train_structure_type
                 # Structure has to be completed to be able to train
                 and structure.build_progress == 1
                 # If structure is protoss, it needs to be powered to train
                 and (not is_protoss or structure.is_powered or structure.type_id == UnitTypeId.NEXUS)
                 # Either parameter "train_only_idle_buildings" is False or structure is idle or structure has less than 2 orders and has reactor
-                and (
-                    not train_only_idle_buildings
-                    or len(structure.orders) < 1 + int(structure.add_on_tag in self.reactor_tags)
-                )
+                and (not train_only_idle_buildings or production_index.build_slots(structure) > 0)
                 # If structure type_id does not accept addons, it cant require a techlab
                 # Else we have to check if building has techlab as addon
-                and (not requires_techlab or structure.add_on_tag in self.techlab_tags)
+                and (not requires_techlab or structure.tag in production_index.techlab_structure_tags)
             ):
                 # Warp in at location
                 # TODO: find fast warp in locations either random location or closest to the given parameter "closest_to"
@@ -1056,7 +999,7 @@ class BotAI(BotAIInternal):
                         # Unit type does not require techlab
                         and not requires_techlab
                         # Train structure has reactor
-                        and structure.add_on_tag in self.reactor_tags
+                        and structure.tag in production_index.reactor_structure_tags
                     ):
                         trained_amount += 1
                         # With one command queue=False and one queue=True, you can queue 2 marines in a reactored barracks in one frame
@@ -1227,6 +1170,82 @@ class BotAI(BotAIInternal):
         pos = pos.position.rounded
         return self.state.creep[pos] == 1
 
+    def _previous_map_data(self, name: str) -> np.ndarray:
+        """ Returns the data of 'visibility' or 'creep' of the previous step, or zeros in the first step. """
+        current: np.ndarray = getattr(self.state, name).data_numpy
+        if self._previous_state is None:
+            return np.zeros_like(current)
+        previous: np.ndarray = getattr(self._previous_state, name).data_numpy
+        if previous.shape != current.shape:
+            return np.zeros_like(current)
+        return previous
+
+    @property_cache_once_per_frame
+    def visibility_changed(self) -> np.ndarray:
+        """
+        Returns a boolean numpy array of shape (height, width), indexed by [y, x],
+        which is True for all grid points where the visibility changed since the previous step.
+        """
+        return self.state.visibility.data_numpy != self._previous_map_data("visibility")
+
+    @property_cache_once_per_frame
+    def newly_visible(self) -> np.ndarray:
+        """
+        Returns a boolean numpy array of shape (height, width), indexed by [y, x],
+        which is True for all grid points that are visible now but were not visible in the previous step.
+        """
+        return (self.state.visibility.data_numpy == 2) & (self._previous_map_data("visibility") != 2)
+
+    @property_cache_once_per_frame
+    def newly_visible_areas(self) -> List[Rect]:
+        """
+        Returns the bounding boxes of all connected areas that became visible since the previous step.
+
+        Example::
+
+            for area in self.newly_visible_areas:
+                logger.info(f"Scouted an area of size {area.size} at {area.center}")
+        """
+        labels, _count = ndimage.label(self.newly_visible, structure=np.ones((3, 3), dtype=bool))
+        return [
+            Rect((x_slice.start, y_slice.start, x_slice.stop - x_slice.start, y_slice.stop - y_slice.start))
+            for y_slice, x_slice in ndimage.find_objects(labels)
+        ]
+
+    @property_cache_once_per_frame
+    def creep_changed(self) -> np.ndarray:
+        """
+        Returns a boolean numpy array of shape (height, width), indexed by [y, x],
+        which is True for all grid points where creep appeared or receded since the previous step.
+        """
+        return self.state.creep.data_numpy != self._previous_map_data("creep")
+
+    @property_cache_once_per_frame
+    def creep_spread(self) -> np.ndarray:
+        """
+        Returns the grid points that have creep now but had no creep in the previous step
+        as integer numpy array of shape (n, 2) with columns x and y.
+        """
+        spread = (self.state.creep.data_numpy != 0) & (self._previous_map_data("creep") == 0)
+        return np.argwhere(spread)[:, ::-1]
+
+    @property_cache_once_per_frame
+    def creep_front(self) -> np.ndarray:
+        """
+        Returns the grid points with creep that border a pathable grid point without creep
+        as integer numpy array of shape (n, 2) with columns x and y.
+
+        Example::
+
+            if self.creep_front.size:
+                x, y = self.creep_front[len(self.creep_front) // 2]
+                tumor.build(UnitTypeId.CREEPTUMOR, Point2((x + 0.5, y + 0.5)))
+        """
+        creep = self.state.creep.data_numpy != 0
+        no_creep = ~creep & (self.game_info.pathing_grid.data_numpy != 0)
+        front = creep & ndimage.binary_dilation(no_creep)
+        return np.argwhere(front)[:, ::-1]
+
     async def on_unit_destroyed(self, unit_tag: int):
         """
         Override this in your bot class.
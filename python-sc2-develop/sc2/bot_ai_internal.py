@@ -1,16 +1,16 @@
 # pylint: disable=W0201,W0212,R0912
 from __future__ import annotations
 
+import asyncio
 import itertools
 import math
 import time
 import warnings
 from abc import ABC
 from collections import Counter
-from contextlib import suppress
 from typing import TYPE_CHECKING, Any
 from typing import Counter as CounterType
-from typing import Dict, Generator, Iterable, List, Set, Tuple, Union, final
+from typing import Dict, Generator, Iterable, List, Optional, Set, Tuple, Union, final
 
 import numpy as np
 from loguru import logger
@@ -19,14 +19,14 @@ from s2clientprotocol import sc2api_pb2 as sc_pb
 from sc2.cache import property_cache_once_per_frame
 from sc2.constants import (
     ALL_GAS,
-    CREATION_ABILITY_FIX,
+    COMBINEABLE_ABILITIES,
     IS_PLACEHOLDER,
-    TERRAN_STRUCTURES_REQUIRE_SCV,
     FakeEffectID,
     abilityid_to_unittypeid,
     geyser_ids,
     mineral_ids,
 )
+from sc2.cost_table import CostTable
 from sc2.data import ActionResult, Race, race_townhalls
 from sc2.game_data import Cost, GameData
 from sc2.game_state import Blip, EffectData, GameState
@@ -35,6 +35,8 @@ from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.upgrade_id import UpgradeId
 from sc2.pixel_map import PixelMap
 from sc2.position import Point2
+from sc2.production_index import ProductionIndex
+from sc2.scheduler import StepScheduler
 from sc2.unit import Unit
 from sc2.unit_command import UnitCommand
 from sc2.units import Units
@@ -46,6 +48,9 @@ with warnings.catch_warnings():
 if TYPE_CHECKING:
     from sc2.client import Client
     from sc2.game_info import GameInfo
+    from sc2.game_step_controller import GameStepController
+    from sc2.saturation_manager import SaturationManager
+    from sc2.step_timer import StepTimer
 
 
 class BotAIInternal(ABC):
@@ -67,6 +72,37 @@ class BotAIInternal(ABC):
         # Select if the Unit.command should return UnitCommand objects. Set this to True if your bot uses 'self.do(unit(ability, target))'
         if not hasattr(self, "unit_command_uses_self_do"):
             self.unit_command_uses_self_do: bool = False
+        # If True, the game info is requested every step to update the pathing grid
+        # Otherwise it is only requested when visible structures, rocks or resources changed since the last update,
+        # or after 'pathing_grid_refresh_loops' game loops, as structures built or destroyed in the fog of war are not seen
+        if not hasattr(self, "update_pathing_grid_every_step"):
+            self.update_pathing_grid_every_step: bool = False
+        if not hasattr(self, "pathing_grid_refresh_loops"):
+            self.pathing_grid_refresh_loops: int = 224
+        # If True, requests are sent without waiting for the previous response. Actions and debug draws are then
+        # sent together after each step, and independent requests can be overlapped with asyncio.gather
+        if not hasattr(self, "pipelined_requests"):
+            self.pipelined_requests: bool = False
+        # Tasks registered here are run after on_step within a time budget, see scheduler.py
+        if not hasattr(self, "scheduler"):
+            self.scheduler: StepScheduler = StepScheduler()
+        # Set this to a GameStepController to adapt client.game_step to fights and the duration of on_step
+        if not hasattr(self, "game_step_controller"):
+            self.game_step_controller: Optional[GameStepController] = None
+        # Keeps workers bound to mineral fields and gas buildings between steps, used by self.distribute_workers()
+        if not hasattr(self, "saturation_manager"):
+            self.saturation_manager: Optional[SaturationManager] = None
+        # Costs of all unit types, upgrades and abilities, built in self._prepare_start()
+        self.cost_table: Optional[CostTable] = None
+        # Number of times own units or structures took damage this step
+        self._damage_events: int = 0
+        # Set this to a StepTimer to measure how long each phase of a step takes, see step_timer.py
+        if not hasattr(self, "step_timer"):
+            self.step_timer: Optional[StepTimer] = None
+        self._pathing_signature: int = 0
+        self._pathing_grid_signature: Optional[int] = None
+        # Game loop of the last pathing grid update
+        self._pathing_grid_game_loop: int = 0
         # This value will be set to True by main.py in self._prepare_start if game is played in realtime (if true, the bot will have limited time per step)
         self.realtime: bool = False
         self.base_build: int = -1
@@ -112,6 +148,8 @@ class BotAIInternal(ABC):
         self._enemy_structures_previous_map: Dict[int, Unit] = {}
         self._all_units_previous_map: Dict[int, Unit] = {}
         self._previous_upgrades: Set[UpgradeId] = set()
+        # Game state of the previous step, used to calculate visibility and creep changes
+        self._previous_state: Optional[GameState] = None
         self._expansion_positions_list: List[Point2] = []
         self._resource_location_to_expansion_position_dict: Dict[Point2, Point2] = {}
         self._time_before_step: float = None
@@ -123,6 +161,8 @@ class BotAIInternal(ABC):
         self._total_steps_iterations: int = 0
         # Internally used to keep track which units received an action in this frame, so that self.train() function does not give the same larva two orders - cleared every frame
         self.unit_tags_received_action: Set[int] = set()
+        # Index of the last command of each unit in self.actions, to skip repeated commands in self.do()
+        self._last_action_index_of_unit: Dict[int, int] = {}
 
     @final
     @property
@@ -267,55 +307,23 @@ class BotAIInternal(ABC):
 
     @final
     @property_cache_once_per_frame
+    def _production_index(self) -> ProductionIndex:
+        """ Orders, build and research progress of all own units, collected once per frame. See production_index.py """
+        return ProductionIndex(self)
+
+    @final
+    @property
     def _abilities_count_and_build_progress(self) -> Tuple[CounterType[AbilityId], Dict[AbilityId, float]]:
         """Cache for the already_pending function, includes protoss units warping in,
         all units in production and all structures, and all morphs"""
-        abilities_amount: CounterType[AbilityId] = Counter()
-        max_build_progress: Dict[AbilityId, float] = {}
-        unit: Unit
-        for unit in self.units + self.structures:
-            for order in unit.orders:
-                abilities_amount[order.ability.exact_id] += 1
-            if not unit.is_ready:
-                if self.race != Race.Terran or not unit.is_structure:
-                    # If an SCV is constructing a building, already_pending would count this structure twice
-                    # (once from the SCV order, and once from "not structure.is_ready")
-                    if unit.type_id in CREATION_ABILITY_FIX:
-                        if unit.type_id == UnitTypeId.ARCHON:
-                            # Hotfix for archons in morph state
-                            creation_ability = AbilityId.ARCHON_WARP_TARGET
-                            abilities_amount[creation_ability] += 2
-                        else:
-                            # Hotfix for rich geysirs
-                            creation_ability = CREATION_ABILITY_FIX[unit.type_id]
-                            abilities_amount[creation_ability] += 1
-                    else:
-                        creation_ability: AbilityId = self.game_data.units[unit.type_id.value].creation_ability.exact_id
-                        abilities_amount[creation_ability] += 1
-                    max_build_progress[creation_ability] = max(
-                        max_build_progress.get(creation_ability, 0), unit.build_progress
-                    )
-
-        return abilities_amount, max_build_progress
+        production_index = self._production_index
+        return production_index.ability_count, production_index.ability_max_progress
 
     @final
-    @property_cache_once_per_frame
+    @property
     def _worker_orders(self) -> CounterType[AbilityId]:
         """ This function is used internally, do not use! It is to store all worker abilities. """
-        abilities_amount: CounterType[AbilityId] = Counter()
-        structures_in_production: Set[Union[Point2, int]] = set()
-        for structure in self.structures:
-            if structure.type_id in TERRAN_STRUCTURES_REQUIRE_SCV:
-                structures_in_production.add(structure.position)
-                structures_in_production.add(structure.tag)
-        for worker in self.workers:
-            for order in worker.orders:
-                # Skip if the SCV is constructing (not isinstance(order.target, int))
-                # or resuming construction (isinstance(order.target, int))
-                if order.target in structures_in_production:
-                    continue
-                abilities_amount[order.ability.exact_id] += 1
-        return abilities_amount
+        return self._production_index.worker_orders
 
     @final
     def do(
@@ -370,7 +378,9 @@ class BotAIInternal(ABC):
             action, UnitCommand
         ), f"Given unit command is not a command, but instead of type {type(action)}"
         if subtract_cost:
-            cost: Cost = self.game_data.calculate_ability_cost(action.ability)
+            cost: Optional[Cost] = self.cost_table.cost(action.ability) if self.cost_table else None
+            if cost is None:
+                cost = self.game_data.calculate_ability_cost(action.ability)
             if can_afford_check and not (self.minerals >= cost.minerals and self.vespene >= cost.vespene):
                 # Dont do action if can't afford
                 return False
@@ -383,8 +393,17 @@ class BotAIInternal(ABC):
             if required_supply > 0:
                 self.supply_used += required_supply
                 self.supply_left -= required_supply
+        tag = action.unit.tag
+        if not action.queue and action.ability in COMBINEABLE_ABILITIES:
+            index = self._last_action_index_of_unit.get(tag)
+            if index is not None and index < len(self.actions):
+                last_action = self.actions[index]
+                if last_action.unit.tag == tag and last_action.combining_tuple == action.combining_tuple:
+                    # The unit already received the same command this frame, it would be combined anyway
+                    return True
+        self._last_action_index_of_unit[tag] = len(self.actions)
         self.actions.append(action)
-        self.unit_tags_received_action.add(action.unit.tag)
+        self.unit_tags_received_action.add(tag)
         return True
 
     @final
@@ -439,14 +458,14 @@ class BotAIInternal(ABC):
             if action.ability not in {current_action.ability.id, current_action.ability.exact_id}:
                 # Different action, return True
                 return True
-            with suppress(AttributeError):
-                if current_action.target == action.target.tag:
-                    # Same action, remove action if same target unit
-                    return False
-            with suppress(AttributeError):
-                if action.target.x == current_action.target.x and action.target.y == current_action.target.y:
-                    # Same action, remove action if same target position
-                    return False
+            target = action.target
+            current_target = current_action.target
+            if isinstance(target, Unit):
+                # Same action, remove action if same target unit
+                return current_target != target.tag
+            if isinstance(target, Point2) and isinstance(current_target, Point2):
+                # Same action, remove action if same target position
+                return not (target.x == current_target.x and target.y == current_target.y)
             return True
         return True
 
@@ -462,9 +481,12 @@ class BotAIInternal(ABC):
         :param realtime:
         """
         self.client: Client = client
+        self.client.pipelined = self.pipelined_requests
+        self.client.step_timer = self.step_timer
         self.player_id: int = player_id
         self.game_info: GameInfo = game_info
         self.game_data: GameData = game_data
+        self.cost_table = CostTable(game_data)
         self.realtime: bool = realtime
         self.base_build: int = base_build
 
@@ -486,15 +508,16 @@ class BotAIInternal(ABC):
         self._time_before_step: float = time.perf_counter()
 
     @final
-    def _prepare_step(self, state, proto_game_info):
+    def _prepare_step(self, state, proto_game_info=None):
         """
         :param state:
-        :param proto_game_info:
+        :param proto_game_info: If given, the pathing grid is updated from it
         """
         # Set attributes from new state before on_step."""
+        t0 = time.perf_counter()
+        self._damage_events = 0
+        self._previous_state = getattr(self, "state", None)
         self.state: GameState = state  # See game_state.py
-        # update pathing grid, which unfortunately is in GameInfo instead of GameState
-        self.game_info.pathing_grid = PixelMap(proto_game_info.game_info.start_raw.pathing_grid, in_bits=True)
         # Required for events, needs to be before self.units are initialized so the old units are stored
         self._units_previous_map: Dict[int, Unit] = {unit.tag: unit for unit in self.units}
         self._structures_previous_map: Dict[int, Unit] = {structure.tag: structure for structure in self.structures}
@@ -505,7 +528,20 @@ class BotAIInternal(ABC):
         }
         self._all_units_previous_map: Dict[int, Unit] = {unit.tag: unit for unit in self.all_units}
 
+        t1 = time.perf_counter()
         self._prepare_units()
+        if self.step_timer is not None:
+            self.step_timer.add("prepare_units", time.perf_counter() - t1)
+        # Structures and neutral units are the only units that change the pathing grid,
+        # but only the visible ones and the snapshots of enemy structures are part of the signature
+        self._pathing_signature = hash(
+            frozenset(
+                (unit.tag, unit._proto.unit_type) for unit in self.all_units
+                if unit._proto.alliance == 3 or unit.is_structure
+            )
+        )
+        if proto_game_info is not None:
+            self._update_pathing_grid(proto_game_info)
         self.minerals: int = state.common.minerals
         self.vespene: int = state.common.vespene
         self.supply_army: int = state.common.food_army
@@ -526,6 +562,29 @@ class BotAIInternal(ABC):
 
         if self.enemy_race == Race.Random and self.all_enemy_units:
             self.enemy_race = Race(self.all_enemy_units.first.race)
+        if self.step_timer is not None:
+            self.step_timer.add("prepare_step", time.perf_counter() - t0)
+
+    @final
+    def _update_pathing_grid(self, proto_game_info):
+        """
+        :param proto_game_info:
+        """
+        # The pathing grid unfortunately is in GameInfo instead of GameState
+        self.game_info.pathing_grid = PixelMap(proto_game_info.game_info.start_raw.pathing_grid, in_bits=True)
+        self._pathing_grid_signature = self._pathing_signature
+        self._pathing_grid_game_loop = self.state.game_loop
+
+    @final
+    async def _request_pathing_grid(self):
+        """ Requests the game info to update the pathing grid, if it may have changed since the last update.
+        Must be called after _prepare_step. """
+        if (
+            self.update_pathing_grid_every_step or self._pathing_grid_signature != self._pathing_signature
+            or self.state.game_loop - self._pathing_grid_game_loop >= self.pathing_grid_refresh_loops
+        ):
+            proto_game_info = await self.client._execute(game_info=sc_pb.RequestGameInfo())
+            self._update_pathing_grid(proto_game_info)
 
     @final
     def _prepare_units(self):
@@ -631,6 +690,30 @@ class BotAIInternal(ABC):
         elif self.distance_calculation_method in {2, 3}:
             _ = self._cdist
 
+    @final
+    async def _run_scheduler(self):
+        """ Runs the due tasks of the scheduler. Executed by main.py after each on_step function. """
+        if not self.scheduler:
+            return
+        t0 = time.perf_counter()
+        await self.scheduler.run(self.state.game_loop, self._time_before_step)
+        if self.step_timer is not None:
+            self.step_timer.add("scheduler", time.perf_counter() - t0)
+
+    @final
+    def _update_game_step(self):
+        """ Lets the game step controller choose the game step of the next step. Executed by main.py after each step. """
+        if self.game_step_controller is None:
+            return
+        self.client.game_step = self.game_step_controller.update(
+            self.state.game_loop,
+            self.client.game_step,
+            len(self.enemy_units),
+            self._damage_events,
+            self._last_step_step_time,
+            self.realtime,
+        )
+
     @final
     async def _after_step(self) -> int:
         """ Executed by main.py after each on_step function. """
@@ -642,14 +725,20 @@ class BotAIInternal(ABC):
         self._last_step_step_time = step_duration
         self._total_time_in_on_step += step_duration
         self._total_steps_iterations += 1
-        # Commit and clear bot actions
-        if self.actions:
-            await self._do_actions(self.actions)
-            self.actions.clear()
+        # Commit bot actions and debug queries
+        if self.client.pipelined:
+            # Both requests are sent before waiting for the first response
+            await asyncio.gather(self._do_actions(self.actions), self.client._send_debug(self.state.game_loop))
+        else:
+            if self.actions:
+                await self._do_actions(self.actions)
+            await self.client._send_debug(self.state.game_loop)
+        self.actions.clear()
+        self._last_action_index_of_unit.clear()
         # Clear set of unit tags that were given an order this frame by self.do()
         self.unit_tags_received_action.clear()
-        # Commit debug queries
-        await self.client._send_debug()
+        if self.step_timer is not None:
+            self.step_timer.add("after_step", time.perf_counter() - self._time_after_step)
 
         return self.state.game_loop
 
@@ -662,8 +751,8 @@ class BotAIInternal(ABC):
         await self.client.step(steps)
         state = await self.client.observation()
         gs = GameState(state.observation)
-        proto_game_info = await self.client._execute(game_info=sc_pb.RequestGameInfo())
-        self._prepare_step(gs, proto_game_info)
+        self._prepare_step(gs)
+        await self._request_pathing_grid()
         await self.issue_events()
 
     @final
@@ -675,11 +764,14 @@ class BotAIInternal(ABC):
         - on_building_construction_complete
         - on_upgrade_complete
         """
+        t0 = time.perf_counter()
         await self._issue_unit_dead_events()
         await self._issue_unit_added_events()
         await self._issue_building_events()
         await self._issue_upgrade_events()
         await self._issue_vision_events()
+        if self.step_timer is not None:
+            self.step_timer.add("issue_events", time.perf_counter() - t0)
 
     @final
     async def _issue_unit_added_events(self):
@@ -693,6 +785,7 @@ class BotAIInternal(ABC):
                 # Check if a unit took damage this frame and then trigger event
                 if unit.health < previous_frame_unit.health or unit.shield < previous_frame_unit.shield:
                     damage_amount = previous_frame_unit.health - unit.health + previous_frame_unit.shield - unit.shield
+                    self._damage_events += 1
                     await self.on_unit_took_damage(unit, damage_amount)
                 # Check if a unit type has changed
                 if previous_frame_unit.type_id != unit.type_id:
@@ -726,6 +819,7 @@ class BotAIInternal(ABC):
                         previous_frame_structure.health - structure.health + previous_frame_structure.shield -
                         structure.shield
                     )
+                    self._damage_events += 1
                     await self.on_unit_took_damage(structure, damage_amount)
                 # Check if a structure changed its type
                 if previous_frame_structure.type_id != structure.type_id:
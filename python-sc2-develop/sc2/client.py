@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+import time
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, Tuple, Union
 
 from loguru import logger
 from s2clientprotocol import debug_pb2 as debug_pb
@@ -36,8 +37,16 @@ class Client(Protocol):
         self._player_id = None
         self._game_result = None
         # Store a hash value of all the debug requests to prevent sending the same ones again if they haven't changed last frame
-        self._debug_hash_tuple_last_iteration: Tuple[int, int, int, int] = (0, 0, 0, 0)
+        self._debug_hash_tuple_last_iteration: Optional[Tuple[int, int]] = None
+        # Summed hashes of the debug items of this frame, updated when an item is added
+        self._debug_hash: int = 0
         self._debug_draw_last_frame = False
+        # Game loop at which the debug drawings were sent the last time
+        self._debug_draw_game_loop: Optional[int] = None
+        # Send the debug drawings at most every 'debug_draw_interval' game loops
+        self.debug_draw_interval: int = 1
+        # Debug drawings that stay until they are removed, see DebugDrawLayer
+        self.debug_layer: DebugDrawLayer = DebugDrawLayer()
         self._debug_texts = []
         self._debug_lines = []
         self._debug_boxes = []
@@ -151,7 +160,8 @@ class Client(Protocol):
         return result
 
     async def step(self, step_size: int = None):
-        """ EXPERIMENTAL: Change self._client.game_step during the step function to increase or decrease steps per second """
+        """ EXPERIMENTAL: Change self._client.game_step during the step function to increase or decrease steps per second
+        To change it automatically based on fights and the duration of on_step, see game_step_controller.py """
         step_size = step_size or self.game_step
         return await self._execute(step=sc_pb.RequestStep(count=step_size))
 
@@ -191,11 +201,13 @@ class Client(Protocol):
         if not isinstance(actions, list):
             actions = [actions]
 
+        t0 = time.perf_counter()
+        request = sc_pb.RequestAction(actions=(sc_pb.Action(action_raw=a) for a in combine_actions(actions)))
+        if self.step_timer is not None:
+            self.step_timer.add("combine_actions", time.perf_counter() - t0)
         # On realtime=True, might get an error here: sc2.protocol.ProtocolError: ['Not in a game']
         try:
-            res = await self._execute(
-                action=sc_pb.RequestAction(actions=(sc_pb.Action(action_raw=a) for a in combine_actions(actions)))
-            )
+            res = await self._execute(action=request)
         except ProtocolError:
             return []
         if return_successes:
@@ -449,9 +461,14 @@ class Client(Protocol):
         )
         await self._execute(action=sc_pb.RequestAction(actions=[action]))
 
+    def _add_debug_item(self, items: List[DrawItem], item: DrawItem):
+        items.append(item)
+        self._debug_hash += hash(item)
+
     def debug_text_simple(self, text: str):
         """ Draws a text in the top left corner of the screen (up to a max of 6 messages fit there). """
-        self._debug_texts.append(DrawItemScreenText(text=text, color=None, start_point=Point2((0, 0)), font_size=8))
+        item = DrawItemScreenText(text=text, color=None, start_point=Point2((0, 0)), font_size=8)
+        self._add_debug_item(self._debug_texts, item)
 
     def debug_text_screen(
         self,
@@ -472,7 +489,8 @@ class Client(Protocol):
         assert 0 <= pos[0] <= 1
         assert 0 <= pos[1] <= 1
         pos = Point2((pos[0], pos[1]))
-        self._debug_texts.append(DrawItemScreenText(text=text, color=color, start_point=pos, font_size=size))
+        item = DrawItemScreenText(text=text, color=color, start_point=pos, font_size=size)
+        self._add_debug_item(self._debug_texts, item)
 
     def debug_text_2d(
         self,
@@ -498,7 +516,8 @@ class Client(Protocol):
         if isinstance(pos, Unit):
             pos = pos.position3d
         assert isinstance(pos, Point3)
-        self._debug_texts.append(DrawItemWorldText(text=text, color=color, start_point=pos, font_size=size))
+        item = DrawItemWorldText(text=text, color=color, start_point=pos, font_size=size)
+        self._add_debug_item(self._debug_texts, item)
 
     def debug_text_3d(
         self, text: str, pos: Union[Unit, Point3], color: Union[tuple, list, Point3] = None, size: int = 8
@@ -521,7 +540,7 @@ class Client(Protocol):
         if isinstance(p1, Unit):
             p1 = p1.position3d
         assert isinstance(p1, Point3)
-        self._debug_lines.append(DrawItemLine(color=color, start_point=p0, end_point=p1))
+        self._add_debug_item(self._debug_lines, DrawItemLine(color=color, start_point=p0, end_point=p1))
 
     def debug_box_out(
         self,
@@ -542,7 +561,7 @@ class Client(Protocol):
         if isinstance(p_max, Unit):
             p_max = p_max.position3d
         assert isinstance(p_max, Point3)
-        self._debug_boxes.append(DrawItemBox(start_point=p_min, end_point=p_max, color=color))
+        self._add_debug_item(self._debug_boxes, DrawItemBox(start_point=p_min, end_point=p_max, color=color))
 
     def debug_box2_out(
         self,
@@ -562,7 +581,7 @@ class Client(Protocol):
         assert isinstance(pos, Point3)
         p0 = pos + Point3((-half_vertex_length, -half_vertex_length, -half_vertex_length))
         p1 = pos + Point3((half_vertex_length, half_vertex_length, half_vertex_length))
-        self._debug_boxes.append(DrawItemBox(start_point=p0, end_point=p1, color=color))
+        self._add_debug_item(self._debug_boxes, DrawItemBox(start_point=p0, end_point=p1, color=color))
 
     def debug_sphere_out(self, p: Union[Unit, Point3], r: float, color: Union[tuple, list, Point3] = None):
         """
@@ -575,51 +594,47 @@ class Client(Protocol):
         if isinstance(p, Unit):
             p = p.position3d
         assert isinstance(p, Point3)
-        self._debug_spheres.append(DrawItemSphere(start_point=p, radius=r, color=color))
+        self._add_debug_item(self._debug_spheres, DrawItemSphere(start_point=p, radius=r, color=color))
 
-    async def _send_debug(self):
+    async def _send_debug(self, game_loop: Optional[int] = None):
         """Sends the debug draw execution. This is run by main.py now automatically, if there is any items in the list. You do not need to run this manually any longer.
         Check examples/terran/ramp_wall.py for example drawing. Each draw request needs to be sent again in every single on_step iteration.
+        Drawings in 'self.debug_layer' stay until they are removed.
+        If 'game_loop' is given, changed drawings are sent at most every 'self.debug_draw_interval' game loops.
+
+        :param game_loop:
         """
-        debug_hash = (
-            sum(hash(item) for item in self._debug_texts),
-            sum(hash(item) for item in self._debug_lines),
-            sum(hash(item) for item in self._debug_boxes),
-            sum(hash(item) for item in self._debug_spheres),
-        )
-        if debug_hash != (0, 0, 0, 0):
+        if (
+            game_loop is not None and self._debug_draw_game_loop is not None
+            and 0 <= game_loop - self._debug_draw_game_loop < self.debug_draw_interval
+        ):
+            # Throttled, the drawings of the last request stay visible
+            self._clear_debug_items()
+            return
+        layer = self.debug_layer
+        if self._debug_texts or self._debug_lines or self._debug_boxes or self._debug_spheres or layer:
+            debug_hash = (self._debug_hash, layer.hash)
             if debug_hash != self._debug_hash_tuple_last_iteration:
                 # Something has changed, either more or less is to be drawn, or a position of a drawing changed (e.g. when drawing on a moving unit)
                 self._debug_hash_tuple_last_iteration = debug_hash
+                self._debug_draw_game_loop = game_loop
+                draw = debug_pb.DebugDraw(
+                    text=[text.to_proto() for text in self._debug_texts],
+                    lines=[line.to_proto() for line in self._debug_lines],
+                    boxes=[box.to_proto() for box in self._debug_boxes],
+                    spheres=[sphere.to_proto() for sphere in self._debug_spheres],
+                )
+                layer.add_to_draw(draw)
                 try:
-                    await self._execute(
-                        debug=sc_pb.RequestDebug(
-                            debug=[
-                                debug_pb.DebugCommand(
-                                    draw=debug_pb.DebugDraw(
-                                        text=[text.to_proto()
-                                              for text in self._debug_texts] if self._debug_texts else None,
-                                        lines=[line.to_proto()
-                                               for line in self._debug_lines] if self._debug_lines else None,
-                                        boxes=[box.to_proto()
-                                               for box in self._debug_boxes] if self._debug_boxes else None,
-                                        spheres=[sphere.to_proto()
-                                                 for sphere in self._debug_spheres] if self._debug_spheres else None,
-                                    )
-                                )
-                            ]
-                        )
-                    )
+                    await self._execute(debug=sc_pb.RequestDebug(debug=[debug_pb.DebugCommand(draw=draw)]))
                 except ProtocolError:
                     return
             self._debug_draw_last_frame = True
-            self._debug_texts.clear()
-            self._debug_lines.clear()
-            self._debug_boxes.clear()
-            self._debug_spheres.clear()
+            self._clear_debug_items()
         elif self._debug_draw_last_frame:
             # Clear drawing if we drew last frame but nothing to draw this frame
-            self._debug_hash_tuple_last_iteration = (0, 0, 0, 0)
+            self._debug_hash_tuple_last_iteration = None
+            self._debug_draw_game_loop = game_loop
             await self._execute(
                 debug=sc_pb.RequestDebug(
                     debug=[
@@ -629,6 +644,13 @@ class Client(Protocol):
             )
             self._debug_draw_last_frame = False
 
+    def _clear_debug_items(self):
+        self._debug_texts.clear()
+        self._debug_lines.clear()
+        self._debug_boxes.clear()
+        self._debug_spheres.clear()
+        self._debug_hash = 0
+
     async def debug_leave(self):
         await self._execute(debug=sc_pb.RequestDebug(debug=[debug_pb.DebugCommand(end_game=debug_pb.DebugEndGame())]))
 
@@ -733,6 +755,8 @@ class Client(Protocol):
 
 
 class DrawItem:
+    # Name of the repeated field of debug_pb.DebugDraw that the item belongs to
+    draw_field: str = ""
 
     @staticmethod
     def to_debug_color(color: Union[tuple, Point3]):
@@ -755,6 +779,7 @@ class DrawItem:
 
 
 class DrawItemScreenText(DrawItem):
+    draw_field = "text"
 
     def __init__(self, start_point: Point2 = None, color: Point3 = None, text: str = "", font_size: int = 8):
         self._start_point: Point2 = start_point
@@ -776,6 +801,7 @@ class DrawItemScreenText(DrawItem):
 
 
 class DrawItemWorldText(DrawItem):
+    draw_field = "text"
 
     def __init__(self, start_point: Point3 = None, color: Point3 = None, text: str = "", font_size: int = 8):
         self._start_point: Point3 = start_point
@@ -797,6 +823,7 @@ class DrawItemWorldText(DrawItem):
 
 
 class DrawItemLine(DrawItem):
+    draw_field = "lines"
 
     def __init__(self, start_point: Point3 = None, end_point: Point3 = None, color: Point3 = None):
         self._start_point: Point3 = start_point
@@ -814,6 +841,7 @@ class DrawItemLine(DrawItem):
 
 
 class DrawItemBox(DrawItem):
+    draw_field = "boxes"
 
     def __init__(self, start_point: Point3 = None, end_point: Point3 = None, color: Point3 = None):
         self._start_point: Point3 = start_point
@@ -832,6 +860,7 @@ class DrawItemBox(DrawItem):
 
 
 class DrawItemSphere(DrawItem):
+    draw_field = "spheres"
 
     def __init__(self, start_point: Point3 = None, radius: float = None, color: Point3 = None):
         self._start_point: Point3 = start_point
@@ -845,3 +874,103 @@ class DrawItemSphere(DrawItem):
 
     def __hash__(self):
         return hash((self._start_point, self._radius, self._color))
+
+
+class DebugDrawLayer:
+
+    def __init__(self):
+        """
+        Debug drawings that are sent every frame until they are removed, addressed by a handle.
+        The proto of each item is built once when it is added or changed, and the hash of the layer is updated
+        incrementally, so that a layer with many items that rarely change is cheap to send every frame.
+        The layer of the client is sent together with the drawings of the frame by 'client._send_debug'.
+
+        Example::
+
+            async def on_step(self, iteration: int):
+                layer = self.client.debug_layer
+                for unit in self.units:
+                    # The unit tag is the handle, the proto is only rebuilt if the label changed
+                    layer.add(DrawItemWorldText(unit.position3d, text=f"{unit.health:.0f}"), handle=unit.tag)
+
+            async def on_unit_destroyed(self, unit_tag: int):
+                self.client.debug_layer.remove(unit_tag)
+        """
+        # Handle to the item and the hash of the item
+        self._items: Dict[Hashable, Tuple[DrawItem, int]] = {}
+        # Draw field to the protos of the items, by handle
+        self._protos: Dict[str, Dict[Hashable, Any]] = {"text": {}, "lines": {}, "boxes": {}, "spheres": {}}
+        self._next_handle: int = 0
+        self.hash: int = 0
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, handle: Hashable) -> bool:
+        return handle in self._items
+
+    def add(self, item: DrawItem, handle: Optional[Hashable] = None) -> Hashable:
+        """
+        Adds an item and returns its handle. If an item with the given handle exists, it is replaced.
+
+        :param item:
+        :param handle: Any hashable value, e.g. a unit tag. A new handle is created if None
+        """
+        if handle is None:
+            # Negative, so that it does not collide with unit tags
+            self._next_handle -= 1
+            handle = self._next_handle
+        item_hash = hash(item)
+        existing = self._items.get(handle)
+        if existing is not None:
+            if existing[1] == item_hash:
+                return handle
+            self._remove(handle, existing)
+        self._items[handle] = (item, item_hash)
+        self._protos[item.draw_field][handle] = item.to_proto()
+        self.hash += item_hash
+        return handle
+
+    def update(self, handle: Hashable, item: DrawItem):
+        """
+        Replaces the item of an existing handle.
+
+        :param handle:
+        :param item:
+        """
+        if handle not in self._items:
+            raise KeyError(f"Unknown debug draw handle {handle}")
+        self.add(item, handle)
+
+    def remove(self, handle: Hashable):
+        """
+        Removes an item if it exists.
+
+        :param handle:
+        """
+        existing = self._items.get(handle)
+        if existing is not None:
+            self._remove(handle, existing)
+
+    def _remove(self, handle: Hashable, existing: Tuple[DrawItem, int]):
+        item, item_hash = existing
+        del self._items[handle]
+        del self._protos[item.draw_field][handle]
+        self.hash -= item_hash
+
+    def clear(self):
+        """ Removes all items. """
+        self._items.clear()
+        for protos in self._protos.values():
+            protos.clear()
+        self.hash = 0
+
+    def add_to_draw(self, draw: debug_pb.DebugDraw):
+        """
+        Adds the cached protos of all items to a draw request.
+
+        :param draw:
+        """
+        for field, protos in self._protos.items():
+            if protos:
+                getattr(draw, field).extend(protos.values())
@@ -309,7 +309,9 @@ UNIT_COLOSSUS: UnitTypeId = UnitTypeId.COLOSSUS
 # Used in unit_command.py and action.py to combine only certain abilities
 COMBINEABLE_ABILITIES: Set[AbilityId] = {
     AbilityId.MOVE,
+    AbilityId.MOVE_MOVE,
     AbilityId.ATTACK,
+    AbilityId.ATTACK_ATTACK,
     AbilityId.SCAN_MOVE,
     AbilityId.STOP,
     AbilityId.HOLDPOSITION,
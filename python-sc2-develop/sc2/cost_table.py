@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from sc2.dicts.unit_trained_from import UNIT_TRAINED_FROM
+from sc2.game_data import AbilityData, Cost, GameData
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.ids.upgrade_id import UpgradeId
+
+Item = Union[UnitTypeId, UpgradeId, AbilityId]
+
+# The API reports 0 for reactor and techlab and the cost of a zergling pair plus the morph for banelings
+FIXED_UNIT_COSTS: Dict[UnitTypeId, Tuple[int, int]] = {
+    UnitTypeId.REACTOR: (50, 50),
+    UnitTypeId.TECHLAB: (50, 25),
+    UnitTypeId.BANELING: (25, 25),
+}
+
+
+def _ability_costs(game_data: GameData) -> Dict[int, Cost]:
+    """
+    Returns the cost of every ability that creates a unit or researches an upgrade, by exact ability id.
+    Same results as 'GameData.calculate_ability_cost', but with one pass over all units and upgrades
+    instead of one pass per ability.
+
+    :param game_data:
+    """
+    costs: Dict[int, Cost] = {}
+    for unit in game_data.units.values():
+        creation_ability: Optional[AbilityData] = unit.creation_ability
+        if creation_ability is None or not AbilityData.id_exists(creation_ability.id.value):
+            continue
+        if creation_ability.is_free_morph:
+            continue
+        ability_id: int = creation_ability.exact_id.value
+        if ability_id in costs:
+            # The first unit created by the ability wins, like in calculate_ability_cost
+            continue
+        if unit.id == UnitTypeId.ZERGLING:
+            # HARD CODED: zerglings are generated in pairs
+            costs[ability_id] = Cost(unit.cost.minerals * 2, unit.cost.vespene * 2, unit.cost.time)
+        elif unit.id == UnitTypeId.BANELING:
+            costs[ability_id] = Cost(25, 25, unit.cost.time)
+        else:
+            # Correction for morphing units and zerg structures, see UnitTypeData
+            costs[ability_id] = unit.morph_cost or unit.cost_zerg_corrected
+    for upgrade in game_data.upgrades.values():
+        research_ability: Optional[AbilityData] = upgrade.research_ability
+        if research_ability is not None:
+            costs.setdefault(research_ability.exact_id.value, upgrade.cost)
+    return costs
+
+
+def _supply_cost(game_data: GameData, unit_type: UnitTypeId) -> float:
+    """ See BotAI.calculate_supply_cost """
+    if unit_type == UnitTypeId.ZERGLING:
+        return 1
+    if unit_type == UnitTypeId.BANELING:
+        return 0
+    unit_supply_cost = game_data.units[unit_type.value].food_required
+    if unit_supply_cost > 0 and unit_type in UNIT_TRAINED_FROM and len(UNIT_TRAINED_FROM[unit_type]) == 1:
+        for producer in UNIT_TRAINED_FROM[unit_type]:
+            producer_supply_cost = game_data.units[producer.value].food_required
+            if producer_supply_cost <= unit_supply_cost:
+                unit_supply_cost -= producer_supply_cost
+    return unit_supply_cost
+
+
+class CostTable:
+
+    def __init__(self, game_data: GameData):
+        """
+        Build, train, morph and research costs of all unit types, upgrades and abilities of the game data, computed once.
+        Used by BotAI.calculate_cost, calculate_supply_cost, calculate_unit_value and can_afford,
+        which otherwise search the game data on every call. The table is built in _prepare_start and never changes.
+
+        The columns are also available as read only numpy arrays, so that many items can be checked at once.
+
+        Example::
+
+            items = [UnitTypeId.MARINE, UnitTypeId.MARAUDER, UpgradeId.STIMPACK, UnitTypeId.FACTORY]
+            affordable = self.cost_table.can_afford(items, self.minerals, self.vespene, self.supply_left)
+            # e.g. array([ True,  True, False, False])
+
+        :param game_data:
+        """
+        ability_costs = _ability_costs(game_data)
+        zero_cost = Cost(0, 0)
+        # (minerals, vespene, supply, build time in game loops) of each item
+        entries: List[Tuple[int, int, float, float]] = []
+        # Index of each item in 'entries' and the columns
+        self._rows: Dict[Item, int] = {}
+        # Unit type to the value of the unit given by the API
+        self._unit_values: Dict[UnitTypeId, Tuple[int, int]] = {}
+
+        for unit_value, unit in game_data.units.items():
+            try:
+                unit_type = UnitTypeId(unit_value)
+            except ValueError:
+                continue
+            unit_cost = unit.cost
+            self._unit_values[unit_type] = (unit_cost.minerals, unit_cost.vespene)
+            if unit_type in FIXED_UNIT_COSTS:
+                minerals, vespene = FIXED_UNIT_COSTS[unit_type]
+                time = unit_cost.time
+            elif unit_type == UnitTypeId.ARCHON:
+                minerals, vespene = self._unit_values[unit_type]
+                time = unit_cost.time
+            elif unit.creation_ability is None:
+                continue
+            else:
+                cost = ability_costs.get(unit.creation_ability.exact_id.value, zero_cost)
+                minerals, vespene, time = cost.minerals, cost.vespene, cost.time
+            self._rows[unit_type] = len(entries)
+            entries.append((minerals, vespene, _supply_cost(game_data, unit_type), time or 0))
+
+        for upgrade_value, upgrade in game_data.upgrades.items():
+            try:
+                upgrade_type = UpgradeId(upgrade_value)
+            except ValueError:
+                continue
+            cost = upgrade.cost
+            self._rows[upgrade_type] = len(entries)
+            entries.append((cost.minerals, cost.vespene, 0, cost.time or 0))
+
+        for ability_value in game_data.abilities:
+            cost = ability_costs.get(ability_value, zero_cost)
+            self._rows[AbilityId(ability_value)] = len(entries)
+            entries.append((cost.minerals, cost.vespene, 0, cost.time or 0))
+
+        self._entries: List[Tuple[int, int, float, float]] = entries
+        columns = np.array(entries, dtype=np.float64).reshape(-1, 4)
+        columns.setflags(write=False)
+        self.minerals: np.ndarray = columns[:, 0]
+        self.vespene: np.ndarray = columns[:, 1]
+        self.supply: np.ndarray = columns[:, 2]
+        self.time: np.ndarray = columns[:, 3]
+
+    def __contains__(self, item_id: Item) -> bool:
+        return item_id in self._rows
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def entry(self, item_id: Item) -> Optional[Tuple[int, int, float, float]]:
+        """
+        Returns (minerals, vespene, supply, build time) of the item, or None if the item is not in the table.
+
+        :param item_id:
+        """
+        row = self._rows.get(item_id)
+        if row is None:
+            return None
+        return self._entries[row]
+
+    def cost(self, item_id: Item) -> Optional[Cost]:
+        """
+        Returns the cost like BotAI.calculate_cost, or None if the item is not in the table.
+
+        :param item_id:
+        """
+        row = self._rows.get(item_id)
+        if row is None:
+            return None
+        minerals, vespene, _supply, time = self._entries[row]
+        return Cost(minerals, vespene, time)
+
+    def supply_cost(self, unit_type: UnitTypeId) -> Optional[float]:
+        """
+        Returns the supply cost like BotAI.calculate_supply_cost, or None if the unit type is not in the table.
+
+        :param unit_type:
+        """
+        row = self._rows.get(unit_type)
+        if row is None:
+            return None
+        return self._entries[row][2]
+
+    def unit_value(self, unit_type: UnitTypeId) -> Optional[Cost]:
+        """
+        Returns the value of a unit given by the API like BotAI.calculate_unit_value, or None if it is unknown.
+
+        :param unit_type:
+        """
+        value = self._unit_values.get(unit_type)
+        if value is None:
+            return None
+        return Cost(*value)
+
+    def rows(self, item_ids: Iterable[Item]) -> np.ndarray:
+        """
+        Returns the indices of the items in the columns. Raises KeyError for items that are not in the table.
+
+        :param item_ids:
+        """
+        return np.fromiter((self._rows[item_id] for item_id in item_ids), dtype=np.int64)
+
+    def can_afford(
+        self,
+        item_ids: Iterable[Item],
+        minerals: float,
+        vespene: float,
+        supply_left: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Returns a boolean array that is True for each item whose cost can be paid, like BotAI.can_afford.
+        The supply is only checked if 'supply_left' is given.
+
+        :param item_ids:
+        :param minerals:
+        :param vespene:
+        :param supply_left:
+        """
+        rows = self.rows(item_ids)
+        affordable = (self.minerals[rows] <= minerals) & (self.vespene[rows] <= vespene)
+        if supply_left is not None:
+            supply = self.supply[rows]
+            affordable &= (supply == 0) | (supply <= supply_left)
+        return affordable
+
+    def affordable_amount(
+        self,
+        item_ids: Iterable[Item],
+        minerals: float,
+        vespene: float,
+        supply_left: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Returns how many times each item could be paid for on its own, -1 for items that cost nothing.
+
+        :param item_ids:
+        :param minerals:
+        :param vespene:
+        :param supply_left:
+        """
+        rows = self.rows(item_ids)
+        costs = np.stack([self.minerals[rows], self.vespene[rows]], axis=1)
+        budget = np.array([minerals, vespene], dtype=np.float64)
+        if supply_left is not None:
+            costs = np.concatenate([costs, np.maximum(self.supply[rows], 0)[:, None]], axis=1)
+            budget = np.append(budget, max(supply_left, 0))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            amounts = np.where(costs > 0, np.floor(budget / costs), np.inf).min(axis=1)
+        return np.where(np.isinf(amounts), -1, amounts).astype(np.int64)
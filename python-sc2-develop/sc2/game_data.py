@@ -196,6 +196,11 @@ class UnitTypeData:
         """ How much cargo this unit uses up in cargo_space """
         return self._proto.cargo_size
 
+    @property
+    def food_required(self) -> float:
+        """ Supply the unit uses up, e.g. 0.5 for a zergling """
+        return self._proto.food_required
+
     @property
     def tech_requirement(self) -> Optional[UnitTypeId]:
         """ Tech-building requirement of buildings - may work for units but unreliably """
@@ -2,21 +2,28 @@ from __future__ import annotations
 
 import heapq
 from collections import deque
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from functools import cached_property
-from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from typing import Deque, Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
 
 import numpy as np
 
+from sc2.map_analysis import MapAnalysis
 from sc2.pixel_map import PixelMap
 from sc2.player import Player, Race
 from sc2.position import Point2, Rect, Size
+from sc2.wall_solver import Footprint, Wall, find_wall
+
+# Footprints, gap and upper of a call of Ramp.find_wall
+_WallKey = Tuple[Tuple[Footprint, ...], bool, bool]
 
 
 @dataclass
 class Ramp:
     points: FrozenSet[Point2]
     game_info: GameInfo
+    # Memoized results of 'find_wall'
+    _walls: Dict[_WallKey, Optional[Wall]] = field(default_factory=dict, init=False, repr=False, compare=False)
 
     @property
     def x_offset(self) -> float:
@@ -215,6 +222,64 @@ class Ramp:
         sorted_depots = sorted(self.corner_depots, key=lambda x: x.distance_to(self.game_info.player_start_location))
         return sorted_depots[0].negative_offset(direction)
 
+    def find_wall(self, footprints: Sequence[Footprint], gap: bool = False, upper: bool = True) -> Optional[Wall]:
+        """
+        Finds positions for buildings that wall off this ramp. Works on ramps of any shape, not only the main base ramp.
+        The result is memoized per ramp, so the pathing grid at the time of the first call is used.
+
+        Example::
+
+            # Terran wall with 2 supply depots and a barracks at the top of the main base ramp
+            wall = self.main_base_ramp.find_wall([2, 3, 2])
+            if wall:
+                depot1, barracks, depot2 = wall.buildings
+
+            # Protoss wall with 2 gateways and a gap for a zealot at the bottom of a ramp
+            wall = ramp.find_wall([3, 3], gap=True, upper=False)
+            if wall:
+                zealot.move(wall.gap)
+
+        :param footprints: Sizes of the buildings, either an int for square buildings or a tuple (width, height)
+        :param gap: If True, the wall leaves exactly one tile open
+        :param upper: If True, the buildings are placed on the upper side of the ramp, otherwise on the lower side
+        """
+        key = (tuple(footprints), gap, upper)
+        if key not in self._walls:
+            self._walls[key] = self._find_wall(footprints, gap, upper)
+        return self._walls[key]
+
+    def _find_wall(self, footprints: Sequence[Footprint], gap: bool, upper: bool) -> Optional[Wall]:
+        if not self.upper or not self.lower:
+            return None
+        side_center = self.top_center if upper else self.bottom_center
+        upper_height = self.height_at(next(iter(self.upper)))
+        lower_height = self.height_at(next(iter(self.lower)))
+        ramp_extent = max(p.distance_to_point2(side_center) for p in self.points)
+        radius = int(ramp_extent) + 8
+        # Buildings are placed next to the ramp, the inside are the tiles on the border of the search window
+        x0, y0 = int(side_center.x) - radius, int(side_center.y) - radius
+        heights = self._height_map.data_numpy
+        map_height, map_width = heights.shape
+
+        def on_side(x: int, y: int) -> bool:
+            height = int(heights[y, x])
+            return (abs(height - upper_height) <= abs(height - lower_height)) == upper
+
+        xs = range(max(x0, 0), min(x0 + 2 * radius + 1, map_width))
+        ys = range(max(y0, 0), min(y0 + 2 * radius + 1, map_height))
+        window = [Point2((x, y)) for x in xs for y in ys]
+        side = [p for p in window if on_side(p.x, p.y)]
+        side_array = np.array(side, dtype=np.float64).reshape(-1, 2)
+        ramp_array = np.array(list(self.points), dtype=np.float64)
+        near_ramp = np.abs(side_array[:, None, :] - ramp_array[None, :, :]).sum(axis=2).min(axis=1) <= 5
+        build_area = [p for p, near in zip(side, near_ramp) if near]
+        border = [p for p in side if p.x in {x0, x0 + 2 * radius} or p.y in {y0, y0 + 2 * radius}]
+        # Only ways around the wall on this side of the ramp are relevant
+        walk_area = side + list(self.points)
+        return find_wall(
+            self.game_info, side_center, radius, self.points, border, footprints, gap, build_area, walk_area
+        )
+
 
 class GameInfo:
 
@@ -244,6 +309,21 @@ class GameInfo:
         ]
         self.player_start_location: Point2 = None  # Filled later by BotAI._prepare_first_step
 
+    @cached_property
+    def map_analysis(self) -> MapAnalysis:
+        """
+        Returns the regions of the map and the chokes between them, computed once per map.
+
+        Example::
+
+            analysis = self.game_info.map_analysis
+            main = analysis.region_at(self.start_location)
+            enemy_main = analysis.region_at(self.enemy_start_locations[0])
+            for region in analysis.region_path(main, enemy_main)[1:]:
+                ...
+        """
+        return MapAnalysis.from_game_info(self)
+
     def _find_ramps_and_vision_blockers(self) -> Tuple[List[Ramp], FrozenSet[Point2]]:
         """Calculate points that are pathable but not placeable.
         Then divide them into ramp points if not all points around the points are equal height
@@ -208,31 +208,49 @@ class GameState:
         self.observation = response_observation.observation
         self.observation_raw = self.observation.raw_data
         self.player_result = response_observation.player_result
-        self.common: Common = Common(self.observation.player_common)
-
-        # Area covered by Pylons and Warpprisms
-        self.psionic_matrix: PsionicMatrix = PsionicMatrix.from_proto(self.observation_raw.player.power_sources)
         # 22.4 per second on faster game speed
         self.game_loop: int = self.observation.game_loop
-
-        # https://github.com/Blizzard/s2client-proto/blob/33f0ecf615aa06ca845ffe4739ef3133f37265a9/s2clientprotocol/score.proto#L31
-        self.score: ScoreDetails = ScoreDetails(self.observation.score)
         self.abilities = self.observation.abilities  # abilities of selected units
-        self.upgrades: Set[UpgradeId] = {UpgradeId(upgrade) for upgrade in self.observation_raw.player.upgrade_ids}
 
-        # self.visibility[point]: 0=Hidden, 1=Fogged, 2=Visible
-        self.visibility: PixelMap = PixelMap(self.observation_raw.map_state.visibility)
-        # self.creep[point]: 0=No creep, 1=creep
-        self.creep: PixelMap = PixelMap(self.observation_raw.map_state.creep, in_bits=True)
+    @cached_property
+    def common(self) -> Common:
+        return Common(self.observation.player_common)
+
+    @cached_property
+    def psionic_matrix(self) -> PsionicMatrix:
+        """ Area covered by Pylons and Warpprisms """
+        return PsionicMatrix.from_proto(self.observation_raw.player.power_sources)
+
+    @cached_property
+    def score(self) -> ScoreDetails:
+        """ https://github.com/Blizzard/s2client-proto/blob/33f0ecf615aa06ca845ffe4739ef3133f37265a9/s2clientprotocol/score.proto#L31 """
+        return ScoreDetails(self.observation.score)
 
-        # Effects like ravager bile shot, lurker attack, everything in effect_id.py
-        self.effects: Set[EffectData] = {EffectData(effect) for effect in self.observation_raw.effects}
-        """ Usage:
+    @cached_property
+    def upgrades(self) -> Set[UpgradeId]:
+        return {UpgradeId(upgrade) for upgrade in self.observation_raw.player.upgrade_ids}
+
+    @cached_property
+    def effects(self) -> Set[EffectData]:
+        """ Effects like ravager bile shot, lurker attack, everything in effect_id.py
+
+        Usage:
         for effect in self.state.effects:
             if effect.id == EffectId.RAVAGERCORROSIVEBILECP:
                 positions = effect.positions
                 # dodge the ravager biles
         """
+        return {EffectData(effect) for effect in self.observation_raw.effects}
+
+    @cached_property
+    def visibility(self) -> PixelMap:
+        """ self.visibility[point]: 0=Hidden, 1=Fogged, 2=Visible """
+        return PixelMap(self.observation_raw.map_state.visibility)
+
+    @cached_property
+    def creep(self) -> PixelMap:
+        """ self.creep[point]: 0=No creep, 1=creep """
+        return PixelMap(self.observation_raw.map_state.creep, in_bits=True)
 
     @cached_property
     def dead_units(self) -> Set[int]:
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+# Game loops per second on faster game speed
+LOOPS_PER_SECOND: float = 22.4
+
+
+class GameStepController:
+
+    def __init__(
+        self,
+        min_step: int = 1,
+        max_step: int = 8,
+        enemy_threshold: int = 1,
+        calm_loops: int = 45,
+        loop_time_budget: Optional[float] = None,
+    ):
+        """
+        Chooses 'client.game_step' from how intense the game is and how long on_step takes.
+        During fights (enemy units in vision or own units taking damage), the game step drops to 'min_step'
+        immediately. It only rises again after 'calm_loops' game loops without a fight, and at most doubles per step.
+        That gives per frame control in fights, and fewer steps and more throughput in quiet phases.
+        If on_step takes longer than 'loop_time_budget' seconds per game loop of the step, the game step is raised
+        so that the bot keeps up, e.g. in realtime where a game loop takes 1 / 22.4 seconds.
+
+        Set 'self.game_step_controller' of the bot to enable it, main.py updates 'client.game_step' after each step.
+
+        Example::
+
+            class MyBot(BotAI):
+                def __init__(self):
+                    self.game_step_controller = GameStepController(min_step=2, max_step=8)
+
+        :param min_step: Game step in fights
+        :param max_step: Game step in quiet phases
+        :param enemy_threshold: Number of visible enemy units that counts as a fight
+        :param calm_loops: Game loops without a fight before the game step is raised again
+        :param loop_time_budget: Seconds of on_step per game loop, 80% of realtime if None and the game is in realtime
+        """
+        assert 1 <= min_step <= max_step, f"Invalid game step bounds: {min_step}, {max_step}"
+        self.min_step: int = min_step
+        self.max_step: int = max_step
+        self.enemy_threshold: int = enemy_threshold
+        self.calm_loops: int = calm_loops
+        self.loop_time_budget: Optional[float] = loop_time_budget
+        self.last_fight_game_loop: Optional[int] = None
+
+    def is_fight(self, enemies_in_vision: int, damage_events: int) -> bool:
+        return damage_events > 0 or enemies_in_vision >= self.enemy_threshold
+
+    def update(
+        self,
+        game_loop: int,
+        game_step: int,
+        enemies_in_vision: int,
+        damage_events: int,
+        step_duration: float,
+        realtime: bool = False,
+    ) -> int:
+        """
+        Returns the game step for the next step.
+
+        :param game_loop:
+        :param game_step: Current game step
+        :param enemies_in_vision:
+        :param damage_events: Number of times own units took damage this step
+        :param step_duration: Seconds spent in on_step this step
+        :param realtime:
+        """
+        if self.is_fight(enemies_in_vision, damage_events):
+            self.last_fight_game_loop = game_loop
+            target = self.min_step
+        elif self.last_fight_game_loop is None or game_loop - self.last_fight_game_loop >= self.calm_loops:
+            target = self.max_step
+        else:
+            # Shortly after a fight, keep the current game step so that it does not oscillate
+            target = game_step
+
+        budget = self.loop_time_budget
+        if budget is None and realtime:
+            budget = 0.8 / LOOPS_PER_SECOND
+        if budget:
+            target = max(target, math.ceil(step_duration / budget))
+
+        target = min(max(target, self.min_step), self.max_step)
+        if target > game_step:
+            # Raise gradually, lower immediately
+            return min(target, max(2 * game_step, self.min_step))
+        return target
@@ -4,10 +4,10 @@ from __future__ import annotations
 import asyncio
 import json
 import os
-import platform
 import signal
 import sys
-from contextlib import suppress
+import time
+from contextlib import nullcontext, suppress
 from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
@@ -23,10 +23,14 @@ from sc2.bot_ai import BotAI
 from sc2.client import Client
 from sc2.controller import Controller
 from sc2.data import CreateGameError, Result, Status
+from sc2.game_data import GameData
+from sc2.game_info import GameInfo
 from sc2.game_state import GameState
 from sc2.maps import Map
+from sc2.observation_recorder import ObservationReader, ObservationRecorder
 from sc2.player import AbstractPlayer, Bot, BotProcess, Human
 from sc2.portconfig import Portconfig
+from sc2.profiler import StepProfiler
 from sc2.protocol import ConnectionAlreadyClosed, ProtocolError
 from sc2.proxy import Proxy
 from sc2.sc2process import SC2Process, kill_switch
@@ -106,7 +110,12 @@ async def _play_game_human(client, player_id, realtime, game_time_limit):
 
 # pylint: disable=R0912,R0911,R0914
 async def _play_game_ai(
-    client: Client, player_id: int, ai: BotAI, realtime: bool, game_time_limit: Optional[int]
+    client: Client,
+    player_id: int,
+    ai: BotAI,
+    realtime: bool,
+    game_time_limit: Optional[int],
+    profiler: Optional[StepProfiler] = None
 ) -> Result:
     gs: GameState = None
 
@@ -128,9 +137,9 @@ async def _play_game_ai(
             await ai.on_end(client._game_result[player_id])
             return client._game_result[player_id]
         gs = GameState(state.observation)
-        proto_game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
         try:
-            ai._prepare_step(gs, proto_game_info)
+            ai._prepare_step(gs)
+            await ai._request_pathing_grid()
             await ai.on_before_start()
             ai._prepare_first_step()
             await ai.on_start()
@@ -153,7 +162,10 @@ async def _play_game_ai(
         await ai.issue_events()
         # In on_step various errors can occur - log properly
         try:
-            await ai.on_step(iteration)
+            with ai.step_timer.measure("on_step") if ai.step_timer is not None else nullcontext():
+                with profiler.sampling() if profiler is not None else nullcontext():
+                    await ai.on_step(iteration)
+            await ai._run_scheduler()
         except (AttributeError, ) as e:
             logger.exception(f"Caught exception: {e}")
             raise
@@ -161,6 +173,7 @@ async def _play_game_ai(
             logger.exception(f"Caught unknown exception: {e}")
             raise
         await ai._after_step()
+        ai._update_game_step()
         logger.debug("Running AI step: done")
 
     # Only used in realtime=True
@@ -183,15 +196,18 @@ async def _play_game_ai(
         if client._game_result:
             await ai.on_end(client._game_result[player_id])
             return client._game_result[player_id]
+        t0 = time.perf_counter()
         gs = GameState(state.observation, previous_state_observation)
+        if ai.step_timer is not None:
+            ai.step_timer.add("game_state", time.perf_counter() - t0)
         previous_state_observation = None
-        logger.debug(f"Score: {gs.score.score}")
+        logger.opt(lazy=True).debug("Score: {}", lambda: gs.score.score)
 
         if game_time_limit and gs.game_loop / 22.4 > game_time_limit:
             await ai.on_end(Result.Tie)
             return Result.Tie
-        proto_game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
-        ai._prepare_step(gs, proto_game_info)
+        ai._prepare_step(gs)
+        await ai._request_pathing_grid()
 
         await run_bot_iteration(iteration)  # Main bot loop
 
@@ -202,6 +218,8 @@ async def _play_game_ai(
 
             # TODO: In bot vs bot, if the other bot ends the game, this bot gets stuck in requesting an observation when using main.py:run_multiple_games
             await client.step()
+        if ai.step_timer is not None:
+            ai.step_timer.end_step(gs.game_loop)
     return Result.Undecided
 
 
@@ -211,7 +229,8 @@ async def _play_game(
     realtime,
     portconfig,
     game_time_limit=None,
-    rgb_render_config=None
+    rgb_render_config=None,
+    profiler: Optional[StepProfiler] = None
 ) -> Result:
     assert isinstance(realtime, bool), repr(realtime)
 
@@ -223,7 +242,11 @@ async def _play_game(
     if isinstance(player, Human):
         result = await _play_game_human(client, player_id, realtime, game_time_limit)
     else:
-        result = await _play_game_ai(client, player_id, player.ai, realtime, game_time_limit)
+        try:
+            result = await _play_game_ai(client, player_id, player.ai, realtime, game_time_limit, profiler)
+        finally:
+            if player.ai.step_timer is not None:
+                player.ai.step_timer.close()
 
     logger.info(
         f"Result for player {player_id} - {player.name if player.name else str(player)}: "
@@ -233,14 +256,14 @@ async def _play_game(
     return result
 
 
-async def _play_replay(client, ai, realtime=False, player_id=0):
+async def _play_replay(client, ai, realtime=False, player_id=0, game_step=1):
     ai._initialize_variables()
 
     game_data = await client.get_game_data()
     game_info = await client.get_game_info()
     ping_response = await client.ping()
 
-    client.game_step = 1
+    client.game_step = game_step
     # This game_data will become self._game_data in botAI
     ai._prepare_start(
         client, player_id, game_info, game_data, realtime=realtime, base_build=ping_response.ping.base_build
@@ -251,8 +274,8 @@ async def _play_replay(client, ai, realtime=False, player_id=0):
         await ai.on_end(client._game_result[player_id])
         return client._game_result[player_id]
     gs = GameState(state.observation)
-    proto_game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
-    ai._prepare_step(gs, proto_game_info)
+    ai._prepare_step(gs)
+    await ai._request_pathing_grid()
     ai._prepare_first_step()
     try:
         await ai.on_start()
@@ -280,10 +303,10 @@ async def _play_replay(client, ai, realtime=False, player_id=0):
                     return client._game_result[player_id]
                 return client._game_result[player_id]
             gs = GameState(state.observation)
-            logger.debug(f"Score: {gs.score.score}")
+            logger.opt(lazy=True).debug("Score: {}", lambda: gs.score.score)
 
-            proto_game_info = await client._execute(game_info=sc_pb.RequestGameInfo())
-            ai._prepare_step(gs, proto_game_info)
+            ai._prepare_step(gs)
+            await ai._request_pathing_grid()
 
         logger.debug(f"Running AI step, it={iteration} {gs.game_loop * 0.725 * (1 / 16):.2f}s")
 
@@ -291,6 +314,7 @@ async def _play_replay(client, ai, realtime=False, player_id=0):
             # Issue event like unit created or unit destroyed
             await ai.issue_events()
             await ai.on_step(iteration)
+            await ai._run_scheduler()
             await ai._after_step()
 
         # pylint: disable=W0703
@@ -348,6 +372,9 @@ async def _host_game(
     random_seed=None,
     sc2_version=None,
     disable_fog=None,
+    record_observations_as=None,
+    profile_on_step_as=None,
+    profile_interval=0.001,
 ):
 
     assert players, "Can't create a game without players"
@@ -365,8 +392,25 @@ async def _host_game(
         # Bot can decide if it wants to launch with 'raw_affects_selection=True'
         if not isinstance(players[0], Human) and getattr(players[0].ai, "raw_affects_selection", None) is not None:
             client.raw_affects_selection = players[0].ai.raw_affects_selection
+        if record_observations_as is not None:
+            client._recorder = ObservationRecorder(record_observations_as)
+        profiler = None
+        if profile_on_step_as is not None and not isinstance(players[0], Human):
+            profiler = StepProfiler(profile_interval)
+            profiler.start()
 
-        result = await _play_game(players[0], client, realtime, portconfig, game_time_limit, rgb_render_config)
+        try:
+            result = await _play_game(
+                players[0], client, realtime, portconfig, game_time_limit, rgb_render_config, profiler
+            )
+        finally:
+            if client._recorder is not None:
+                client._recorder.close()
+                client._recorder = None
+            if profiler is not None:
+                profiler.stop()
+                profiler.write(profile_on_step_as)
+                logger.info(f"Saved on_step profile to {profile_on_step_as}\n{profiler.summary()}")
         if client.save_replay_path is not None:
             await client.save_replay(client.save_replay_path)
         try:
@@ -452,10 +496,10 @@ async def _setup_replay(server, replay_path, realtime, observed_id):
     return Client(server._ws)
 
 
-async def _host_replay(replay_path, ai, realtime, _portconfig, base_build, data_version, observed_id):
+async def _host_replay(replay_path, ai, realtime, _portconfig, base_build, data_version, observed_id, game_step=1):
     async with SC2Process(fullscreen=False, base_build=base_build, data_hash=data_version) as server:
         client = await _setup_replay(server, replay_path, realtime, observed_id)
-        result = await _play_replay(client, ai, realtime)
+        result = await _play_replay(client, ai, realtime, game_step=game_step)
         return result
 
 
@@ -477,7 +521,16 @@ def run_game(map_settings, players, **kwargs) -> Union[Result, List[Optional[Res
     Returns a list of two Result enums if the game was "Human vs Bot" or "Bot vs Bot".
     """
     if sum(isinstance(p, (Human, Bot)) for p in players) > 1:
-        host_only_args = ["save_replay_as", "rgb_render_config", "random_seed", "sc2_version", "disable_fog"]
+        host_only_args = [
+            "save_replay_as",
+            "rgb_render_config",
+            "random_seed",
+            "sc2_version",
+            "disable_fog",
+            "record_observations_as",
+            "profile_on_step_as",
+            "profile_interval",
+        ]
         join_kwargs = {k: v for k, v in kwargs.items() if k not in host_only_args}
 
         portconfig = Portconfig()
@@ -498,7 +551,7 @@ def run_game(map_settings, players, **kwargs) -> Union[Result, List[Optional[Res
     return result
 
 
-def run_replay(ai, replay_path, realtime=False, observed_id=0):
+def run_replay(ai, replay_path, realtime=False, observed_id=0, game_step=1):
     portconfig = Portconfig()
     assert os.path.isfile(replay_path), f"Replay does not exist at the given path: {replay_path}"
     assert os.path.isabs(
@@ -506,11 +559,128 @@ def run_replay(ai, replay_path, realtime=False, observed_id=0):
     ), f'Replay path has to be an absolute path, e.g. "C:/replays/my_replay.SC2Replay" but given path was "{replay_path}"'
     base_build, data_version = get_replay_version(replay_path)
     result = asyncio.get_event_loop().run_until_complete(
-        _host_replay(replay_path, ai, realtime, portconfig, base_build, data_version, observed_id)
+        _host_replay(replay_path, ai, realtime, portconfig, base_build, data_version, observed_id, game_step)
     )
     return result
 
 
+class _RecordedWebSocket:
+    """ Websocket of a recorded game. Nothing is sent or received, all requests are answered by _RecordedClient. """
+
+    closed: bool = True
+
+    async def send_bytes(self, _data: bytes):
+        raise ConnectionAlreadyClosed("A recorded game has no connection")
+
+    async def receive_bytes(self) -> bytes:
+        raise ConnectionAlreadyClosed("A recorded game has no connection")
+
+    async def close(self):
+        pass
+
+
+class _RecordedClient(Client):
+
+    def __init__(self):
+        """ Answers the requests of a bot that plays a recorded game. There is no SC2 process. """
+        super().__init__(_RecordedWebSocket())
+        self._status = Status.in_game
+        # The game info that was recorded last, the pathing grid may have changed since the start of the game
+        self.game_info_response: Optional[sc_pb.Response] = None
+
+    async def _execute(self, **kwargs):
+        assert len(kwargs) == 1, "Only one request allowed by the API"
+        request = next(iter(kwargs))
+        if request == "game_info":
+            return self.game_info_response
+        if request in {"action", "debug", "leave_game", "quit"}:
+            # The recorded game can not be changed, actions and debug draws are dropped
+            return sc_pb.Response(status=self._status.value)
+        raise ProtocolError(f"['Request {request} is not available in a recorded game']")
+
+
+async def _play_recorded(ai: BotAI, path: Union[str, Path]) -> Result:
+    client = _RecordedClient()
+    ai._initialize_variables()
+    game_data: Optional[GameData] = None
+    game_info: Optional[GameInfo] = None
+    base_build: int = -1
+    player_id: Optional[int] = None
+    iteration: int = -1
+
+    async def run_observation(response: sc_pb.Response) -> Optional[Result]:
+        nonlocal player_id, iteration
+        if response.observation.player_result:
+            results = {result.player_id: Result(result.result) for result in response.observation.player_result}
+            await ai.on_end(results[player_id])
+            return results[player_id]
+        gs = GameState(response.observation)
+        if player_id is None:
+            # The first observation was used to start the bot
+            player_id = gs.observation.player_common.player_id
+            ai._prepare_start(client, player_id, game_info, game_data, base_build=base_build)
+            ai._prepare_step(gs)
+            await ai._request_pathing_grid()
+            await ai.on_before_start()
+            ai._prepare_first_step()
+            await ai.on_start()
+            return None
+        ai._prepare_step(gs)
+        await ai._request_pathing_grid()
+        iteration += 1
+        await ai.issue_events()
+        with ai.step_timer.measure("on_step") if ai.step_timer is not None else nullcontext():
+            await ai.on_step(iteration)
+        await ai._run_scheduler()
+        await ai._after_step()
+        if ai.step_timer is not None:
+            ai.step_timer.end_step(gs.game_loop)
+        return None
+
+    # The game info that was requested for an observation is recorded after it, so each observation is
+    # only played when the records up to the next observation were read
+    pending: Optional[sc_pb.Response] = None
+    for name, response in ObservationReader(path):
+        if name == "data":
+            game_data = GameData(response.data)
+        elif name == "game_info":
+            client.game_info_response = response
+            if game_info is None:
+                game_info = GameInfo(response.game_info)
+        elif name == "ping":
+            base_build = response.ping.base_build
+        else:
+            if pending is not None:
+                result = await run_observation(pending)
+                if result is not None:
+                    return result
+            pending = response
+    if pending is not None:
+        result = await run_observation(pending)
+        if result is not None:
+            return result
+    if player_id is not None:
+        # The recording ended before the game did
+        await ai.on_end(Result.Undecided)
+    return Result.Undecided
+
+
+def run_recorded(ai: BotAI, path: Union[str, Path]) -> Result:
+    """
+    Plays a game that was recorded with 'run_game(..., record_observations_as=path)' without SC2, e.g. to profile
+    or benchmark 'on_step' on a full game. The bot sees the recorded observations, its actions and debug draws
+    are dropped and queries raise a ProtocolError.
+
+    :param ai:
+    :param path:
+    """
+    try:
+        return asyncio.run(_play_recorded(ai, path))
+    finally:
+        if ai.step_timer is not None:
+            ai.step_timer.close()
+
+
 async def play_from_websocket(
     ws_connection: Union[str, ClientWebSocketResponse],
     player: AbstractPlayer,
@@ -584,7 +754,12 @@ async def run_match(controllers: List[Controller], match: GameMatch, close_ws=Tr
                 )
             )
 
-    async_results = await asyncio.gather(*coros, return_exceptions=True)
+    try:
+        async_results = await asyncio.gather(*coros, return_exceptions=True)
+    finally:
+        if portconfig is not None:
+            # Give the ports back, so that the next match can pick them again
+            portconfig.clean()
 
     if not isinstance(async_results, list):
         async_results = [async_results]
@@ -615,15 +790,37 @@ def process_results(players: List[AbstractPlayer], async_results: List[Result])
     return result
 
 
+async def _ping_with_timeout(controller: Controller, timeout: float) -> Union[sc_pb.Response, Exception]:
+    """ Returns the ping response, or the exception if the SCII process did not answer in time. """
+    try:
+        return await asyncio.wait_for(controller.ping(), timeout=timeout)
+    except Exception as e:  # pylint: disable=W0703
+        return e
+
+
+async def _start_sc2_process(process: SC2Process) -> Union[Controller, Exception]:
+    """ Returns the controller, or the exception if the SCII process did not start. The process is cleaned up then. """
+    try:
+        return await asyncio.wait_for(process.__aenter__(), timeout=50)  # pylint: disable=C2801
+    except Exception as e:  # pylint: disable=W0703
+        return e
+
+
 # pylint: disable=R0912
-async def maintain_SCII_count(count: int, controllers: List[Controller], proc_args: List[Dict] = None):
-    """Modifies the given list of controllers to reflect the desired amount of SCII processes"""
+async def maintain_SCII_count(
+    count: int,
+    controllers: List[Controller],
+    proc_args: List[Dict] = None,
+    ping_timeout: float = 20,
+    parallel: bool = True,
+):
+    """Modifies the given list of controllers to reflect the desired amount of SCII processes
+    Processes that do not answer a ping within 'ping_timeout' seconds are considered stuck and replaced.
+    New processes are launched at the same time if 'parallel' is True, otherwise one after the other."""
     # kill unhealthy ones.
     if controllers:
         to_remove = []
-        alive = await asyncio.wait_for(
-            asyncio.gather(*(c.ping() for c in controllers if not c._ws.closed), return_exceptions=True), timeout=20
-        )
+        alive = await asyncio.gather(*(_ping_with_timeout(c, ping_timeout) for c in controllers if not c._ws.closed))
         i = 0  # for alive
         for controller in controllers:
             if controller._ws.closed:
@@ -639,8 +836,7 @@ async def maintain_SCII_count(count: int, controllers: List[Controller], proc_ar
                 i += 1
         for c in to_remove:
             c._process._clean(verbose=False)
-            if c._process in kill_switch._to_kill:
-                kill_switch._to_kill.remove(c._process)
+            kill_switch.remove(c._process)
             controllers.remove(c)
 
     # spawn more
@@ -651,28 +847,37 @@ async def maintain_SCII_count(count: int, controllers: List[Controller], proc_ar
         else:
             proc_args = [{} for _ in range(needed)]
             index = 0
-        extra = [SC2Process(**proc_args[(index + _) % len(proc_args)]) for _ in range(needed)]
+        slot_args = [proc_args[(index + i) % len(proc_args)] for i in range(needed)]
         logger.info(f"Creating {needed} more SC2 Processes")
+        t0 = time.perf_counter()
+        # The processes are entered without 'async with', they outlive this function and are closed in 'kill excess'
         for _ in range(3):
-            if platform.system() == "Linux":
-                # Works on linux: start one client after the other
-                # pylint: disable=C2801
-                new_controllers = [await asyncio.wait_for(sc.__aenter__(), timeout=50) for sc in extra]
+            # A process that failed to start was cleaned up, so each attempt starts new ones
+            extra = [SC2Process(**args) for args in slot_args]
+            ports = [sc._port for sc in extra]
+            if parallel:
+                # Each process connects with exponential backoff, so starting them together costs about one startup
+                new_controllers = await asyncio.gather(*(_start_sc2_process(sc) for sc in extra))
             else:
-                # Doesnt seem to work on linux: starting 2 clients nearly at the same time
-                new_controllers = await asyncio.wait_for(
-                    # pylint: disable=C2801
-                    asyncio.gather(*[sc.__aenter__() for sc in extra], return_exceptions=True),
-                    timeout=50
-                )
-
-            controllers.extend(c for c in new_controllers if isinstance(c, Controller))
+                # Start one client after the other
+                new_controllers = [await _start_sc2_process(sc) for sc in extra]
+
+            failed_args = []
+            for sc, port, args, result in zip(extra, ports, slot_args, new_controllers):
+                if isinstance(result, Controller):
+                    controllers.append(result)
+                else:
+                    logger.warning(f"SC2 process on port {port} failed to start: {result !r}")
+                    kill_switch.remove(sc)
+                    failed_args.append(args)
             if len(controllers) == count:
                 await asyncio.wait_for(asyncio.gather(*(c.ping() for c in controllers)), timeout=20)
+                startup_times = ", ".join(
+                    f"port {c._process._port}: {c._process.startup_time:.1f}s" for c in controllers[count - needed:]
+                )
+                logger.info(f"Started {needed} SC2 processes in {time.perf_counter() - t0:.1f}s ({startup_times})")
                 break
-            extra = [
-                extra[i] for i, result in enumerate(new_controllers) if not isinstance(new_controllers, Controller)
-            ]
+            slot_args = failed_args
         else:
             logger.critical("Could not launch sufficient SC2")
             raise RuntimeError
@@ -684,8 +889,7 @@ async def maintain_SCII_count(count: int, controllers: List[Controller], proc_ar
         logger.info(f"Removing SCII listening to {proc._port}")
         await proc._close_connection()
         proc._clean(verbose=False)
-        if proc in kill_switch._to_kill:
-            kill_switch._to_kill.remove(proc)
+        kill_switch.remove(proc)
 
 
 def run_multiple_games(matches: List[GameMatch]):
@@ -723,10 +927,77 @@ async def a_run_multiple_games(matches: List[GameMatch]) -> List[Dict[AbstractPl
     return results
 
 
+class WarmGameRunner:
+
+    def __init__(self, ping_timeout: float = 20):
+        """
+        Plays matches one after another on the same SCII processes. After a match, the processes leave the game
+        and the next match is created and joined over the same connections, so SCII is only launched once.
+        Before each match, every process has to answer a ping within 'ping_timeout' seconds,
+        processes that crashed or are stuck are replaced by new ones.
+        Each match picks new ports for the players, the ports of the last match are given back when it ends.
+
+        Example::
+
+            async with WarmGameRunner() as runner:
+                for match in matches:
+                    result = await runner.run(match)
+
+        :param ping_timeout: Seconds a process has to answer a ping before it is considered stuck
+        """
+        self.ping_timeout: float = ping_timeout
+        self.controllers: List[Controller] = []
+
+    async def __aenter__(self) -> WarmGameRunner:
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def run(self, match: GameMatch) -> Dict[AbstractPlayer, Result]:
+        """
+        Plays a match on the kept processes, launching processes if there are not enough.
+
+        :param match:
+        """
+        await maintain_SCII_count(match.needed_sc2_count, self.controllers, match.sc2_config, self.ping_timeout)
+        try:
+            return await run_match(self.controllers, match, close_ws=False)
+        finally:
+            await self._leave_games()
+
+    async def _leave_games(self):
+        """ Returns all processes to the launched state, so that they can create or join the next game. """
+        for controller in self.controllers:
+            if controller._ws.closed:
+                continue
+            try:
+                await asyncio.wait_for(controller.ping(), timeout=self.ping_timeout)
+                if controller._status != Status.launched:
+                    await asyncio.wait_for(
+                        controller._execute(leave_game=sc_pb.RequestLeaveGame()), timeout=self.ping_timeout
+                    )
+            except Exception as e:  # pylint: disable=W0703
+                # The process is replaced before the next match if it does not recover
+                if not (isinstance(e, ProtocolError) and e.is_game_over_error):
+                    logger.exception(f"Leaving the game failed on SCII listening to {controller._process._port}: {e}")
+
+    async def close(self):
+        """ Closes the connections and the processes. """
+        if self.controllers:
+            await asyncio.wait_for(
+                asyncio.gather(*(c._process._close_connection() for c in self.controllers)), timeout=50
+            )
+            for controller in self.controllers:
+                controller._process._clean(verbose=False)
+                kill_switch.remove(controller._process)
+            self.controllers.clear()
+
+
 # TODO Catching too general exception Exception (broad-except)
 # pylint: disable=W0703
 async def a_run_multiple_games_nokill(matches: List[GameMatch]) -> List[Dict[AbstractPlayer, Result]]:
-    """Run multiple matches while reusing SCII processes.
+    """Run multiple matches while reusing SCII processes, see WarmGameRunner.
     Prone to crashes and stalls
     """
     # FIXME: check whether crashes between bot-vs-bot are avoidable or not
@@ -735,33 +1006,20 @@ async def a_run_multiple_games_nokill(matches: List[GameMatch]) -> List[Dict[Abs
 
     # Start the matches
     results = []
-    controllers = []
-    for m in matches:
-        logger.info(f"Starting match {1 + len(results)} / {len(matches)}: {m}")
-        result = None
-        try:
-            await maintain_SCII_count(m.needed_sc2_count, controllers, m.sc2_config)
-            result = await run_match(controllers, m, close_ws=False)
-        except SystemExit as e:
-            logger.critical(f"Game sys.exit'ed as {e} during match {m}")
-        except Exception as e:
-            logger.exception(f"Caught unknown exception: {e}")
-            logger.info(f"Exception {e} thrown in match {m}")
-        finally:
-            for c in controllers:
-                try:
-                    await c.ping()
-                    if c._status != Status.launched:
-                        await c._execute(leave_game=sc_pb.RequestLeaveGame())
-                except Exception as e:
-                    logger.exception(f"Caught unknown exception: {e}")
-                    if not (isinstance(e, ProtocolError) and e.is_game_over_error):
-                        logger.info(f"controller {c.__dict__} threw {e}")
-
+    async with WarmGameRunner() as runner:
+        for m in matches:
+            logger.info(f"Starting match {1 + len(results)} / {len(matches)}: {m}")
+            result = None
+            try:
+                result = await runner.run(m)
+            except SystemExit as e:
+                logger.critical(f"Game sys.exit'ed as {e} during match {m}")
+            except Exception as e:
+                logger.exception(f"Caught unknown exception: {e}")
+                logger.info(f"Exception {e} thrown in match {m}")
             results.append(result)
 
     # Fire the killswitch manually, instead of letting the winning player fire it.
-    await asyncio.wait_for(asyncio.gather(*(c._process._close_connection() for c in controllers)), timeout=50)
     kill_switch.kill_all()
     signal.signal(signal.SIGINT, signal.SIG_DFL)
 
@@ -0,0 +1,318 @@
+from __future__ import annotations
+
+import math
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Deque, Dict, FrozenSet, List, Optional, Tuple, Union
+
+import numpy as np
+from scipy import ndimage
+
+from sc2.position import Point2, Rect
+
+if TYPE_CHECKING:
+    from sc2.game_info import GameInfo
+
+# Map analysis results by (map name, hash of the walkable grid), shared by all games in the same process
+_MAP_ANALYSIS_CACHE: Dict[Tuple[str, int], MapAnalysis] = {}
+
+
+@dataclass(frozen=True)
+class Region:
+    label: int
+    # Number of tiles
+    area: int
+    # Most open point of the region, the tile furthest away from any wall
+    center: Point2
+    bounds: Rect
+
+    def __repr__(self) -> str:
+        return f"Region(label={self.label}, area={self.area}, center={self.center})"
+
+
+@dataclass(frozen=True)
+class Choke:
+    # Labels of the two regions connected by this choke, the smaller label first
+    regions: Tuple[int, int]
+    # Widest point of the border between the two regions
+    center: Point2
+    # Approximate width of the passage in tiles
+    width: float
+    # Tiles on both sides of the border between the two regions
+    points: FrozenSet[Point2]
+
+    def other(self, label: int) -> int:
+        """ Returns the label of the region on the other side of the choke. """
+        return self.regions[1] if self.regions[0] == label else self.regions[0]
+
+
+class _UnionFind:
+
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, x: int) -> int:
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a: int, b: int):
+        self.parent[self.find(b)] = self.find(a)
+
+
+class MapAnalysis:
+
+    def __init__(self, walkable: np.ndarray, merge_ratio: float = 0.7, min_region_area: int = 60):
+        """
+        Splits the walkable area of a map into regions that are connected by chokes.
+        Based on the distance transform of the walkable grid: the watershed of the distance to the closest wall
+        gives many small basins, and neighboring basins are merged unless the border between them is clearly
+        narrower than both of them.
+
+        Use 'MapAnalysis.from_game_info' or 'self.game_info.map_analysis' to get a cached instance.
+
+        Example::
+
+            analysis = self.game_info.map_analysis
+            natural = analysis.region_at(await self.get_next_expansion())
+            if any(analysis.region_at(unit) == natural for unit in self.enemy_units):
+                ...
+
+        :param walkable: Boolean numpy array of shape (height, width), indexed by [y, x]
+        :param merge_ratio: Borders that are at least this fraction as wide as the narrower region are not chokes
+        :param min_region_area: Regions with fewer tiles are merged into a neighbor
+        """
+        self.walkable: np.ndarray = walkable.astype(bool)
+        # Distance of each tile to the closest unwalkable tile
+        self.distance: np.ndarray = ndimage.distance_transform_edt(self.walkable)
+        self.labels: np.ndarray = self._merge_basins(self._find_basins(), merge_ratio, min_region_area)
+        self.regions: Dict[int, Region] = self._create_regions()
+        self.chokes: List[Choke] = self._create_chokes()
+        # Region label to neighbor region label to the choke between them
+        self.graph: Dict[int, Dict[int, Choke]] = {label: {} for label in self.regions}
+        for choke in self.chokes:
+            a, b = choke.regions
+            self.graph[a][b] = choke
+            self.graph[b][a] = choke
+
+    @classmethod
+    def from_game_info(cls, game_info: GameInfo) -> MapAnalysis:
+        """
+        Returns the map analysis of the map in game_info. Results are cached per map and walkable area.
+        Placeable tiles count as walkable, so that structures do not split regions.
+
+        :param game_info:
+        """
+        # Tiles under structures are not pathable, but placeable
+        walkable = (game_info.pathing_grid.data_numpy != 0) | (game_info.placement_grid.data_numpy != 0)
+        area = game_info.playable_area
+        playable = np.zeros_like(walkable)
+        playable[int(area.y):int(area.top), int(area.x):int(area.right)] = True
+        walkable &= playable
+        key = (game_info.map_name, hash(walkable.tobytes()))
+        if key not in _MAP_ANALYSIS_CACHE:
+            _MAP_ANALYSIS_CACHE[key] = cls(walkable)
+        return _MAP_ANALYSIS_CACHE[key]
+
+    def _find_basins(self) -> np.ndarray:
+        """ Labels the basins of the watershed of the inverted distance transform, 0 for unwalkable tiles. """
+        distance = self.distance
+        # Only peaks in open areas start a basin, narrow corridors are filled from the neighboring basins
+        peaks = (distance == ndimage.maximum_filter(distance, size=9)) & (distance >= 3)
+        markers, _count = ndimage.label(peaks, structure=np.ones((3, 3), dtype=bool))
+        # Walkable areas without a peak, e.g. very narrow islands, get a marker at their most open tile
+        components, component_count = ndimage.label(self.walkable)
+        marked = np.unique(components[markers > 0])
+        next_marker = markers.max() + 1
+        for component in set(range(1, component_count + 1)) - set(marked.tolist()):
+            y, x = divmod(int(np.argmax(np.where(components == component, distance, -1))), distance.shape[1])
+            markers[y, x] = next_marker
+            next_marker += 1
+        # Flood from the most open tiles towards the walls, one distance level at a time.
+        # Within a level, basins grow one tile per iteration, so tiles go to the closest basin.
+        basins = markers.astype(np.int32)
+        cross = ndimage.generate_binary_structure(2, 1)
+        levels = np.unique(np.floor(distance[self.walkable] * 2) / 2)
+        for level in levels[::-1].tolist():
+            unassigned = (distance >= level) & (basins == 0)
+            while True:
+                grown = ndimage.grey_dilation(basins, footprint=cross)
+                new = unassigned & (grown > 0)
+                if not new.any():
+                    break
+                basins[new] = grown[new]
+                unassigned &= ~new
+        return basins
+
+    @staticmethod
+    def _adjacent_pairs(labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """ Returns all horizontally or vertically adjacent tiles with different, non zero labels as flat indices. """
+        first: List[np.ndarray] = []
+        second: List[np.ndarray] = []
+        index = np.arange(labels.size).reshape(labels.shape)
+        for a, b in ((index[:, :-1], index[:, 1:]), (index[:-1, :], index[1:, :])):
+            la, lb = labels.ravel()[a], labels.ravel()[b]
+            different = (la != lb) & (la != 0) & (lb != 0)
+            first.append(a[different])
+            second.append(b[different])
+        first_index, second_index = np.concatenate(first), np.concatenate(second)
+        return first_index, second_index, labels.ravel()[first_index], labels.ravel()[second_index]
+
+    def _border_widths(self, labels: np.ndarray) -> Dict[Tuple[int, int], float]:
+        """ Returns the half width of the widest crossing of each border between two labels. """
+        first_index, second_index, first_label, second_label = self._adjacent_pairs(labels)
+        flat_distance = self.distance.ravel()
+        half_width = np.minimum(flat_distance[first_index], flat_distance[second_index])
+        low, high = np.minimum(first_label, second_label), np.maximum(first_label, second_label)
+        widths: Dict[Tuple[int, int], float] = {}
+        for a, b, width in zip(low.tolist(), high.tolist(), half_width.tolist()):
+            if width > widths.get((a, b), 0):
+                widths[a, b] = width
+        return widths
+
+    @staticmethod
+    def _best_merge(
+        groups: _UnionFind,
+        widths: Dict[Tuple[int, int], float],
+        group_peak: Dict[int, float],
+        group_area: Dict[int, int],
+        merge_ratio: float,
+        min_region_area: int,
+    ) -> Optional[Tuple[int, int]]:
+        """ Returns the two neighboring groups that should be merged next, or None if no groups should be merged. """
+        group_widths: Dict[Tuple[int, int], float] = {}
+        for (a, b), width in widths.items():
+            ga, gb = groups.find(a), groups.find(b)
+            if ga != gb:
+                key = (min(ga, gb), max(ga, gb))
+                group_widths[key] = max(width, group_widths.get(key, 0))
+        best_score = -math.inf
+        best: Optional[Tuple[int, int]] = None
+        for (ga, gb), width in group_widths.items():
+            small = min(group_area[ga], group_area[gb]) < min_region_area
+            score = width / min(group_peak[ga], group_peak[gb])
+            if small:
+                # Tiny basins are merged first, into the neighbor with the widest border
+                score += 10
+            if (small or score >= merge_ratio) and score > best_score:
+                best_score, best = score, (ga, gb)
+        return best
+
+    def _merge_basins(self, basins: np.ndarray, merge_ratio: float, min_region_area: int) -> np.ndarray:
+        count = int(basins.max()) + 1
+        peaks = ndimage.maximum(self.distance, basins, index=np.arange(count))
+        areas = np.bincount(basins.ravel(), minlength=count)
+        widths = self._border_widths(basins)
+        groups = _UnionFind(count)
+        group_peak = {label: float(peaks[label]) for label in range(count)}
+        group_area = {label: int(areas[label]) for label in range(count)}
+
+        while True:
+            merge = self._best_merge(groups, widths, group_peak, group_area, merge_ratio, min_region_area)
+            if merge is None:
+                break
+            ga, gb = merge
+            groups.union(ga, gb)
+            group_peak[ga] = max(group_peak[ga], group_peak[gb])
+            group_area[ga] += group_area[gb]
+
+        # Relabel groups to 1..n, unwalkable tiles stay 0
+        mapping = np.zeros(count, dtype=np.int32)
+        new_labels: Dict[int, int] = {}
+        for label in range(1, count):
+            root = groups.find(label)
+            mapping[label] = new_labels.setdefault(root, len(new_labels) + 1)
+        return mapping[basins]
+
+    def _create_regions(self) -> Dict[int, Region]:
+        regions: Dict[int, Region] = {}
+        slices = ndimage.find_objects(self.labels)
+        for index, region_slice in enumerate(slices):
+            if region_slice is None:
+                continue
+            label = index + 1
+            y_slice, x_slice = region_slice
+            inside = self.labels[region_slice] == label
+            local_distance = np.where(inside, self.distance[region_slice], -1)
+            y, x = divmod(int(np.argmax(local_distance)), local_distance.shape[1])
+            regions[label] = Region(
+                label=label,
+                area=int(inside.sum()),
+                center=Point2((x_slice.start + x + 0.5, y_slice.start + y + 0.5)),
+                bounds=Rect((x_slice.start, y_slice.start, x_slice.stop - x_slice.start, y_slice.stop - y_slice.start)),
+            )
+        return regions
+
+    def _create_chokes(self) -> List[Choke]:
+        first_index, second_index, first_label, second_label = self._adjacent_pairs(self.labels)
+        low, high = np.minimum(first_label, second_label), np.maximum(first_label, second_label)
+        width = self.labels.shape[1]
+        flat_distance = self.distance.ravel()
+        chokes: List[Choke] = []
+        pairs = np.stack((low, high), axis=1)
+        for a, b in np.unique(pairs, axis=0).tolist():
+            selected = (low == a) & (high == b)
+            tiles = np.unique(np.concatenate((first_index[selected], second_index[selected])))
+            widest = tiles[np.argmax(flat_distance[tiles])]
+            half_width = np.minimum(flat_distance[first_index[selected]], flat_distance[second_index[selected]])
+            chokes.append(
+                Choke(
+                    regions=(a, b),
+                    center=Point2((widest % width + 0.5, widest // width + 0.5)),
+                    width=2 * float(half_width.max()),
+                    points=frozenset(Point2((tile % width, tile // width)) for tile in tiles.tolist()),
+                )
+            )
+        return chokes
+
+    def region_at(self, p: Union[Point2, Tuple[float, float]]) -> Optional[Region]:
+        """
+        Returns the region at the given position, or None if it is not walkable.
+
+        :param p:
+        """
+        x, y = int(p[0]), int(p[1])
+        if not (0 <= y < self.labels.shape[0] and 0 <= x < self.labels.shape[1]):
+            return None
+        return self.regions.get(int(self.labels[y, x]))
+
+    def neighbors(self, region: Region) -> List[Region]:
+        """
+        Returns all regions that are connected to the given region by a choke.
+
+        :param region:
+        """
+        return [self.regions[label] for label in self.graph[region.label]]
+
+    def choke_between(self, a: Region, b: Region) -> Optional[Choke]:
+        """
+        Returns the choke connecting two neighboring regions, or None if they are not neighbors.
+
+        :param a:
+        :param b:
+        """
+        return self.graph[a.label].get(b.label)
+
+    def region_path(self, start: Region, goal: Region) -> List[Region]:
+        """
+        Returns the regions on a path from start to goal that passes the fewest chokes, including start and goal.
+        Returns an empty list if the goal can not be reached.
+
+        :param start:
+        :param goal:
+        """
+        previous: Dict[int, int] = {start.label: start.label}
+        queue: Deque[int] = deque([start.label])
+        while queue:
+            label = queue.popleft()
+            if label == goal.label:
+                path = [label]
+                while path[-1] != start.label:
+                    path.append(previous[path[-1]])
+                return [self.regions[label] for label in reversed(path)]
+            for neighbor in self.graph[label]:
+                if neighbor not in previous:
+                    previous[neighbor] = label
+                    queue.append(neighbor)
+        return []
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from contextlib import ExitStack
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+# Every record starts with the record type (1 byte) and the length of the compressed response (4 bytes)
+_HEADER = struct.Struct("<BI")
+_MAGIC = b"SC2OBS1\n"
+
+# Responses that are needed to recreate a bot without SC2, by the name of their field in sc_pb.Response
+RECORD_TYPES = {"data": 1, "game_info": 2, "ping": 3, "observation": 4}
+_RECORD_NAMES = {record_type: name for name, record_type in RECORD_TYPES.items()}
+
+
+class ObservationRecorder:
+
+    def __init__(self, path: Union[str, Path], compression_level: int = 1):
+        """
+        Appends the game data, game info, ping and observation responses of a game to a file.
+        Each response is compressed on its own and written immediately,
+        so the file can be read while the game is running and stays valid if the game crashes.
+
+        Example::
+
+            run_game(maps.get("AcidPlantLE"), [Bot(Race.Zerg, MyBot()), Computer(Race.Terran, Difficulty.Easy)],
+                     record_observations_as="acid_plant.sc2obs")
+            # Later, without SC2
+            run_recorded(MyBot(), "acid_plant.sc2obs")
+
+        :param path:
+        :param compression_level: zlib compression level
+        """
+        self.path = Path(path)
+        self.compression_level = compression_level
+        # Closes the file in 'close'
+        self._exit_stack = ExitStack()
+        self._file: BinaryIO = self._exit_stack.enter_context(open(self.path, "wb"))
+        self._file.write(_MAGIC)
+
+    def record(self, response: sc_pb.Response, response_bytes: Optional[bytes] = None):
+        """
+        Writes the response if it is of a recorded type, other responses are ignored.
+
+        :param response:
+        :param response_bytes: The serialized response, if it is already available
+        """
+        record_type = RECORD_TYPES.get(response.WhichOneof("response"))
+        if record_type is None or self._file.closed:
+            return
+        if response_bytes is None:
+            response_bytes = response.SerializeToString()
+        compressed = zlib.compress(response_bytes, self.compression_level)
+        self._file.write(_HEADER.pack(record_type, len(compressed)))
+        self._file.write(compressed)
+        self._file.flush()
+
+    def close(self):
+        self._exit_stack.close()
+
+    def __enter__(self) -> ObservationRecorder:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ObservationReader:
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Reads files written by ObservationRecorder. Only the record headers are read on creation,
+        responses are decompressed and parsed when they are accessed.
+
+        Example::
+
+            reader = ObservationReader("acid_plant.sc2obs")
+            last_observation = reader.observation(len(reader) - 1)
+
+        :param path:
+        """
+        self.path = Path(path)
+        # (record type name, offset of the compressed response, compressed length)
+        self._index: List[Tuple[str, int, int]] = []
+        with open(self.path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                raise ValueError(f"{self.path} is not an observation recording")
+            offset = len(_MAGIC)
+            while True:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    break
+                record_type, length = _HEADER.unpack(header)
+                offset += _HEADER.size
+                if offset + length > self.path.stat().st_size:
+                    # The last record was not written completely, e.g. because the game crashed
+                    break
+                self._index.append((_RECORD_NAMES[record_type], offset, length))
+                offset += length
+                f.seek(offset)
+        self._observation_indices: List[int] = [i for i, record in enumerate(self._index) if record[0] == "observation"]
+
+    def __len__(self) -> int:
+        """ Returns the number of recorded observations. """
+        return len(self._observation_indices)
+
+    def _read(self, f: BinaryIO, index: int) -> sc_pb.Response:
+        _name, offset, length = self._index[index]
+        f.seek(offset)
+        response = sc_pb.Response()
+        response.ParseFromString(zlib.decompress(f.read(length)))
+        return response
+
+    def observation(self, index: int) -> sc_pb.Response:
+        """
+        Returns the observation response with the given index, without reading the records before it.
+
+        :param index:
+        """
+        with open(self.path, "rb") as f:
+            return self._read(f, self._observation_indices[index])
+
+    def __iter__(self) -> Iterator[Tuple[str, sc_pb.Response]]:
+        """ Yields all records in the order they were recorded, as (field name in sc_pb.Response, response). """
+        with open(self.path, "rb") as f:
+            for index, (name, _offset, _length) in enumerate(self._index):
+                yield name, self._read(f, index)
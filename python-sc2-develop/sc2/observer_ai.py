@@ -10,7 +10,6 @@ from typing import TYPE_CHECKING, List, Union
 
 from sc2.bot_ai_internal import BotAIInternal
 from sc2.data import Alert, Result
-from sc2.game_data import GameData
 from sc2.ids.ability_id import AbilityId
 from sc2.ids.upgrade_id import UpgradeId
 from sc2.position import Point2
@@ -18,8 +17,7 @@ from sc2.unit import Unit
 from sc2.units import Units
 
 if TYPE_CHECKING:
-    from sc2.client import Client
-    from sc2.game_info import GameInfo
+    from sc2.ids.unit_typeid import UnitTypeId
 
 
 class ObserverAI(BotAIInternal):
@@ -36,21 +34,6 @@ class ObserverAI(BotAIInternal):
         t = self.time
         return f"{int(t // 60):02}:{int(t % 60):02}"
 
-    @property
-    def game_info(self) -> GameInfo:
-        """ See game_info.py """
-        return self._game_info
-
-    @property
-    def game_data(self) -> GameData:
-        """ See game_data.py """
-        return self._game_data
-
-    @property
-    def client(self) -> Client:
-        """ See client.py """
-        return self._client
-
     def alert(self, alert_code: Alert) -> bool:
         """
         Check if alert is triggered in the current step.
@@ -136,6 +119,13 @@ class ObserverAI(BotAIInternal):
 
         :param unit:"""
 
+    async def on_unit_type_changed(self, unit: Unit, previous_type: UnitTypeId):
+        """Override this in your bot class. This function is called when a unit type has changed.
+
+        :param unit:
+        :param previous_type:
+        """
+
     async def on_building_construction_started(self, unit: Unit):
         """
         Override this in your bot class.
@@ -159,6 +149,28 @@ class ObserverAI(BotAIInternal):
         :param upgrade:
         """
 
+    async def on_unit_took_damage(self, unit: Unit, amount_damage_taken: float):
+        """
+        Override this in your bot class. This function is called when a unit of the observed player took damage.
+
+        :param unit:
+        :param amount_damage_taken:
+        """
+
+    async def on_enemy_unit_entered_vision(self, unit: Unit):
+        """
+        Override this in your bot class. This function is called when an enemy unit of the observed player entered vision.
+
+        :param unit:
+        """
+
+    async def on_enemy_unit_left_vision(self, unit_tag: int):
+        """
+        Override this in your bot class. This function is called when an enemy unit of the observed player left vision.
+
+        :param unit_tag:
+        """
+
     async def on_start(self):
         """
         Override this in your bot class. This function is called after "on_start".
@@ -1,7 +1,8 @@
 from pathlib import Path
-from typing import Callable, FrozenSet, List, Set, Tuple, Union
+from typing import Callable, Dict, FrozenSet, List, Optional, Set, Tuple, Union
 
 import numpy as np
+from loguru import logger
 
 from sc2.position import Point2
 
@@ -10,20 +11,35 @@ class PixelMap:
 
     def __init__(self, proto, in_bits: bool = False):
         """
+        The data is decoded lazily on first access of 'data_numpy'.
+        Maps with one byte per pixel are read-only views on the proto buffer, they are copied on the first write.
+
         :param proto:
         :param in_bits:
         """
         self._proto = proto
         # Used for copying pixelmaps
         self._in_bits: bool = in_bits
+        # Decoded data, see 'data_numpy'
+        self._data_numpy: Optional[np.ndarray] = None
 
         assert self.width * self.height == (8 if in_bits else 1) * len(
             self._proto.data
         ), f"{self.width * self.height} {(8 if in_bits else 1)*len(self._proto.data)}"
-        buffer_data = np.frombuffer(self._proto.data, dtype=np.uint8)
-        if in_bits:
-            buffer_data = np.unpackbits(buffer_data)
-        self.data_numpy = buffer_data.reshape(self._proto.size.y, self._proto.size.x)
+
+    @property
+    def data_numpy(self) -> np.ndarray:
+        """ Returns the data as numpy array of shape (height, width), indexed by [y, x]. """
+        if self._data_numpy is None:
+            buffer_data = np.frombuffer(self._proto.data, dtype=np.uint8)
+            if self._in_bits:
+                buffer_data = np.unpackbits(buffer_data)
+            self._data_numpy = buffer_data.reshape(self._proto.size.y, self._proto.size.x)
+        return self._data_numpy
+
+    @data_numpy.setter
+    def data_numpy(self, data: np.ndarray):
+        self._data_numpy = data
 
     @property
     def width(self) -> int:
@@ -55,7 +71,11 @@ class PixelMap:
             0 <= value <= 254 * self._in_bits + 1
         ), f"value is {value}, it should be between 0 and {254 * self._in_bits + 1}"
         assert isinstance(value, int), f"value is of type {type(value)}, it should be an integer"
-        self.data_numpy[pos[1], pos[0]] = value
+        data = self.data_numpy
+        if not data.flags.writeable:
+            # Copy on write: the array is a view on the proto buffer or on the data of the pixelmap this was copied from
+            data = self._data_numpy = data.copy()
+        data[pos[1], pos[0]] = value
 
     def is_set(self, p: Tuple[int, int]) -> bool:
         return self[p] != 0
@@ -64,7 +84,19 @@ class PixelMap:
         return not self.is_set(p)
 
     def copy(self) -> "PixelMap":
-        return PixelMap(self._proto, in_bits=self._in_bits)
+        """
+        Returns a copy of this pixelmap. The copy decodes the proto data itself if this pixelmap was not decoded yet.
+        Read-only data, e.g. of byte maps that were not changed, is shared with the copy until the copy is changed
+        with '__setitem__'. Writable data is copied, so that this pixelmap stays writable.
+        """
+        pixel_map = PixelMap(self._proto, in_bits=self._in_bits)
+        data = self._data_numpy
+        if data is not None:
+            if data.flags.writeable:
+                pixel_map.data_numpy = data.copy()
+            else:
+                pixel_map.data_numpy = data.view()
+        return pixel_map
 
     def flood_fill(self, start_point: Point2, pred: Callable[[int], bool]) -> Set[Point2]:
         nodes: Set[Point2] = set()
@@ -98,18 +130,18 @@ class PixelMap:
         return groups
 
     def print(self, wide: bool = False) -> None:
-        for y in range(self.height):
-            for x in range(self.width):
-                print("#" if self.is_set((x, y)) else " ", end=(" " if wide else ""))
-            print("")
+        separator = " " if wide else ""
+        rows = np.where(self.data_numpy != 0, "#", " ")
+        print("\n".join(separator.join(row) + separator for row in rows))
 
     def save_image(self, filename: Union[str, Path]):
-        data = [(0, 0, self[x, y]) for y in range(self.height) for x in range(self.width)]
+        # Pixel values are stored in the blue channel
+        data = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        data[:, :, 2] = self.data_numpy
         # pylint: disable=C0415
         from PIL import Image
 
-        im = Image.new("RGB", (self.width, self.height))
-        im.putdata(data)  # type: ignore
+        im = Image.fromarray(data)
         im.save(filename)
 
     def plot(self):
@@ -118,3 +150,93 @@ class PixelMap:
 
         plt.imshow(self.data_numpy, origin="lower")
         plt.show()
+
+
+class PixelMapRecorder:
+
+    def __init__(self, memmap_folder: Optional[Union[str, Path]] = None, max_frames: int = 0):
+        """
+        Collects frames of pixel maps (e.g. visibility, creep, pathing grid) for offline analysis.
+        By default, frames are kept in memory and written to a single compressed .npz file with 'save'.
+        If 'memmap_folder' is given, each map is written directly to a memory mapped '<name>.npy' file in that folder
+        which holds up to 'max_frames' frames, so long games do not have to fit into memory.
+        The game loop of each frame is stored under the name 'game_loop'.
+
+        Example::
+
+            from sc2.pixel_map import PixelMapRecorder
+
+            async def on_start(self):
+                self.recorder = PixelMapRecorder()
+
+            async def on_step(self, iteration: int):
+                self.recorder.add(
+                    self.state.game_loop,
+                    visibility=self.state.visibility,
+                    creep=self.state.creep,
+                    pathing_grid=self.game_info.pathing_grid,
+                )
+
+            async def on_end(self, game_result: Result):
+                self.recorder.save("frames.npz")
+
+        Load the frames with 'np.load("frames.npz")' or 'np.load("folder/visibility.npy", mmap_mode="r")'.
+
+        :param memmap_folder:
+        :param max_frames:
+        """
+        assert memmap_folder is None or max_frames > 0, "max_frames is required when writing to memory mapped files"
+        self.memmap_folder: Optional[Path] = Path(memmap_folder) if memmap_folder is not None else None
+        self.max_frames: int = max_frames
+        self.game_loops: List[int] = []
+        self._frames: Dict[str, List[np.ndarray]] = {}
+        self._memmaps: Dict[str, np.memmap] = {}
+
+    def __len__(self) -> int:
+        return len(self.game_loops)
+
+    def add(self, game_loop: int, **pixel_maps: Union[PixelMap, np.ndarray]):
+        """
+        Adds one frame. The same names have to be used in every frame.
+
+        :param game_loop:
+        :param pixel_maps:
+        """
+        if self.memmap_folder is not None and len(self.game_loops) >= self.max_frames:
+            logger.warning(f"PixelMapRecorder is full ({self.max_frames} frames), frame {game_loop} was not recorded")
+            return
+        frame_index = len(self.game_loops)
+        self.game_loops.append(game_loop)
+        for name, pixel_map in pixel_maps.items():
+            data = pixel_map.data_numpy if isinstance(pixel_map, PixelMap) else pixel_map
+            if self.memmap_folder is None:
+                self._frames.setdefault(name, []).append(data.copy())
+                continue
+            memmap = self._memmaps.get(name)
+            if memmap is None:
+                self.memmap_folder.mkdir(parents=True, exist_ok=True)
+                memmap = np.lib.format.open_memmap(
+                    self.memmap_folder / f"{name}.npy",
+                    mode="w+",
+                    dtype=data.dtype,
+                    shape=(self.max_frames, ) + data.shape,
+                )
+                self._memmaps[name] = memmap
+            memmap[frame_index] = data
+
+    def save(self, filename: Optional[Union[str, Path]] = None):
+        """
+        Writes all frames to a compressed .npz file, or flushes the memory mapped files if a 'memmap_folder' was given.
+        Memory mapped files always hold 'max_frames' frames, use 'game_loop.npy' to find out how many were recorded.
+
+        :param filename:
+        """
+        game_loops = np.array(self.game_loops, dtype=np.int64)
+        if self.memmap_folder is None:
+            assert filename is not None, "A filename is required to save the frames"
+            frames = {name: np.stack(frames) for name, frames in self._frames.items()}
+            np.savez_compressed(filename, game_loop=game_loops, **frames)
+            return
+        for memmap in self._memmaps.values():
+            memmap.flush()
+        np.save(self.memmap_folder / "game_loop.npy", game_loops)
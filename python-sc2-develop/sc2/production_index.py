@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from typing import TYPE_CHECKING
+from typing import Counter as CounterType
+from typing import DefaultDict, Dict, Iterable, List, Set, Tuple, Union
+
+from sc2.constants import CREATION_ABILITY_FIX, IS_CONSTRUCTING_SCV, TERRAN_STRUCTURES_REQUIRE_SCV
+from sc2.data import Race
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+if TYPE_CHECKING:
+    from sc2.bot_ai_internal import BotAIInternal
+    from sc2.game_data import UnitTypeData
+    from sc2.unit import Unit
+
+WORKER_TYPES: Set[UnitTypeId] = {UnitTypeId.DRONE, UnitTypeId.DRONEBURROWED, UnitTypeId.SCV, UnitTypeId.PROBE}
+
+
+class ProductionIndex:
+
+    def __init__(self, bot: BotAIInternal):
+        """
+        Production state of the own units of one frame, collected in a single pass over 'bot.all_own_units'.
+        Answers already_pending, already_pending_upgrade, structure_type_build_progress, worker_en_route_to_build,
+        structures_without_construction_SCVs and train with lookups instead of scanning all units on every call.
+        Use 'self._production_index' of the bot, which is built at most once per frame.
+
+        :param bot:
+        """
+        # Orders of all own units plus units and structures that are not ready, by exact creation ability.
+        # Includes protoss units warping in, all units in production, all structures and all morphs
+        self.ability_count: CounterType[AbilityId] = Counter()
+        # Highest build progress of the units and structures that are not ready, by exact creation ability
+        self.ability_max_progress: Dict[AbilityId, float] = {}
+        # Orders of workers by exact ability, without SCVs that construct or resume a structure
+        self.worker_orders: CounterType[AbilityId] = Counter()
+        # Progress of the first order with this exact ability of a ready structure, e.g. of upgrades in research
+        self.structure_order_progress: Dict[AbilityId, float] = {}
+        # Highest build progress of own structures by unit type value
+        self.structure_type_progress: Dict[int, float] = {}
+        # Own structures by type, in the order of the observation
+        self.structures_by_type: DefaultDict[UnitTypeId, List[Unit]] = defaultdict(list)
+        # Structure tag to its number of orders
+        self.queue_length: Dict[int, int] = {}
+        # Tags of structures that have a reactor or techlab attached
+        self.reactor_structure_tags: Set[int] = set()
+        self.techlab_structure_tags: Set[int] = set()
+        # Positions and tags that SCVs are constructing at
+        self.construction_targets: Set[Union[Point2, int]] = set()
+        # Structures that need an SCV to be constructed, in any build progress
+        self.scv_structures: List[Unit] = []
+
+        # Structure tag to the position of the structure in the observation
+        self.structure_order: Dict[int, int] = {}
+
+        check_creation = bot.race != Race.Terran
+        game_data_units = bot.game_data.units
+        add_on_tags = bot.reactor_tags, bot.techlab_tags
+        scv_structure_targets: Set[Union[Point2, int]] = set()
+        worker_orders: List[Tuple[AbilityId, Union[Point2, int, None]]] = []
+        unit: Unit
+        for unit in bot.all_own_units:
+            for order in unit.orders:
+                self.ability_count[order.ability.exact_id] += 1
+            is_structure = unit.is_structure
+            if is_structure:
+                self._add_structure(unit, scv_structure_targets, add_on_tags)
+            elif unit.type_id in WORKER_TYPES:
+                self._add_worker(unit, worker_orders)
+            if unit.build_progress < 1 and (check_creation or not is_structure):
+                self._add_in_progress(unit, game_data_units)
+
+        for ability, target in worker_orders:
+            # Skip if the SCV is constructing (target is a Point2) or resuming construction (target is a tag)
+            if target not in scv_structure_targets:
+                self.worker_orders[ability] += 1
+
+    def _add_structure(
+        self, unit: Unit, scv_structure_targets: Set[Union[Point2, int]], add_on_tags: Tuple[Set[int], Set[int]]
+    ):
+        orders = unit.orders
+        build_progress = unit.build_progress
+        self.structure_order[unit.tag] = len(self.structure_order)
+        self.structures_by_type[unit.type_id].append(unit)
+        self.queue_length[unit.tag] = len(orders)
+        type_value = unit.type_id.value
+        if build_progress > self.structure_type_progress.get(type_value, 0):
+            self.structure_type_progress[type_value] = build_progress
+        if build_progress == 1:
+            for order in orders:
+                self.structure_order_progress.setdefault(order.ability.exact_id, order.progress)
+        if unit.type_id in TERRAN_STRUCTURES_REQUIRE_SCV:
+            self.scv_structures.append(unit)
+            scv_structure_targets.add(unit.position)
+            scv_structure_targets.add(unit.tag)
+        add_on_tag = unit.add_on_tag
+        if add_on_tag:
+            reactor_tags, techlab_tags = add_on_tags
+            if add_on_tag in reactor_tags:
+                self.reactor_structure_tags.add(unit.tag)
+            elif add_on_tag in techlab_tags:
+                self.techlab_structure_tags.add(unit.tag)
+
+    def _add_worker(self, unit: Unit, worker_orders: List[Tuple[AbilityId, Union[Point2, int, None]]]):
+        orders = unit.orders
+        for order in orders:
+            worker_orders.append((order.ability.exact_id, order.target))
+        # Same as 'unit.is_constructing_scv', repairing workers are ignored
+        if orders and orders[0].ability.id in IS_CONSTRUCTING_SCV:
+            # When a construction is resumed, the target is the tag of the structure, else it is a Point2
+            self.construction_targets.update(order.target for order in orders)
+
+    def _add_in_progress(self, unit: Unit, game_data_units: Dict[int, UnitTypeData]):
+        type_id = unit.type_id
+        # If an SCV is constructing a building, already_pending would count this structure twice
+        # (once from the SCV order, and once from "not structure.is_ready")
+        if type_id in CREATION_ABILITY_FIX:
+            if type_id == UnitTypeId.ARCHON:
+                # Hotfix for archons in morph state
+                creation_ability = AbilityId.ARCHON_WARP_TARGET
+                self.ability_count[creation_ability] += 2
+            else:
+                # Hotfix for rich geysirs
+                creation_ability = CREATION_ABILITY_FIX[type_id]
+                self.ability_count[creation_ability] += 1
+        else:
+            creation_ability = game_data_units[type_id.value].creation_ability.exact_id
+            self.ability_count[creation_ability] += 1
+        self.ability_max_progress[creation_ability] = max(
+            self.ability_max_progress.get(creation_ability, 0), unit.build_progress
+        )
+
+    def structures_of_types(self, type_ids: Iterable[UnitTypeId]) -> List[Unit]:
+        """
+        Returns the own structures of the given types in the order of the observation,
+        so that the result does not depend on the iteration order of 'type_ids', e.g. of a set.
+
+        :param type_ids:
+        """
+        structures = [structure for type_id in type_ids for structure in self.structures_by_type.get(type_id, [])]
+        structures.sort(key=lambda structure: self.structure_order[structure.tag])
+        return structures
+
+    def build_slots(self, structure: Unit) -> int:
+        """ Returns how many more units the structure can start training this frame without queueing them. """
+        return 1 + (structure.tag in self.reactor_structure_tags) - self.queue_length.get(structure.tag, 0)
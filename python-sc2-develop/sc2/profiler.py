@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Counter as CounterType
+from typing import Iterator, List, Optional, Tuple, Union
+
+# Stack of samples where the bot was not running python code in on_step, e.g. while waiting for a query response
+AWAIT_FRAME: str = "<await>"
+
+
+class StepProfiler:
+
+    def __init__(self, interval: float = 0.001):
+        """
+        Sampling profiler for on_step. A background thread records the python stack of the thread that created
+        the profiler every 'interval' seconds, but only while 'sampling' is active.
+        The samples can be written as collapsed stacks, which can be turned into a flamegraph with
+        flamegraph.pl or speedscope, and summarized as the functions that took the most time.
+
+        Used by 'run_game(..., profile_on_step_as="profile.txt")', which writes the collapsed stacks at the
+        end of the game and logs the summary.
+
+        Example::
+
+            profiler = StepProfiler()
+            profiler.start()
+            with profiler.sampling():
+                await bot.on_step(iteration)
+            profiler.stop()
+            profiler.write("profile.txt")
+            print(profiler.summary())
+
+        :param interval: Seconds between two samples
+        """
+        self.interval: float = interval
+        # Stacks from the outermost frame to the innermost frame, to the number of samples
+        self.stacks: CounterType[Tuple[str, ...]] = Counter()
+        self._thread_id: int = threading.get_ident()
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval: Optional[float] = None
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def start(self):
+        """ Starts the sampling thread. Samples are only taken in 'sampling' blocks. """
+        if self._thread is not None:
+            return
+        # The sampling thread can only run when the bot releases the GIL, by default every 5ms
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="StepProfiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stops the sampling thread. """
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._active.set()
+        self._thread.join()
+        self._thread = None
+        self._active.clear()
+        sys.setswitchinterval(self._switch_interval)
+
+    @contextmanager
+    def sampling(self) -> Iterator[None]:
+        """ Takes samples while the block runs. """
+        self._active.set()
+        try:
+            yield
+        finally:
+            self._active.clear()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._active.wait()
+            if self._stopped.is_set():
+                return
+            # sys._current_frames is the only way to read the stack of another thread
+            frame = sys._current_frames().get(self._thread_id)  # pylint: disable=W0212
+            if frame is not None and self._active.is_set():
+                self.stacks[self._stack(frame)] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _stack(frame: Optional[FrameType]) -> Tuple[str, ...]:
+        """ Returns the stack from the outermost on_step frame to the given frame. """
+        frames: List[str] = []
+        on_step_depth: Optional[int] = None
+        while frame is not None:
+            code = frame.f_code
+            if code.co_name == "on_step":
+                on_step_depth = len(frames)
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        if on_step_depth is None:
+            # on_step is suspended and the event loop waits for a response
+            return (AWAIT_FRAME, )
+        return tuple(reversed(frames[:on_step_depth + 1]))
+
+    def write(self, path: Union[str, Path]):
+        """
+        Writes the samples as collapsed stacks, one line per stack: 'outer;inner;innermost count'
+
+        :param path:
+        """
+        with open(path, "w") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def top(self, n: int = 20) -> List[Tuple[str, float, float]]:
+        """
+        Returns the n functions with the most samples as (function, self fraction, total fraction).
+        The self fraction counts samples where the function itself was running,
+        the total fraction also counts samples where it was waiting for a function it called.
+
+        :param n:
+        """
+        samples = self.samples
+        if not samples:
+            return []
+        self_counts: CounterType[str] = Counter()
+        total_counts: CounterType[str] = Counter()
+        for stack, count in self.stacks.items():
+            self_counts[stack[-1]] += count
+            for function in set(stack):
+                total_counts[function] += count
+        return [
+            (function, self_count / samples, total_counts[function] / samples)
+            for function, self_count in self_counts.most_common(n)
+        ]
+
+    def summary(self, n: int = 20) -> str:
+        """
+        Returns the top n functions as a table.
+
+        :param n:
+        """
+        lines = [f"{self.samples} samples of on_step, top {n} functions by self time:", "   self   total  function"]
+        for function, self_fraction, total_fraction in self.top(n):
+            lines.append(f"{self_fraction:7.1%} {total_fraction:7.1%}  {function}")
+        return "\n".join(lines)
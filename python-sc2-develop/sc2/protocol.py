@@ -1,13 +1,19 @@
 import asyncio
-import sys
+import time
+from collections import deque
 from contextlib import suppress
+from typing import TYPE_CHECKING, Deque, Optional
 
-from aiohttp import ClientWebSocketResponse
+from aiohttp import ClientError, ClientWebSocketResponse
 from loguru import logger
 from s2clientprotocol import sc2api_pb2 as sc_pb
 
 from sc2.data import Status
 
+if TYPE_CHECKING:
+    from sc2.observation_recorder import ObservationRecorder
+    from sc2.step_timer import StepTimer
+
 
 class ProtocolError(Exception):
 
@@ -30,42 +36,114 @@ class Protocol:
         assert ws
         self._ws: ClientWebSocketResponse = ws
         self._status: Status = None
-
-    async def __request(self, request):
+        # If True, requests are sent without waiting for the response of the previous request, so that
+        # independent requests can be overlapped with asyncio.gather. SC2 answers requests in the order they were sent.
+        self.pipelined: bool = False
+        # Futures of sent requests that wait for their response, in the order the requests were sent
+        self._pending: Deque[asyncio.Future] = deque()
+        self._reader: Optional[asyncio.Task] = None
+        # Only used if not pipelined, to send the next request only after the previous one was answered
+        self._lock: Optional[asyncio.Lock] = None
+        # If set, game data, game info, ping and observation responses are written to a file
+        self._recorder: Optional["ObservationRecorder"] = None
+        # If set, the time until each response arrived and the time to parse it are measured
+        self.step_timer: Optional["StepTimer"] = None
+
+    async def _read_responses(self):
+        """ Receives responses as long as requests are waiting for them and passes them to the request futures. """
+        while self._pending:
+            try:
+                response_bytes = await self._ws.receive_bytes()
+            except TypeError as exc:
+                if self._status == Status.ended:
+                    logger.info("Cannot receive: Game has already ended.")
+                    error = ConnectionAlreadyClosed("Game has already ended")
+                else:
+                    logger.error("Cannot receive: Connection already closed.")
+                    error = ConnectionAlreadyClosed("Connection already closed.")
+                error.__cause__ = exc
+                self._fail_pending(error)
+                return
+            except (ClientError, ConnectionError, asyncio.TimeoutError) as exc:
+                logger.error(f"Cannot receive: {exc!r}")
+                self._fail_pending(exc)
+                return
+            except asyncio.CancelledError:
+                self._fail_pending(None)
+                raise
+            except Exception as exc:
+                # Not a connection error, e.g. a bug: the waiting requests fail with it and it is raised in this task
+                self._fail_pending(exc)
+                raise
+            future = self._pending.popleft()
+            # The future of a cancelled request stays in the queue, so that its response is consumed and dropped here
+            if not future.done():
+                future.set_result(response_bytes)
+
+    def _fail_pending(self, error: Optional[BaseException]):
+        """ Fails all requests that are waiting for a response. Cancels them if 'error' is None. """
+        while self._pending:
+            future = self._pending.popleft()
+            if future.done():
+                continue
+            if error is None:
+                future.cancel()
+            else:
+                future.set_exception(error)
+
+    async def __request(self, request, name: str):
+        if self.pipelined:
+            return await self.__send_and_receive(request, name)
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            return await self.__send_and_receive(request, name)
+
+    async def __send_and_receive(self, request, name: str):
         logger.debug(f"Sending request: {request !r}")
+        step_timer = self.step_timer
+        if step_timer is not None:
+            t0 = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        # Queued before sending: the frame is written before send_bytes waits for the transport to drain,
+        # so a request that is cancelled while sending keeps its place in the queue and its response is dropped
+        self._pending.append(future)
         try:
             await self._ws.send_bytes(request.SerializeToString())
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
         except TypeError as exc:
+            self._pending.remove(future)
             logger.exception("Cannot send: Connection already closed.")
             raise ConnectionAlreadyClosed("Connection already closed.") from exc
+        except Exception:
+            # Nothing was sent, e.g. the transport is closing
+            self._pending.remove(future)
+            raise
         logger.debug("Request sent")
 
-        response = sc_pb.Response()
-        try:
-            response_bytes = await self._ws.receive_bytes()
-        except TypeError as exc:
-            if self._status == Status.ended:
-                logger.info("Cannot receive: Game has already ended.")
-                raise ConnectionAlreadyClosed("Game has already ended") from exc
-            logger.error("Cannot receive: Connection already closed.")
-            raise ConnectionAlreadyClosed("Connection already closed.") from exc
-        except asyncio.CancelledError:
-            # If request is sent, the response must be received before reraising cancel
-            try:
-                await self._ws.receive_bytes()
-            except asyncio.CancelledError:
-                logger.critical("Requests must not be cancelled multiple times")
-                sys.exit(2)
-            raise
+        if self._reader is None or self._reader.done():
+            self._reader = asyncio.create_task(self._read_responses())
+        response_bytes = await future
 
+        if step_timer is not None:
+            t1 = time.perf_counter()
+            step_timer.add(f"request_{name}", t1 - t0)
+        response = sc_pb.Response()
         response.ParseFromString(response_bytes)
+        if step_timer is not None:
+            step_timer.add(f"parse_{name}", time.perf_counter() - t1)
         logger.debug("Response received")
+        if self._recorder is not None:
+            self._recorder.record(response, response_bytes)
         return response
 
     async def _execute(self, **kwargs):
         assert len(kwargs) == 1, "Only one request allowed by the API"
 
-        response = await self.__request(sc_pb.Request(**kwargs))
+        name = next(iter(kwargs))
+        response = await self.__request(sc_pb.Request(**kwargs), name)
 
         new_status = Status(response.status)
         if new_status != self._status:
@@ -5,6 +5,7 @@ import platform
 import subprocess
 import time
 import traceback
+from typing import List, Optional, Set, Tuple
 
 from aiohttp import WSMsgType, web
 from loguru import logger
@@ -13,6 +14,40 @@ from s2clientprotocol import sc2api_pb2 as sc_pb
 from sc2.controller import Controller
 from sc2.data import Result, Status
 from sc2.player import BotProcess
+from sc2.wire_format import find_field, read_varint, scan_fields
+
+# Field numbers of the messages that the proxy looks at, all other fields are forwarded without decoding them
+_REQUEST_FIELDS = sc_pb.Request.DESCRIPTOR.fields_by_name
+INSPECTED_REQUESTS: Set[int] = {_REQUEST_FIELDS[name].number for name in ["join_game", "leave_game", "quit"]}
+_RESPONSE_FIELDS = sc_pb.Response.DESCRIPTOR.fields_by_name
+RESPONSE_STATUS: int = _RESPONSE_FIELDS["status"].number
+RESPONSE_JOIN_GAME: int = _RESPONSE_FIELDS["join_game"].number
+RESPONSE_OBSERVATION: int = _RESPONSE_FIELDS["observation"].number
+OBSERVATION_PLAYER_RESULT: int = sc_pb.ResponseObservation.DESCRIPTOR.fields_by_name["player_result"].number
+OBSERVATION_OBSERVATION: int = sc_pb.ResponseObservation.DESCRIPTOR.fields_by_name["observation"].number
+OBSERVATION_GAME_LOOP: int = sc_pb.Observation.DESCRIPTOR.fields_by_name["game_loop"].number
+
+
+def _scan_observation(data: bytes, start: int, end: int,
+                      read_game_loop: bool) -> Tuple[List[sc_pb.PlayerResult], Optional[int]]:
+    """
+    Returns the player results and the game loop of the ResponseObservation in data[start:end].
+    The game loop is only read if 'read_game_loop' is set, otherwise it is None.
+
+    :param data:
+    :param start:
+    :param end:
+    :param read_game_loop:
+    """
+    player_results = []
+    game_loop = None
+    for field_number, _wire_type, field_start, field_end in scan_fields(data, start, end):
+        if field_number == OBSERVATION_PLAYER_RESULT:
+            player_results.append(sc_pb.PlayerResult.FromString(data[field_start:field_end]))
+        elif field_number == OBSERVATION_OBSERVATION and read_game_loop:
+            game_loop_field = find_field(data, OBSERVATION_GAME_LOOP, field_start, field_end)
+            game_loop = read_varint(data, game_loop_field[0])[0] if game_loop_field else 0
+    return player_results, game_loop
 
 
 class Proxy:
@@ -43,6 +78,10 @@ class Proxy:
         self.done = False
 
     async def parse_request(self, msg):
+        if not any(field_number in INSPECTED_REQUESTS for field_number, *_ in scan_fields(msg.data)):
+            # Forward the request as it is
+            await self.controller._ws.send_bytes(msg.data)
+            return
         request = sc_pb.Request()
         request.ParseFromString(msg.data)
         if request.HasField("quit"):
@@ -79,36 +118,47 @@ class Proxy:
             logger.exception(f"Caught unknown exception: {e}")
         return response_bytes
 
-    async def parse_response(self, response_bytes):
-        response = sc_pb.Response()
-        response.ParseFromString(response_bytes)
+    async def parse_response(self, response_bytes: bytes) -> bytes:
+        """
+        Looks at the status, join game and observation result of a response, and returns the bytes to forward
+        to the bot. Only the small fields that are needed are decoded, the observation itself is skipped.
 
-        if not response.HasField("status"):
-            logger.critical("Proxy: RESPONSE HAS NO STATUS {response}")
+        :param response_bytes:
+        """
+        status = None
+        join_game = None
+        observation = None
+        for field_number, _wire_type, start, end in scan_fields(response_bytes):
+            if field_number == RESPONSE_STATUS:
+                status, _ = read_varint(response_bytes, start)
+            elif field_number == RESPONSE_JOIN_GAME:
+                join_game = start, end
+            elif field_number == RESPONSE_OBSERVATION:
+                observation = start, end
+
+        if status is None:
+            logger.critical(f"Proxy: RESPONSE HAS NO STATUS {sc_pb.Response.FromString(response_bytes)}")
         else:
-            new_status = Status(response.status)
+            new_status = Status(status)
             if new_status != self.controller._status:
                 logger.info(f"Controller({self.player.name}): {self.controller._status}->{new_status}")
                 self.controller._status = new_status
 
         if self.player_id is None:
-            if response.HasField("join_game"):
-                self.player_id = response.join_game.player_id
+            if join_game is not None:
+                self.player_id = sc_pb.ResponseJoinGame.FromString(response_bytes[join_game[0]:join_game[1]]).player_id
                 logger.info(f"Proxy({self.player.name}): got join_game for {self.player_id}")
 
-        if self.result is None:
-            if response.HasField("observation"):
-                obs: sc_pb.ResponseObservation = response.observation
-                if obs.player_result:
-                    self.result = {pr.player_id: Result(pr.result) for pr in obs.player_result}
-                elif (
-                    self.timeout_loop and obs.HasField("observation") and obs.observation.game_loop > self.timeout_loop
-                ):
-                    self.result = {i: Result.Tie for i in range(1, 3)}
-                    logger.info(f"Proxy({self.player.name}) timing out")
-                    act = [sc_pb.Action(action_chat=sc_pb.ActionChat(message="Proxy: Timing out"))]
-                    await self.controller._execute(action=sc_pb.RequestAction(actions=act))
-        return response
+        if self.result is None and observation is not None:
+            player_results, game_loop = _scan_observation(response_bytes, *observation, bool(self.timeout_loop))
+            if player_results:
+                self.result = {pr.player_id: Result(pr.result) for pr in player_results}
+            elif self.timeout_loop and game_loop is not None and game_loop > self.timeout_loop:
+                self.result = {i: Result.Tie for i in range(1, 3)}
+                logger.info(f"Proxy({self.player.name}) timing out")
+                act = [sc_pb.Action(action_chat=sc_pb.ActionChat(message="Proxy: Timing out"))]
+                await self.controller._execute(action=sc_pb.RequestAction(actions=act))
+        return response_bytes
 
     async def get_result(self):
         try:
@@ -137,8 +187,8 @@ class Proxy:
                     if response_bytes is None:
                         raise ConnectionError("Could not get response_bytes")
 
-                    new_response = await self.parse_response(response_bytes)
-                    await bot_ws.send_bytes(new_response.SerializeToString())
+                    response_bytes = await self.parse_response(response_bytes)
+                    await bot_ws.send_bytes(response_bytes)
 
                 elif msg.type == WSMsgType.CLOSED:
                     logger.error("Client shutdown")
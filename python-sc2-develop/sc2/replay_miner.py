@@ -0,0 +1,281 @@
+# pylint: disable=W0603
+"""
+Batch replay mining: plays a directory of replays on a pool of SC2 processes with ObserverAI
+and writes the features of every observed frame to one columnar .npz file per replay and player.
+
+Example::
+
+    if __name__ == "__main__":
+        results = mine_replays("/data/replays", "/data/features", processes=4, game_step=8)
+        # Features of player 1 in /data/replays/ladder/my_replay.SC2Replay, one array entry per observed frame
+        columns = np.load("/data/features/ladder/my_replay_1.npz")
+"""
+from __future__ import annotations
+
+import os
+import platform
+import shutil
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from loguru import logger
+
+from sc2 import worker_pool
+from sc2.client import Client
+from sc2.main import _play_replay, _setup_replay, get_replay_version
+from sc2.observer_ai import ObserverAI
+
+# Returns the features of the current frame, column name to a number or a fixed shape array
+FeatureExtractor = Callable[[ObserverAI], Dict[str, Any]]
+
+# Version of the SC2 instance of a worker process, the instance is kept while the replays need the same version
+_worker_version: Optional[Tuple[str, str]] = None
+
+
+def basic_features(bot: ObserverAI) -> Dict[str, Any]:
+    """ Economy, supply and unit counts of the observed player, the default feature extractor of mine_replays. """
+    score = bot.state.score
+    return {
+        "game_loop": bot.state.game_loop,
+        "minerals": bot.minerals,
+        "vespene": bot.vespene,
+        "supply_used": bot.supply_used,
+        "supply_cap": bot.supply_cap,
+        "supply_army": bot.supply_army,
+        "supply_workers": bot.supply_workers,
+        "worker_count": bot.workers.amount,
+        "army_count": bot.army_count,
+        "structure_count": bot.structures.amount,
+        "enemy_unit_count": bot.enemy_units.amount,
+        "enemy_structure_count": bot.enemy_structures.amount,
+        "collected_minerals": score.collected_minerals,
+        "collected_vespene": score.collected_vespene,
+        "killed_value_units": score.killed_value_units,
+    }
+
+
+class FeatureColumns:
+    """ Collects the features of each frame as one list per column. """
+
+    def __init__(self):
+        self.columns: Dict[str, List[Any]] = {}
+        self.frames: int = 0
+
+    def append(self, features: Dict[str, Any]):
+        if not self.frames:
+            self.columns = {name: [] for name in features}
+        elif features.keys() != self.columns.keys():
+            raise ValueError(f"Frame {self.frames} has the columns {list(features)}, expected {list(self.columns)}")
+        for name, value in features.items():
+            self.columns[name].append(value)
+        self.frames += 1
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {name: np.asarray(values) for name, values in self.columns.items()}
+
+    def save(self, path: Union[str, Path]):
+        """ Writes the columns as compressed .npz file. The file is replaced at once, so it is never half written. """
+        path = Path(path)
+        temp_path = path.with_name(f"{path.name}.tmp")
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(f, **self.to_arrays())
+        os.replace(temp_path, path)
+
+
+class ReplayMinerAI(ObserverAI):
+    """ Records the features of every step of a replay. """
+
+    def __init__(self, extractor: FeatureExtractor = basic_features):
+        self.extractor: FeatureExtractor = extractor
+        self.features: FeatureColumns = FeatureColumns()
+
+    async def on_step(self, iteration: int):
+        self.features.append(self.extractor(self))
+
+
+@dataclass
+class MinedReplay:
+    replay: str
+    observed_id: int
+    base_build: Optional[str] = None
+    # Path of the .npz file, None if mining failed
+    output: Optional[str] = None
+    frames: int = 0
+    # Seconds to play the replay, without launching SC2
+    mine_time: float = 0
+    skipped: bool = False
+    error: Optional[str] = None
+
+
+@dataclass
+class _ReplayJob:
+    replay_path: Path
+    output_path: Path
+    version: Tuple[str, str]
+    observed_id: int
+    game_step: int
+    extractor: FeatureExtractor
+
+
+def group_replays_by_version(
+    replay_paths: Sequence[Union[str, Path]]
+) -> Tuple[Dict[Tuple[str, str], List[Path]], Dict[Path, str]]:
+    """
+    Returns the replays grouped by (base build, data version) they need, and the errors of the replays
+    whose version could not be read.
+
+    :param replay_paths:
+    """
+    groups: Dict[Tuple[str, str], List[Path]] = defaultdict(list)
+    errors: Dict[Path, str] = {}
+    for replay_path in replay_paths:
+        replay_path = Path(replay_path).absolute()
+        try:
+            version = get_replay_version(replay_path)
+        except Exception as e:  # pylint: disable=W0703
+            logger.warning(f"Could not read the version of replay {replay_path}: {e}")
+            errors[replay_path] = repr(e)
+            continue
+        groups[version].append(replay_path)
+    return dict(groups), errors
+
+
+async def mine_replay_with_client(
+    client: Client,
+    extractor: FeatureExtractor = basic_features,
+    observed_id: int = 1,
+    game_step: int = 8,
+) -> FeatureColumns:
+    """
+    Plays a started replay to its end and returns the features of every observed frame.
+
+    :param client:
+    :param extractor:
+    :param observed_id:
+    :param game_step:
+    """
+    ai = ReplayMinerAI(extractor)
+    await _play_replay(client, ai, realtime=False, player_id=observed_id, game_step=game_step)
+    return ai.features
+
+
+async def _a_mine_replay(job: _ReplayJob) -> MinedReplay:
+    global _worker_version
+    record = MinedReplay(replay=str(job.replay_path), observed_id=job.observed_id, base_build=job.version[0])
+    copied_path: Optional[Path] = None
+    try:
+        if job.version != _worker_version:
+            await worker_pool.maintain_sc2_count(0)
+            _worker_version = job.version
+        base_build, data_version = job.version
+        proc_args = [{"fullscreen": False, "base_build": base_build, "data_hash": data_version}]
+        # Pings the instance kept from the last replay, and replaces it if it crashed or is stuck
+        await worker_pool.maintain_sc2_count(1, proc_args)
+        replay_path = job.replay_path
+        if platform.system() == "Linux":
+            # SC2 on linux only starts replays from this folder, see Controller.start_replay
+            home_replay_folder = Path.home() / "Documents" / "StarCraft II" / "Replays"
+            if replay_path.parent != home_replay_folder:
+                home_replay_folder.mkdir(parents=True, exist_ok=True)
+                # The worker id in the name keeps workers that mine the same replay for other players apart
+                copied_path = home_replay_folder / f"{os.getpid()}_{replay_path.name}"
+                shutil.copyfile(replay_path, copied_path)
+                replay_path = copied_path
+        t0 = time.perf_counter()
+        client = await _setup_replay(worker_pool.controllers[0], str(replay_path), False, job.observed_id)
+        features = await mine_replay_with_client(client, job.extractor, job.observed_id, job.game_step)
+        record.mine_time = time.perf_counter() - t0
+        features.save(job.output_path)
+        record.output = str(job.output_path)
+        record.frames = features.frames
+    except Exception as e:  # pylint: disable=W0703
+        logger.exception(f"Exception {e} thrown while mining replay {job.replay_path}")
+        record.error = repr(e)
+        # The instance may still be in the replay, start the next one on a new instance
+        await worker_pool.maintain_sc2_count(0)
+    finally:
+        if copied_path is not None:
+            copied_path.unlink(missing_ok=True)
+    return record
+
+
+def mine_replays(
+    replay_dir: Union[str, Path],
+    output_dir: Union[str, Path],
+    extractor: FeatureExtractor = basic_features,
+    processes: Optional[int] = None,
+    game_step: int = 8,
+    observed_ids: Sequence[int] = (1, 2),
+    overwrite: bool = False,
+    max_attempts: int = 2,
+) -> List[MinedReplay]:
+    """
+    Mines all replays in 'replay_dir' on a pool of worker processes, each with its own SC2 instance.
+    The replays are grouped by the SC2 version they need and sent to the workers group by group,
+    so that a worker only relaunches SC2 when the version changes or its instance crashed.
+    For every replay and observed player, 'extractor' is called on each step of the replay and its results are
+    written to 'output_dir/<replay folder>/<replay name>_<observed id>.npz', one array per feature,
+    where the replay folder is the folder of the replay relative to 'replay_dir'.
+    Replays whose output already exists are skipped unless 'overwrite' is set, so a run can be resumed.
+    If a worker process dies, the replay it was mining is retried up to 'max_attempts' times.
+
+    The extractor is sent to the workers with pickle, so it has to be defined at module level.
+
+    :param replay_dir: Folder that is searched for .SC2Replay files, including subfolders
+    :param output_dir:
+    :param extractor:
+    :param processes: Number of worker processes, the number of cpus if None
+    :param game_step: Game loops between two observed frames
+    :param observed_ids: Player ids that each replay is mined for
+    :param overwrite:
+    :param max_attempts: Number of times a replay is started if its worker process dies
+    """
+    replay_dir = Path(replay_dir).absolute()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    replay_paths = sorted(replay_dir.rglob("*.SC2Replay"))
+    groups, errors = group_replays_by_version(replay_paths)
+    results: List[MinedReplay] = [
+        MinedReplay(replay=str(replay_path), observed_id=observed_id, error=error)
+        for replay_path, error in errors.items() for observed_id in observed_ids
+    ]
+    jobs: List[_ReplayJob] = []
+    for version, group in sorted(groups.items()):
+        logger.info(f"{len(group)} replays need base build {version[0]}")
+        for replay_path in group:
+            # Keeps replays with the same name in different folders apart
+            output_folder = output_dir / replay_path.parent.relative_to(replay_dir)
+            for observed_id in observed_ids:
+                output_path = output_folder / f"{replay_path.stem}_{observed_id}.npz"
+                if output_path.exists() and not overwrite:
+                    results.append(
+                        MinedReplay(
+                            replay=str(replay_path),
+                            observed_id=observed_id,
+                            base_build=version[0],
+                            output=str(output_path),
+                            skipped=True,
+                        )
+                    )
+                    continue
+                output_folder.mkdir(parents=True, exist_ok=True)
+                jobs.append(_ReplayJob(replay_path, output_path, version, observed_id, game_step, extractor))
+    if not jobs:
+        return results
+
+    # The pool hands out the jobs in order, so the workers mostly get replays of the same version one after another
+    mined = worker_pool.run_jobs(_a_mine_replay, [(job, ) for job in jobs], processes, max_attempts)
+    for count, (index, record, error) in enumerate(mined, start=1):
+        job = jobs[index]
+        if error is not None:
+            logger.error(f"Exception {error!r} thrown while mining replay {job.replay_path}")
+            record = MinedReplay(
+                replay=str(job.replay_path), observed_id=job.observed_id, base_build=job.version[0], error=repr(error)
+            )
+        results.append(record)
+        logger.info(f"Mined replay {count} / {len(jobs)}: {job.replay_path.name}, {record.frames} frames")
+    return results
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import warnings
+from collections import Counter
+from typing import TYPE_CHECKING
+from typing import Counter as CounterType
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from sc2.ids.ability_id import AbilityId
+
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore")
+    from scipy.optimize import linear_sum_assignment
+    from scipy.spatial.distance import cdist
+
+if TYPE_CHECKING:
+    from sc2.bot_ai import BotAI
+    from sc2.unit import Unit
+
+# Exact abilities of worker orders, the orders of the observation are not mapped to the generic HARVEST_GATHER ability
+_GATHER_ABILITIES: Set[AbilityId] = {
+    AbilityId.HARVEST_GATHER,
+    AbilityId.HARVEST_GATHER_SCV,
+    AbilityId.HARVEST_GATHER_PROBE,
+    AbilityId.HARVEST_GATHER_DRONE,
+}
+_RETURN_ABILITIES: Set[AbilityId] = {
+    AbilityId.HARVEST_RETURN,
+    AbilityId.HARVEST_RETURN_SCV,
+    AbilityId.HARVEST_RETURN_PROBE,
+    AbilityId.HARVEST_RETURN_DRONE,
+}
+# Added to the distance to a resource of the type that is not preferred, so that those are only filled afterwards
+_PREFERENCE_PENALTY: float = 1000
+
+
+class SaturationManager:
+
+    def __init__(
+        self,
+        bot: BotAI,
+        workers_per_mineral: int = 2,
+        workers_per_gas: int = 3,
+        base_distance: float = 8,
+        missing_worker_loops: int = 45,
+    ):
+        """
+        Distributes workers to the mineral fields near ready townhalls and to ready gas buildings.
+        Every worker is bound to one resource, and the bindings are kept between steps, so that 'update'
+        only gives commands to workers that are new, idle, wandered off to a full resource, or whose resource is gone.
+        Free workers are assigned to free resource slots at once by solving the assignment problem on the
+        worker x slot distance matrix (scipy's linear_sum_assignment).
+        Workers that receive other orders, e.g. to build or scout, are released and are picked up again once they are idle.
+
+        Example::
+
+            from sc2.saturation_manager import SaturationManager
+
+            async def on_start(self):
+                self.saturation_manager = SaturationManager(self)
+
+            async def on_step(self, iteration: int):
+                self.saturation_manager.update(prefer_gas=self.minerals > 2 * self.vespene)
+
+        :param bot:
+        :param workers_per_mineral:
+        :param workers_per_gas:
+        :param base_distance: Mineral fields within this distance of a ready townhall are mined
+        :param missing_worker_loops: Game loops that the binding of a worker is kept while it is not visible,
+            e.g. while it is inside a gas building
+        """
+        self.bot: BotAI = bot
+        self.workers_per_mineral: int = workers_per_mineral
+        self.workers_per_gas: int = workers_per_gas
+        self.base_distance: float = base_distance
+        self.missing_worker_loops: int = missing_worker_loops
+        # Worker tag to the tag of the mineral field or gas building it mines
+        self.bindings: Dict[int, int] = {}
+        # Resource tag to the number of workers bound to it
+        self.assigned: CounterType[int] = Counter()
+        # Worker tag to the game loop it was last seen
+        self._last_seen: Dict[int, int] = {}
+
+    def _bind(self, worker_tag: int, resource_tag: int):
+        previous = self.bindings.get(worker_tag)
+        if previous is not None:
+            self.assigned[previous] -= 1
+        self.bindings[worker_tag] = resource_tag
+        self.assigned[resource_tag] += 1
+
+    def unbind(self, worker_tag: int):
+        """ Releases a worker from its resource, e.g. before it is sent to build. """
+        resource_tag = self.bindings.pop(worker_tag, None)
+        if resource_tag is not None:
+            self.assigned[resource_tag] -= 1
+            if not self.assigned[resource_tag]:
+                del self.assigned[resource_tag]
+
+    def _resources(self) -> Tuple[Dict[int, Unit], Dict[int, int]]:
+        """ Returns the resources to mine and how many workers each can take. """
+        bot = self.bot
+        resources: Dict[int, Unit] = {}
+        capacity: Dict[int, int] = {}
+        townhalls = bot.townhalls.ready
+        if townhalls and bot.mineral_field:
+            minerals = bot.mineral_field
+            distances = cdist(
+                np.array([mineral.position_tuple for mineral in minerals]),
+                np.array([townhall.position_tuple for townhall in townhalls]),
+            ).min(axis=1)
+            for mineral, distance in zip(minerals, distances):
+                if distance <= self.base_distance:
+                    resources[mineral.tag] = mineral
+                    capacity[mineral.tag] = self.workers_per_mineral
+        for gas_building in bot.gas_buildings:
+            if gas_building.build_progress == 1 and gas_building.vespene_contents:
+                resources[gas_building.tag] = gas_building
+                capacity[gas_building.tag] = self.workers_per_gas
+        return resources, capacity
+
+    def _has_room(self, resource_tag: int, capacity: Dict[int, int]) -> bool:
+        return self.assigned[resource_tag] < capacity.get(resource_tag, 0)
+
+    def update(self, prefer_gas: bool = False) -> int:
+        """
+        Updates the bindings and gives gather commands to the workers that need one.
+        Workers that gather from a resource that is not managed, e.g. long distance mining or at a townhall
+        under construction, are left alone.
+        Returns the number of commands given.
+
+        :param prefer_gas: If True, free gas slots are filled before mineral slots, else the other way around
+        """
+        bot = self.bot
+        game_loop = bot.state.game_loop
+        resources, capacity = self._resources()
+        self._release_over_capacity(capacity)
+
+        free_workers: List[Unit] = []
+        reissue: List[Tuple[Unit, int]] = []
+        received_action = bot.unit_tags_received_action
+        worker: Unit
+        for worker in bot.workers:
+            self._last_seen[worker.tag] = game_loop
+            # Skips workers that the bot already gave a command in this step
+            if worker.tag not in received_action:
+                self._check_worker(worker, resources, capacity, free_workers, reissue)
+        self._release_missing(game_loop)
+
+        commands = 0
+        for worker, resource_tag in reissue:
+            commands += bot.do(worker.gather(resources[resource_tag]), ignore_warning=True)
+        if free_workers:
+            commands += self._assign(free_workers, resources, capacity, prefer_gas)
+        return commands
+
+    def _release_over_capacity(self, capacity: Dict[int, int]):
+        """ Releases workers from resources that are mined out, lost or have fewer slots than workers. """
+        over_capacity: Dict[int, int] = {
+            resource_tag: count - capacity.get(resource_tag, 0)
+            for resource_tag, count in self.assigned.items() if count > capacity.get(resource_tag, 0)
+        }
+        if over_capacity:
+            for worker_tag, resource_tag in list(self.bindings.items()):
+                if over_capacity.get(resource_tag, 0) > 0:
+                    over_capacity[resource_tag] -= 1
+                    self.unbind(worker_tag)
+
+    def _check_worker(
+        self,
+        worker: Unit,
+        resources: Dict[int, Unit],
+        capacity: Dict[int, int],
+        free_workers: List[Unit],
+        reissue: List[Tuple[Unit, int]],
+    ):
+        """ Updates the binding of a worker, and adds it to 'free_workers' or 'reissue' if it needs a command. """
+        worker_tag = worker.tag
+        resource_tag = self.bindings.get(worker_tag)
+        orders = worker.orders
+        if not orders:
+            if resource_tag is None:
+                free_workers.append(worker)
+            else:
+                reissue.append((worker, resource_tag))
+            return
+        ability = orders[0].ability.exact_id
+        if ability in _GATHER_ABILITIES:
+            target_tag = orders[0].target
+            if target_tag == resource_tag:
+                return
+            if target_tag not in resources:
+                # The bot sent the worker to a resource that is not managed, e.g. for long distance mining
+                self.unbind(worker_tag)
+            elif self._has_room(target_tag, capacity):
+                # New worker, or the game moved the worker to a free mineral field next to its own
+                self._bind(worker_tag, target_tag)
+            elif resource_tag is None:
+                free_workers.append(worker)
+            else:
+                reissue.append((worker, resource_tag))
+        elif ability not in _RETURN_ABILITIES and resource_tag is not None:
+            # The bot gave the worker another order
+            self.unbind(worker_tag)
+
+    def _release_missing(self, game_loop: int):
+        """ Workers inside gas buildings are not visible for a moment, only release them if they stay missing or died. """
+        dead_units = self.bot.state.dead_units
+        missing = [
+            (worker_tag, last_seen) for worker_tag, last_seen in self._last_seen.items() if last_seen != game_loop
+        ]
+        for worker_tag, last_seen in missing:
+            if worker_tag in self.bindings:
+                if worker_tag not in dead_units and game_loop - last_seen <= self.missing_worker_loops:
+                    continue
+                self.unbind(worker_tag)
+            del self._last_seen[worker_tag]
+
+    def _free_slots(self, resources: Dict[int, Unit],
+                    capacity: Dict[int, int]) -> Tuple[List[int], List[Tuple[float, float]], List[bool]]:
+        """ Returns the resource tag, position and whether it is gas of each free slot. """
+        slot_tags: List[int] = []
+        slot_positions: List[Tuple[float, float]] = []
+        slot_is_gas: List[bool] = []
+        for resource_tag, resource_capacity in capacity.items():
+            free_slots = resource_capacity - self.assigned[resource_tag]
+            if free_slots > 0:
+                resource = resources[resource_tag]
+                slot_tags += [resource_tag] * free_slots
+                slot_positions += [resource.position_tuple] * free_slots
+                slot_is_gas += [resource.vespene_contents > 0] * free_slots
+        return slot_tags, slot_positions, slot_is_gas
+
+    def _assign(
+        self, free_workers: List[Unit], resources: Dict[int, Unit], capacity: Dict[int, int], prefer_gas: bool
+    ) -> int:
+        """ Assigns the free workers to the free resource slots with the smallest total distance. """
+        bot = self.bot
+        slot_tags, slot_positions, slot_is_gas = self._free_slots(resources, capacity)
+        commands = 0
+        worker_positions = np.array([worker.position_tuple for worker in free_workers])
+        assigned_workers: Set[int] = set()
+        if slot_tags:
+            costs = cdist(worker_positions, np.array(slot_positions))
+            costs[:, np.array(slot_is_gas) != prefer_gas] += _PREFERENCE_PENALTY
+            worker_indices, slot_indices = linear_sum_assignment(costs)
+            for worker_index, slot_index in zip(worker_indices, slot_indices):
+                worker = free_workers[worker_index]
+                resource_tag = slot_tags[slot_index]
+                self._bind(worker.tag, resource_tag)
+                assigned_workers.add(worker_index)
+                if worker.order_target != resource_tag:
+                    commands += bot.do(worker.gather(resources[resource_tag]), ignore_warning=True)
+
+        # More workers than free slots: idle workers mine at the closest mineral field without being bound
+        idle_indices = [
+            index for index, worker in enumerate(free_workers) if index not in assigned_workers and worker.is_idle
+        ]
+        minerals = [resource for resource in resources.values() if not resource.vespene_contents]
+        if idle_indices and minerals:
+            mineral_positions = np.array([mineral.position_tuple for mineral in minerals])
+            closest = cdist(worker_positions[idle_indices], mineral_positions).argmin(axis=1)
+            for index, mineral_index in zip(idle_indices, closest):
+                commands += bot.do(free_workers[index].gather(minerals[mineral_index]), ignore_warning=True)
+        return commands
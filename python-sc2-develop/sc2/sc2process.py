@@ -28,6 +28,12 @@ class kill_switch:
         logger.debug("kill_switch: Add switch")
         cls._to_kill.append(value)
 
+    @classmethod
+    def remove(cls, value):
+        """ Stops tracking a process that was already cleaned up. """
+        if value in cls._to_kill:
+            cls._to_kill.remove(value)
+
     @classmethod
     def kill_all(cls):
         logger.info(f"kill_switch: Process cleanup for {len(cls._to_kill)} processes")
@@ -35,6 +41,11 @@ class kill_switch:
             # pylint: disable=W0212
             p._clean(verbose=False)
 
+    @classmethod
+    def pids(cls) -> List[int]:
+        """ Process ids of the running SCII applications. """
+        return [p.pid for p in cls._to_kill if p.pid is not None]
+
 
 class SC2Process:
     """
@@ -92,6 +103,10 @@ class SC2Process:
         self._sc2_version = sc2_version
         self._base_build = base_build
         self._data_hash = data_hash
+        # perf_counter() when the process was launched
+        self._launch_time: Optional[float] = None
+        # Seconds from launching the process until its websocket accepted the connection
+        self.startup_time: Optional[float] = None
 
     async def __aenter__(self) -> Controller:
         kill_switch.add(self)
@@ -122,6 +137,11 @@ class SC2Process:
     def ws_url(self):
         return f"ws://{self._host}:{self._port}/sc2api"
 
+    @property
+    def pid(self) -> Optional[int]:
+        """ Process id of the SCII application, None if it is not running. """
+        return None if self._process is None else self._process.pid
+
     @property
     def versions(self):
         """Opens the versions.json file which origins from
@@ -190,6 +210,7 @@ class SC2Process:
 
         sc2_cwd = str(Paths.CWD) if Paths.CWD else None
 
+        self._launch_time = time.perf_counter()
         if paths.PF in {"WSL1", "WSL2"}:
             return wsl.run(args, sc2_cwd)
 
@@ -201,29 +222,47 @@ class SC2Process:
             # , env=run_config.env
         )
 
-    async def _connect(self):
-        # How long it waits for SC2 to start (in seconds)
-        for i in range(180):
+    async def _connect(self, timeout: float = 180, max_delay: float = 1):
+        """
+        Connects to the websocket of the launched process. Connection attempts are retried with exponential backoff
+        (50ms, 100ms, ... up to 'max_delay' seconds between attempts) until SC2 is ready, or 'timeout' seconds passed.
+
+        :param timeout: How long it waits for SC2 to start (in seconds)
+        :param max_delay:
+        """
+        t0 = time.perf_counter()
+        delay = 0.05
+        self._session = aiohttp.ClientSession()
+        while True:
             if self._process is None:
                 # The ._clean() was called, clearing the process
                 logger.debug("Process cleanup complete, exit")
+                await self._session.close()
                 sys.exit()
+            if paths.PF not in {"WSL1", "WSL2"} and self._process.poll() is not None:
+                await self._session.close()
+                raise RuntimeError(f"SC2 process exited with code {self._process.returncode} during startup")
 
-            await asyncio.sleep(1)
             try:
-                self._session = aiohttp.ClientSession()
                 ws = await self._session.ws_connect(self.ws_url, timeout=120)
                 # FIXME fix deprecation warning in for future aiohttp version
                 # ws = await self._session.ws_connect(
                 #     self.ws_url, timeout=aiohttp.client_ws.ClientWSTimeout(ws_close=120)
                 # )
-                logger.debug("Websocket connection ready")
+                self.startup_time = time.perf_counter() - (self._launch_time or t0)
+                logger.debug(f"Websocket connection ready after {self.startup_time:.2f}s")
                 return ws
             except aiohttp.client_exceptions.ClientConnectorError:
-                await self._session.close()
-                if i > 15:
+                elapsed = time.perf_counter() - t0
+                if elapsed > timeout:
+                    break
+                if elapsed > 15:
                     logger.debug("Connection refused (startup not complete (yet))")
 
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, max_delay)
+
+        await self._session.close()
         logger.debug("Websocket connection to SC2 process timed out")
         raise TimeoutError("Websocket")
 
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import inspect
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class ScheduledTask:
+    name: str
+    function: Callable[[], Any]
+    # Due tasks with higher priority run first
+    priority: int
+    # Number of game loops between two runs
+    frequency: int
+    # Number of steps a due task may be deferred when the budget is used up, 0 if it always has to run
+    max_deferral: int
+    # Game loop at which the task is due next
+    next_game_loop: int = 0
+    # Number of steps the task was deferred since it is due
+    deferred: int = 0
+    runs: int = 0
+    # Seconds
+    total_time: float = 0
+    last_time: float = 0
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.runs if self.runs else 0
+
+
+class StepScheduler:
+
+    def __init__(self, budget: float = 0.02, aging: float = 1):
+        """
+        Runs registered tasks after on_step, as long as the time spent in the current step is within the budget.
+        Due tasks that do not fit into the budget are deferred to the next step. Deferred tasks gain priority
+        ('aging' per deferred step), so that low priority tasks are not deferred forever.
+        The budget is measured from the start of the step, so time spent in on_step counts towards it.
+        Tasks can be normal or async functions without arguments.
+
+        The scheduler of the bot is run automatically by main.py after on_step, if it has any tasks.
+
+        Example::
+
+            async def on_start(self):
+                # Micro every game loop, never deferred
+                self.scheduler.add("micro", self.micro, priority=10, max_deferral=0)
+                self.scheduler.add("macro", self.macro, priority=5, frequency=8)
+                self.scheduler.add("sync", self.sync_agent, frequency=25)
+                # In realtime, one game loop takes 1 / 22.4 seconds
+                if self.realtime:
+                    self.scheduler.budget = 0.03
+
+        :param budget: Seconds per step
+        :param aging: Priority that deferred tasks gain per deferred step
+        """
+        self.budget: float = budget
+        self.aging: float = aging
+        self.tasks: Dict[str, ScheduledTask] = {}
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def add(
+        self,
+        name: str,
+        function: Callable[[], Any],
+        priority: int = 0,
+        frequency: int = 1,
+        max_deferral: int = 8,
+    ) -> ScheduledTask:
+        """
+        Registers a task, replacing a task with the same name. The task is due at the next run.
+
+        :param name:
+        :param function: Function or async function without arguments
+        :param priority:
+        :param frequency: Number of game loops between two runs
+        :param max_deferral: Number of steps the task may be deferred, 0 if it has to run every time it is due
+        """
+        assert frequency >= 1, f"Frequency has to be at least 1, but was {frequency}"
+        task = ScheduledTask(name, function, priority, frequency, max_deferral)
+        self.tasks[name] = task
+        return task
+
+    def remove(self, name: str):
+        """
+        Removes a task if it exists.
+
+        :param name:
+        """
+        self.tasks.pop(name, None)
+
+    def due(self, game_loop: int) -> List[ScheduledTask]:
+        """
+        Returns all tasks that are due at the given game loop, in the order they would run.
+
+        :param game_loop:
+        """
+        due_tasks = [task for task in self.tasks.values() if task.next_game_loop <= game_loop]
+        # Tasks that are overdue longer run first among tasks with equal priority
+        due_tasks.sort(
+            key=lambda task: (task.priority + task.deferred * self.aging, -task.next_game_loop), reverse=True
+        )
+        return due_tasks
+
+    async def run(self, game_loop: int, step_start_time: Optional[float] = None) -> List[str]:
+        """
+        Runs the due tasks that fit into the budget and defers the others. Returns the names of the tasks that ran.
+
+        :param game_loop:
+        :param step_start_time: perf_counter() at the start of the step, now if None
+        """
+        if step_start_time is None:
+            step_start_time = perf_counter()
+        ran: List[str] = []
+        for task in self.due(game_loop):
+            if self.tasks.get(task.name) is not task:
+                # Removed by a task that ran before
+                continue
+            t0 = perf_counter()
+            if t0 - step_start_time >= self.budget and task.deferred < task.max_deferral:
+                task.deferred += 1
+                continue
+            result = task.function()
+            if inspect.isawaitable(result):
+                await result
+            task.last_time = perf_counter() - t0
+            task.total_time += task.last_time
+            task.runs += 1
+            task.deferred = 0
+            task.next_game_loop = game_loop + task.frequency
+            ran.append(task.name)
+        return ran
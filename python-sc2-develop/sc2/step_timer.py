@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import json
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple, Union
+
+import numpy as np
+
+
+class _RollingWindow:
+    """ Ring buffer of the last 'size' durations of one phase. """
+
+    def __init__(self, size: int):
+        self.values: np.ndarray = np.zeros(size, dtype=np.float64)
+        self.count: int = 0
+
+    def add(self, value: float):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+
+    @property
+    def filled(self) -> np.ndarray:
+        return self.values[:min(self.count, len(self.values))]
+
+
+class StepTimer:
+
+    def __init__(self, window: int = 1000, sink: Optional[Union[str, Path]] = None):
+        """
+        Measures how long each phase of the bot loop takes, e.g. receiving and parsing the observation,
+        preparing the units, issuing events, on_step and sending the actions.
+        Keeps the durations of the last 'window' steps of each phase for statistics and histograms.
+        If a sink is given, the durations of each step are also written to a '.csv' or '.jsonl' file.
+
+        Phases that are measured automatically:
+        request_<request>: Time from sending a request until its response arrived, e.g. 'request_observation'
+        parse_<request>: Time to parse a response
+        game_state, prepare_step, issue_events, on_step, combine_actions, after_step
+
+        Example::
+
+            from sc2.step_timer import StepTimer
+
+            class MyBot(BotAI):
+                def __init__(self):
+                    self.step_timer = StepTimer(sink="timings.csv")
+
+                async def on_step(self, iteration: int):
+                    with self.step_timer.measure("micro"):
+                        await self.micro()
+
+                async def on_end(self, game_result: Result):
+                    for phase, stats in self.step_timer.summary().items():
+                        print(phase, stats)
+
+        :param window: Number of durations that are kept per phase
+        :param sink: Path of a .csv or .jsonl file that receives the durations of every step
+        """
+        self.window: int = window
+        self._windows: Dict[str, _RollingWindow] = {}
+        # Summed durations of each phase in the current step
+        self._current: Dict[str, float] = {}
+        self._sink: Optional[TextIO] = None
+        self._sink_is_csv: bool = False
+        # Closes the sink in 'close'
+        self._exit_stack = ExitStack()
+        if sink is not None:
+            sink = Path(sink)
+            self._sink_is_csv = sink.suffix == ".csv"
+            self._sink = self._exit_stack.enter_context(open(sink, "w"))
+            if self._sink_is_csv:
+                self._sink.write("game_loop,phase,duration_ms\n")
+
+    def add(self, phase: str, duration: float):
+        """
+        Adds a duration in seconds to a phase of the current step. A phase can be measured multiple times per step.
+
+        :param phase:
+        :param duration:
+        """
+        self._current[phase] = self._current.get(phase, 0) + duration
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """
+        Measures the duration of the 'with' block as part of the given phase.
+
+        :param phase:
+        """
+        t0 = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, perf_counter() - t0)
+
+    def end_step(self, game_loop: int):
+        """
+        Adds the durations of the current step to the rolling windows and writes them to the sink.
+        Called by main.py after each step.
+
+        :param game_loop:
+        """
+        current = self._current
+        if not current:
+            return
+        for phase, duration in current.items():
+            rolling_window = self._windows.get(phase)
+            if rolling_window is None:
+                rolling_window = self._windows[phase] = _RollingWindow(self.window)
+            rolling_window.add(duration)
+        if self._sink is not None:
+            if self._sink_is_csv:
+                self._sink.writelines(
+                    f"{game_loop},{phase},{duration * 1000:.4f}\n" for phase, duration in current.items()
+                )
+            else:
+                row = {phase: round(duration * 1000, 4) for phase, duration in current.items()}
+                self._sink.write(json.dumps({"game_loop": game_loop, **row}) + "\n")
+        self._current = {}
+
+    @property
+    def phases(self) -> List[str]:
+        """ Returns the names of all phases that were measured so far. """
+        return list(self._windows)
+
+    def durations(self, phase: str) -> np.ndarray:
+        """
+        Returns the durations of the last steps of a phase in milliseconds, in no particular order.
+
+        :param phase:
+        """
+        rolling_window = self._windows.get(phase)
+        if rolling_window is None:
+            return np.zeros(0)
+        return rolling_window.filled * 1000
+
+    def stats(self, phase: str) -> Dict[str, float]:
+        """
+        Returns the count, min, mean, median, 95th and 99th percentile and max of a phase in milliseconds,
+        over the last 'window' steps.
+
+        :param phase:
+        """
+        durations = self.durations(phase)
+        if not durations.size:
+            return {}
+        p50, p95, p99 = np.percentile(durations, [50, 95, 99])
+        return {
+            "count": int(durations.size),
+            "min": float(durations.min()),
+            "mean": float(durations.mean()),
+            "p50": float(p50),
+            "p95": float(p95),
+            "p99": float(p99),
+            "max": float(durations.max()),
+        }
+
+    def histogram(self, phase: str, bins: int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the histogram of the durations of a phase in milliseconds, as (counts, bin edges) like numpy.histogram.
+
+        :param phase:
+        :param bins:
+        """
+        return np.histogram(self.durations(phase), bins=bins)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """ Returns the stats of all phases, the slowest phase by mean duration first. """
+        stats = {phase: self.stats(phase) for phase in self._windows}
+        return dict(sorted(stats.items(), key=lambda item: item[1]["mean"], reverse=True))
+
+    def close(self):
+        """ Closes the sink. """
+        self._exit_stack.close()
+        self._sink = None
@@ -0,0 +1,235 @@
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+
+if TYPE_CHECKING:
+    from sc2.game_info import GameInfo
+    from sc2.unit import Unit
+
+# Padding around the map so that stamps never have to be clipped at the map borders
+# Must be at least as large as the biggest threat radius (tempest air range + radius + safety distance)
+_PADDING: int = 20
+
+# (center index, ground kernel, ground dps, air kernel, air dps)
+_Source = Tuple[int, int, float, int, float]
+
+
+class ThreatMap:
+
+    def __init__(self, game_info: GameInfo, safety_distance: float = 1):
+        """
+        Keeps track of how much damage per second enemy units can deal to each cell of the map.
+        The grids are aligned with 'game_info.pathing_grid', so they can be indexed with [y, x].
+        Each unit stamps a disk of radius 'range + unit radius + safety_distance' with its dps onto the ground and the air grid.
+        Calling 'update' only restamps units that moved to another cell, changed type or disappeared.
+
+        Example::
+
+            from sc2.threat_map import ThreatMap
+
+            async def on_start(self):
+                self.threat_map = ThreatMap(self.game_info)
+
+            async def on_step(self, iteration: int):
+                self.threat_map.update(self.enemy_units + self.enemy_structures)
+                for zealot in self.units(UnitTypeId.ZEALOT):
+                    if zealot.health_percentage < 0.3:
+                        zealot.move(self.threat_map.safest_point_near(zealot.position, 6))
+
+        :param game_info:
+        :param safety_distance:
+        """
+        self.game_info: GameInfo = game_info
+        self.safety_distance: float = safety_distance
+        self.height, self.width = game_info.pathing_grid.data_numpy.shape
+        self._padded_width: int = self.width + 2 * _PADDING
+        self._padded_height: int = self.height + 2 * _PADDING
+        self._ground: np.ndarray = np.zeros(self._padded_width * self._padded_height, dtype=np.float64)
+        self._air: np.ndarray = np.zeros(self._padded_width * self._padded_height, dtype=np.float64)
+        # Unit tag to the stamp that is currently applied to the grids
+        self._sources: Dict[int, _Source] = {}
+        # Unit type to (ground kernel, ground dps, air kernel, air dps), dps and range do not change during a game
+        self._profiles: Dict[UnitTypeId, Tuple[int, float, int, float]] = {}
+        # Kernel key (radius in half cells) to flat index offsets in the padded grids
+        self._kernels: Dict[int, np.ndarray] = {}
+
+    @property
+    def ground_grid(self) -> np.ndarray:
+        """ Returns the ground threat as a read-only numpy array of shape (height, width), indexed by [y, x]. """
+        return self._interior(self._ground)
+
+    @property
+    def air_grid(self) -> np.ndarray:
+        """ Returns the air threat as a read-only numpy array of shape (height, width), indexed by [y, x]. """
+        return self._interior(self._air)
+
+    def _interior(self, grid: np.ndarray) -> np.ndarray:
+        view = grid.reshape(self._padded_height, self._padded_width)[_PADDING:-_PADDING, _PADDING:-_PADDING]
+        view.flags.writeable = False
+        return view
+
+    def _kernel_key(self, weapon_range: float, radius: float) -> int:
+        threat_radius = min(weapon_range + radius + self.safety_distance, _PADDING - 1)
+        key = int(round(threat_radius * 2))
+        if key not in self._kernels:
+            r = key / 2
+            offset_range = np.arange(-math.ceil(r), math.ceil(r) + 1)
+            dy, dx = np.meshgrid(offset_range, offset_range, indexing="ij")
+            inside = dx**2 + dy**2 <= r**2
+            self._kernels[key] = (dy[inside] * self._padded_width + dx[inside]).astype(np.int64)
+        return key
+
+    def _profile(self, unit: Unit) -> Tuple[int, float, int, float]:
+        profile = self._profiles.get(unit.type_id)
+        if profile is None:
+            # Rounded to multiples of 1/1024 so that adding and subtracting stamps is exact and leaves no residue
+            ground_dps = round(unit.ground_dps * 1024) / 1024
+            air_dps = round(unit.air_dps * 1024) / 1024
+            profile = (
+                self._kernel_key(unit.ground_range, unit.radius) if ground_dps else 0,
+                ground_dps,
+                self._kernel_key(unit.air_range, unit.radius) if air_dps else 0,
+                air_dps,
+            )
+            self._profiles[unit.type_id] = profile
+        return profile
+
+    def update(self, units: Iterable[Unit]):
+        """
+        Updates the grids to the given enemy units. Units that were stamped previously but are missing now are removed.
+        Only units that moved to another cell since the last update are restamped.
+
+        :param units:
+        """
+        width, height = self.width, self.height
+        padded_width = self._padded_width
+        old_sources = self._sources
+        new_sources: Dict[int, _Source] = {}
+        removed: List[_Source] = []
+        added: List[_Source] = []
+        for unit in units:
+            profile = self._profile(unit)
+            if not (profile[1] or profile[3]) or not unit.is_ready:
+                continue
+            x, y = unit.position_tuple
+            x = min(max(int(x), 0), width - 1)
+            y = min(max(int(y), 0), height - 1)
+            source = ((y + _PADDING) * padded_width + x + _PADDING, ) + profile
+            tag = unit.tag
+            new_sources[tag] = source
+            old = old_sources.get(tag)
+            if old != source:
+                added.append(source)
+                if old is not None:
+                    removed.append(old)
+        for tag, old in old_sources.items():
+            if tag not in new_sources:
+                removed.append(old)
+        self._sources = new_sources
+        if added or removed:
+            self._apply(self._ground, added, removed, 1)
+            self._apply(self._air, added, removed, 3)
+
+    def _apply(self, grid: np.ndarray, added: List[_Source], removed: List[_Source], kernel_index: int):
+        """ Adds and subtracts all changed stamps of one grid with a single bincount. """
+        centers: Dict[int, List[int]] = {}
+        weights: Dict[int, List[float]] = {}
+        for sources, sign in ((added, 1), (removed, -1)):
+            for source in sources:
+                dps = source[kernel_index + 1]
+                if dps:
+                    key = source[kernel_index]
+                    centers.setdefault(key, []).append(source[0])
+                    weights.setdefault(key, []).append(sign * dps)
+        if not centers:
+            return
+        kernels = [self._kernels[key] for key in centers]
+        indices = [np.add.outer(centers[key], kernel).ravel() for key, kernel in zip(centers, kernels)]
+        stamp_weights = [np.repeat(weights[key], kernel.size) for key, kernel in zip(centers, kernels)]
+        indices = np.concatenate(indices)
+        low, high = indices.min(), indices.max()
+        grid[low:high + 1] += np.bincount(indices - low, np.concatenate(stamp_weights), minlength=high - low + 1)
+
+    def clear(self):
+        """ Removes all units from the threat map. """
+        self._ground[:] = 0
+        self._air[:] = 0
+        self._sources.clear()
+
+    def threat_at(self, p: Union[Point2, Tuple[float, float]], air: bool = False) -> float:
+        """
+        Returns the sum of dps of all enemy units that can hit the given position.
+
+        :param p:
+        :param air:
+        """
+        x = min(max(int(p[0]), 0), self.width - 1)
+        y = min(max(int(p[1]), 0), self.height - 1)
+        grid = self._air if air else self._ground
+        return float(grid[(y + _PADDING) * self._padded_width + x + _PADDING])
+
+    def safest_point_near(self, p: Union[Point2, Tuple[float, float]], distance: float, air: bool = False) -> Point2:
+        """
+        Returns the center of the cell with the lowest threat within 'distance' of the given position.
+        For ground units, only pathable cells are considered. Ties are broken by the distance to 'p'.
+
+        :param p:
+        :param distance:
+        :param air:
+        """
+        x, y = p[0], p[1]
+        r = math.ceil(distance)
+        x0, x1 = max(int(x) - r, 0), min(int(x) + r + 1, self.width)
+        y0, y1 = max(int(y) - r, 0), min(int(y) + r + 1, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return Point2((x, y))
+        grid = self.air_grid if air else self.ground_grid
+        window = grid[y0:y1, x0:x1]
+        ys, xs = np.ogrid[y0:y1, x0:x1]
+        distance_squared = (xs + 0.5 - x)**2 + (ys + 0.5 - y)**2
+        valid = distance_squared <= distance**2
+        if not air:
+            valid &= self.game_info.pathing_grid.data_numpy[y0:y1, x0:x1] != 0
+        if not valid.any():
+            return Point2((x, y))
+        score = np.where(valid, window + distance_squared * 1e-6, np.inf)
+        index = int(np.argmin(score))
+        iy, ix = divmod(index, score.shape[1])
+        return Point2((x0 + ix + 0.5, y0 + iy + 0.5))
+
+    def threat_along_path(
+        self, points: Sequence[Union[Point2, Tuple[float, float]]], air: bool = False, step: float = 1
+    ) -> float:
+        """
+        Returns the summed threat of the cells along a path, sampled every 'step' distance between consecutive points.
+
+        Example::
+
+            path = [zealot.position, self.enemy_start_locations[0]]
+            if self.threat_map.threat_along_path(path) > 100:
+                zealot.move(self.start_location)
+
+        :param points:
+        :param air:
+        :param step:
+        """
+        samples = np.array([(point[0], point[1]) for point in points], dtype=np.float64)
+        if not samples.size:
+            return 0
+        if len(samples) > 1:
+            segments = samples[1:] - samples[:-1]
+            counts = np.maximum(np.ceil(np.hypot(segments[:, 0], segments[:, 1]) / step).astype(np.int64), 1)
+            segment_index = np.repeat(np.arange(len(segments)), counts)
+            segment_start = np.repeat(np.cumsum(counts) - counts, counts)
+            fraction = (np.arange(counts.sum()) - segment_start) / np.repeat(counts, counts)
+            samples = np.vstack((samples[segment_index] + segments[segment_index] * fraction[:, None], samples[-1:]))
+        xs = np.clip(samples[:, 0].astype(np.int64), 0, self.width - 1)
+        ys = np.clip(samples[:, 1].astype(np.int64), 0, self.height - 1)
+        grid = self.air_grid if air else self.ground_grid
+        return float(grid[ys, xs].sum())
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from loguru import logger
+
+from sc2 import worker_pool
+from sc2.data import Result
+from sc2.main import GameMatch, run_match
+from sc2.player import AbstractPlayer
+
+
+@dataclass
+class MatchRecord:
+    index: int
+    match: str
+    players: List[str]
+    # Result of each player, in the order of 'GameMatch.players', None if the match failed
+    results: Optional[List[Optional[Result]]] = None
+    # Seconds to launch or restart the SC2 instances for the match
+    startup_time: float = 0
+    # Seconds from creating the game until all players finished
+    game_time: float = 0
+    worker: Optional[int] = None
+    error: Optional[str] = None
+
+    def to_json(self) -> Dict[str, Any]:
+        data = asdict(self)
+        if self.results is not None:
+            data["results"] = [None if result is None else result.name for result in self.results]
+        return data
+
+
+@dataclass
+class TournamentSummary:
+    records: List[MatchRecord]
+    # Seconds from the start of the tournament until the last match finished
+    wall_time: float
+    # Player name to the number of each result
+    player_results: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        for record in self.records:
+            for player, result in zip(record.players, record.results or [None] * len(record.players)):
+                results = self.player_results.setdefault(player, {})
+                name = "Error" if result is None else result.name
+                results[name] = results.get(name, 0) + 1
+
+    @property
+    def errors(self) -> int:
+        return sum(record.error is not None for record in self.records)
+
+    def to_json(self) -> Dict[str, Any]:
+        game_times = [record.game_time for record in self.records if record.error is None]
+        return {
+            "matches": len(self.records),
+            "errors": self.errors,
+            "wall_time": self.wall_time,
+            "mean_game_time": sum(game_times) / len(game_times) if game_times else 0,
+            "total_startup_time": sum(record.startup_time for record in self.records),
+            "players": self.player_results,
+            "games": [record.to_json() for record in self.records],
+        }
+
+    def write(self, path: Union[str, Path]):
+        with open(path, "w") as f:
+            json.dump(self.to_json(), f, indent=2)
+
+
+def _player_name(player: AbstractPlayer) -> str:
+    return player.name if player.name is not None else str(player)
+
+
+# pylint: disable=W0703
+async def _a_play_match(index: int, match: GameMatch) -> MatchRecord:
+    record = MatchRecord(
+        index=index, match=repr(match), players=[_player_name(player) for player in match.players], worker=os.getpid()
+    )
+    # Like a_run_multiple_games: keeping the instances alive after a bot vs bot match can cause crashes
+    dont_restart = match.needed_sc2_count == 2
+    t0 = time.perf_counter()
+    try:
+        # Pings the instances kept from the last match, and replaces crashed or stuck ones
+        await worker_pool.maintain_sc2_count(match.needed_sc2_count, match.sc2_config)
+        t1 = time.perf_counter()
+        record.startup_time = t1 - t0
+        results = await run_match(worker_pool.controllers, match, close_ws=dont_restart)
+        record.game_time = time.perf_counter() - t1
+        record.results = [results.get(player) for player in match.players]
+    except SystemExit as e:
+        logger.info(f"Game exit'ed as {e} during match {match}")
+        record.error = repr(e)
+    except Exception as e:
+        logger.exception(f"Exception {e} thrown in match {match}")
+        record.error = repr(e)
+    finally:
+        if dont_restart:
+            await worker_pool.maintain_sc2_count(0, match.sc2_config)
+    return record
+
+
+def run_tournament(
+    matches: List[GameMatch],
+    processes: Optional[int] = None,
+    summary_path: Optional[Union[str, Path]] = None,
+    max_attempts: int = 2,
+) -> List[Optional[Dict[AbstractPlayer, Result]]]:
+    """
+    Runs matches in parallel on a pool of worker processes, so that CPU bound python bots do not share one core.
+    Each worker keeps its SC2 instances between its matches and relaunches crashed ones before the next match.
+    If a worker process dies, the match it was playing is retried up to 'max_attempts' times in a new pool,
+    the matches of the other workers are restarted without counting as attempt.
+    Returns the results of the matches in the order of 'matches', like run_multiple_games.
+    The results, startup and game times of all matches are written to 'summary_path' as json.
+
+    The matches are sent to the workers with pickle, so bots have to be picklable,
+    e.g. defined at module level and without open connections or threads.
+
+    Example::
+
+        if __name__ == "__main__":
+            matches = [
+                GameMatch(maps.get("AcropolisLE"), [Bot(Race.Zerg, ZergRushBot()), Computer(Race.Terran, difficulty)])
+                for difficulty in [Difficulty.Easy, Difficulty.Medium, Difficulty.Hard] * 10
+            ]
+            run_tournament(matches, processes=4, summary_path="tournament.json")
+
+    :param matches:
+    :param processes: Number of worker processes, the number of cpus if None
+    :param summary_path:
+    :param max_attempts: Number of times a match is started if its worker process dies
+    """
+    records: Dict[int, MatchRecord] = {}
+    t0 = time.perf_counter()
+    jobs = list(enumerate(matches))
+    for index, record, error in worker_pool.run_jobs(_a_play_match, jobs, processes, max_attempts):
+        match = matches[index]
+        if error is not None:
+            logger.error(f"Exception {error!r} thrown in match {match}")
+            record = MatchRecord(
+                index=index,
+                match=repr(match),
+                players=[_player_name(player) for player in match.players],
+                error=repr(error)
+            )
+        records[index] = record
+        logger.info(f"Finished match {len(records)} / {len(matches)}: {match}, results: {record.results}")
+
+    summary = TournamentSummary([records[index] for index in range(len(matches))], time.perf_counter() - t0)
+    if summary_path is not None:
+        summary.write(summary_path)
+    return [
+        None if record.results is None else dict(zip(match.players, record.results))
+        for match, record in zip(matches, summary.records)
+    ]
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+
+from sc2.position import Point2
+
+if TYPE_CHECKING:
+    from sc2.game_info import GameInfo
+
+# Upper limit of visited search nodes, so that unsolvable requests return quickly
+MAX_SEARCH_NODES: int = 50000
+
+Footprint = Union[int, Tuple[int, int]]
+
+
+@dataclass(frozen=True)
+class Wall:
+    # Building center positions, in the same order as the requested footprints
+    buildings: Tuple[Point2, ...]
+    # (width, height) of each building
+    footprints: Tuple[Tuple[int, int], ...]
+    # Center of the tile that is left open, if a wall with a gap was requested
+    gap: Optional[Point2] = None
+
+
+class _BitGrid:
+    """ Converts between a window of the map and python integers where bit 'y * width + x' represents tile (x, y). """
+
+    def __init__(self, x0: int, y0: int, width: int, height: int):
+        self.x0 = x0
+        self.y0 = y0
+        self.width = width
+        self.height = height
+        self.all = (1 << (width * height)) - 1
+        column = sum(1 << (y * width) for y in range(height))
+        self.not_first_column = self.all & ~column
+        self.not_last_column = self.all & ~(column << (width - 1))
+
+    def from_array(self, array: np.ndarray) -> int:
+        return int.from_bytes(np.packbits(array.ravel().astype(bool), bitorder="little").tobytes(), "little")
+
+    def from_points(self, points: Iterable[Point2]) -> int:
+        bits = 0
+        for p in points:
+            x, y = int(p[0]) - self.x0, int(p[1]) - self.y0
+            if 0 <= x < self.width and 0 <= y < self.height:
+                bits |= 1 << (y * self.width + x)
+        return bits
+
+    def to_array(self, points: Iterable[Point2]) -> np.ndarray:
+        array = np.zeros((self.height, self.width), dtype=bool)
+        for p in points:
+            x, y = int(p[0]) - self.x0, int(p[1]) - self.y0
+            if 0 <= x < self.width and 0 <= y < self.height:
+                array[y, x] = True
+        return array
+
+    def to_point(self, bit_index: int) -> Point2:
+        y, x = divmod(bit_index, self.width)
+        return Point2((self.x0 + x + 0.5, self.y0 + y + 0.5))
+
+    def neighbors4(self, bits: int) -> int:
+        width = self.width
+        return (
+            ((bits << 1) & self.not_first_column) | ((bits >> 1) & self.not_last_column) | (bits << width)
+            | (bits >> width)
+        ) & self.all
+
+    def dilate(self, bits: int) -> int:
+        """ Adds all tiles that touch the given tiles, including diagonally. """
+        horizontal = bits | ((bits << 1) & self.not_first_column) | ((bits >> 1) & self.not_last_column)
+        return (horizontal | (horizontal << self.width) | (horizontal >> self.width)) & self.all
+
+    def flood_fill(self, seed: int, free: int) -> int:
+        """ Returns all free tiles that can be reached from the seed tiles by moving horizontally or vertically. """
+        reached = seed & free
+        while True:
+            expanded = (reached | self.neighbors4(reached)) & free
+            if expanded == reached:
+                return reached
+            reached = expanded
+
+
+def find_wall(
+    game_info: GameInfo,
+    center: Point2,
+    radius: int,
+    source: Iterable[Point2],
+    target: Iterable[Point2],
+    footprints: Sequence[Footprint],
+    gap: bool = False,
+    build_area: Optional[Iterable[Point2]] = None,
+    walk_area: Optional[Iterable[Point2]] = None,
+) -> Optional[Wall]:
+    """
+    Searches building positions that separate the 'source' tiles from the 'target' tiles within a square window
+    of the given radius around 'center'. All footprints are used and chained together, starting at an unpathable tile.
+    If 'gap' is True, the wall leaves exactly one tile open, e.g. to be blocked by a unit.
+    Returns None if no wall was found. Buildings closer to 'center' are preferred.
+    Existing structures are taken into account, as the current 'game_info.pathing_grid' is used.
+
+    Example::
+
+        # Wall of 2 supply depots and a barracks
+        wall = find_wall(self.game_info, ramp.top_center, 10, ramp.points, inside_points, [2, 3, 2])
+
+    :param game_info:
+    :param center:
+    :param radius:
+    :param source: Tiles the enemy comes from, e.g. the ramp
+    :param target: Tiles that have to be cut off from the source, e.g. the main base
+    :param footprints: Sizes of the buildings, either an int for square buildings or a tuple (width, height)
+    :param gap:
+    :param build_area: Tiles where buildings may be placed, all placeable tiles if None
+    :param walk_area: Tiles that are considered when looking for a way around the wall, all pathable tiles if None
+    """
+    map_height, map_width = game_info.pathing_grid.data_numpy.shape
+    x0, x1 = max(int(center[0]) - radius, 0), min(int(center[0]) + radius + 1, map_width)
+    y0, y1 = max(int(center[1]) - radius, 0), min(int(center[1]) + radius + 1, map_height)
+    grid = _BitGrid(x0, y0, x1 - x0, y1 - y0)
+
+    pathable: np.ndarray = game_info.pathing_grid.data_numpy[y0:y1, x0:x1] != 0
+    buildable: np.ndarray = pathable & (game_info.placement_grid.data_numpy[y0:y1, x0:x1] != 0)
+    if build_area is not None:
+        buildable &= grid.to_array(build_area)
+
+    free = grid.from_array(pathable if walk_area is None else pathable & grid.to_array(walk_area))
+    source_bits = grid.from_points(source) & free
+    target_bits = grid.from_points(target) & free & ~source_bits
+    if not source_bits or not target_bits:
+        return None
+    if not grid.flood_fill(source_bits, free) & target_bits:
+        # Already separated, nothing to wall off
+        return None
+
+    sizes: List[Tuple[int, int]] = [(f, f) if isinstance(f, int) else (f[0], f[1]) for f in footprints]
+    search = _WallSearch(grid, free, source_bits, target_bits, sizes, gap)
+    # Unpathable tiles are where the wall can start
+    search.obstacles = grid.all & ~grid.from_array(pathable)
+    for size in search.distinct_sizes:
+        search.candidates[size] = _candidates(grid, buildable, size, center)
+    return search.search(0, tuple(sizes.count(size) for size in search.distinct_sizes), False)
+
+
+def _candidates(grid: _BitGrid, buildable: np.ndarray, size: Tuple[int, int],
+                center: Point2) -> List[Tuple[int, Point2]]:
+    """ Returns all valid placements of a footprint as (bits, center), sorted by distance to 'center'. """
+    width, height = size
+    if width > grid.width or height > grid.height:
+        return []
+    shape_bits = sum(((1 << width) - 1) << (row * grid.width) for row in range(height))
+    fits = np.lib.stride_tricks.sliding_window_view(buildable, (height, width)).all(axis=(2, 3))
+    candidates: List[Tuple[int, Point2]] = []
+    for y, x in zip(*np.nonzero(fits)):
+        x, y = int(x), int(y)
+        position = Point2((grid.x0 + x + width / 2, grid.y0 + y + height / 2))
+        candidates.append((shape_bits << (y * grid.width + x), position))
+    candidates.sort(key=lambda candidate: candidate[1].distance_to_point2(center))
+    return candidates
+
+
+class _WallSearch:
+    """ Depth first search over chains of buildings, see find_wall. """
+
+    def __init__(
+        self, grid: _BitGrid, free: int, source_bits: int, target_bits: int, sizes: List[Tuple[int, int]], gap: bool
+    ):
+        self.grid = grid
+        self.free = free
+        self.source_bits = source_bits
+        self.target_bits = target_bits
+        self.sizes = sizes
+        self.gap = gap
+        self.distinct_sizes: List[Tuple[int, int]] = sorted(set(sizes))
+        self.obstacles: int = 0
+        # All valid placements per footprint as (bits, center), sorted by distance to the center of the window
+        self.candidates: Dict[Tuple[int, int], List[Tuple[int, Point2]]] = {}
+        self.visited: Set[Tuple[int, Tuple[int, ...], bool]] = set()
+        self.placed: List[Tuple[Tuple[int, int], Point2]] = []
+
+    def gap_tile(self, occupied: int) -> Optional[int]:
+        """ Returns the only tile connecting source and target, if there is exactly one such bottleneck tile. """
+        grid = self.grid
+        open_tiles = self.free & ~occupied
+        reached = grid.flood_fill(self.source_bits, open_tiles)
+        if not reached & self.target_bits:
+            return None
+        # A gap tile is next to the wall and reachable from both sides
+        possible = reached & grid.dilate(occupied) & grid.flood_fill(self.target_bits, open_tiles)
+        while possible:
+            bit = possible & -possible
+            possible ^= bit
+            if not grid.flood_fill(self.source_bits, open_tiles & ~bit) & self.target_bits:
+                return bit.bit_length() - 1
+        return None
+
+    def finish(self, occupied: int) -> Optional[Wall]:
+        """ Returns the wall if all buildings are placed and they separate source and target as requested. """
+        if self.gap:
+            gap_index = self.gap_tile(occupied)
+            if gap_index is None:
+                return None
+            return _build_wall(self.sizes, self.placed, self.grid.to_point(gap_index))
+        if self.grid.flood_fill(self.source_bits, self.free & ~occupied) & self.target_bits:
+            return None
+        return _build_wall(self.sizes, self.placed, None)
+
+    def search(self, occupied: int, remaining: Tuple[int, ...], gap_used: bool) -> Optional[Wall]:
+        if not any(remaining):
+            return self.finish(occupied)
+        key = (occupied, remaining, gap_used)
+        if key in self.visited or len(self.visited) >= MAX_SEARCH_NODES:
+            return None
+        self.visited.add(key)
+        # The first building starts at an unpathable tile, all others continue the chain
+        touching = self.grid.dilate(occupied or self.obstacles)
+        touching_with_gap = self.grid.dilate(touching) if self.gap and not gap_used else 0
+        for size_index, size in enumerate(self.distinct_sizes):
+            if not remaining[size_index]:
+                continue
+            next_remaining = remaining[:size_index] + (remaining[size_index] - 1, ) + remaining[size_index + 1:]
+            for bits, position in self.candidates[size]:
+                if bits & occupied or not bits & (touching | touching_with_gap):
+                    continue
+                self.placed.append((size, position))
+                wall = self.search(occupied | bits, next_remaining, gap_used or not bits & touching)
+                self.placed.pop()
+                if wall is not None:
+                    return wall
+        return None
+
+
+def _build_wall(
+    sizes: List[Tuple[int, int]], placed: List[Tuple[Tuple[int, int], Point2]], gap: Optional[Point2]
+) -> Wall:
+    """ Orders the placed buildings like the requested footprints. """
+    positions_by_size: Dict[Tuple[int, int], List[Point2]] = {}
+    for size, position in placed:
+        positions_by_size.setdefault(size, []).append(position)
+    buildings = tuple(positions_by_size[size].pop(0) for size in sizes)
+    return Wall(buildings=buildings, footprints=tuple(sizes), gap=gap)
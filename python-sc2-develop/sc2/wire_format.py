@@ -0,0 +1,87 @@
+"""
+Minimal protobuf wire format scanner, to look at a few fields of a serialized message without parsing all of it.
+Used by the proxy, which forwards requests and responses as bytes and only needs the status,
+the player result and the game loop of large observation responses.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Optional, Tuple
+
+from google.protobuf.message import DecodeError
+
+WIRE_VARINT: int = 0
+WIRE_FIXED64: int = 1
+WIRE_LENGTH_DELIMITED: int = 2
+WIRE_FIXED32: int = 5
+
+
+def read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    """
+    Returns the varint at 'pos' and the position after it.
+
+    :param data:
+    :param pos:
+    """
+    result = 0
+    shift = 0
+    try:
+        while True:
+            byte = data[pos]
+            pos += 1
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result, pos
+            shift += 7
+    except IndexError as e:
+        raise DecodeError("Truncated varint") from e
+
+
+def scan_fields(data: bytes, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Yields (field number, wire type, start, end) of each field of the message in data[start:end], without decoding
+    the values. For length delimited fields (messages, strings, bytes), data[start:end] is the payload.
+    For varints, data[start:end] is the encoded varint, use 'read_varint(data, start)' to decode it.
+
+    :param data:
+    :param start:
+    :param end:
+    """
+    if end is None:
+        end = len(data)
+    pos = start
+    while pos < end:
+        key, pos = read_varint(data, pos)
+        field_number = key >> 3
+        wire_type = key & 0x07
+        if wire_type == WIRE_VARINT:
+            _value, value_end = read_varint(data, pos)
+        elif wire_type == WIRE_LENGTH_DELIMITED:
+            length, pos = read_varint(data, pos)
+            value_end = pos + length
+        elif wire_type == WIRE_FIXED64:
+            value_end = pos + 8
+        elif wire_type == WIRE_FIXED32:
+            value_end = pos + 4
+        else:
+            raise DecodeError(f"Unsupported wire type {wire_type}")
+        if value_end > end:
+            raise DecodeError("Truncated message")
+        yield field_number, wire_type, pos, value_end
+        pos = value_end
+
+
+def find_field(data: bytes, field_number: int, start: int = 0, end: Optional[int] = None) -> Optional[Tuple[int, int]]:
+    """
+    Returns (start, end) of the last occurrence of a field in data[start:end], or None if the field is not set.
+    The last occurrence is used because it wins when protobuf parses a non repeated field.
+
+    :param data:
+    :param field_number:
+    :param start:
+    :param end:
+    """
+    found = None
+    for number, _wire_type, value_start, value_end in scan_fields(data, start, end):
+        if number == field_number:
+            found = value_start, value_end
+    return found
@@ -0,0 +1,175 @@
+# pylint: disable=W0603
+"""
+Process pool whose workers keep their SC2 instances between jobs, used by run_tournament and mine_replays.
+
+Each worker runs the jobs on its own event loop and launches SC2 with 'maintain_sc2_count'.
+If a worker process dies, the pool breaks and all unfinished jobs are started again in a new pool.
+Only the jobs that were running on the dead worker count as attempt, the others were interrupted through no fault of their own.
+The SC2 instances of the dead worker are killed before the new pool starts.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import signal
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Iterator, List, Optional, Sequence, Set, Tuple
+
+from loguru import logger
+
+from sc2.controller import Controller
+from sc2.main import maintain_SCII_count
+from sc2.sc2process import kill_switch
+
+# SC2 instances of a worker process, they are kept between the jobs the worker runs
+controllers: List[Controller] = []
+
+# Event loop of a worker process
+_loop: Optional[asyncio.AbstractEventLoop] = None
+# Folder shared by the pool and its workers, it holds a marker file for each running job
+# and the process ids of the SC2 instances of each worker
+_marker_dir: Optional[Path] = None
+# Marker file of the job the worker is running
+_job_marker: Optional[Path] = None
+
+
+def _sc2_pids_path(marker_dir: Path, worker_pid: int) -> Path:
+    return marker_dir / f"sc2_{worker_pid}"
+
+
+def _init_worker(marker_dir: str):
+    global _loop, _marker_dir
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    _marker_dir = Path(marker_dir)
+    # Runs when the pool shuts the worker down, so that its SC2 instances do not outlive it
+    Finalize(None, _close_worker, exitpriority=10)
+    # The pool terminates the other workers when one died, Finalize does not run then
+    signal.signal(signal.SIGTERM, _terminate_worker)
+
+
+def _close_worker():
+    try:
+        _loop.run_until_complete(maintain_SCII_count(0, controllers))
+    except Exception as e:  # pylint: disable=W0703
+        logger.warning(f"Closing the SC2 instances of worker {os.getpid()} failed: {e}")
+    kill_switch.kill_all()
+    _sc2_pids_path(_marker_dir, os.getpid()).unlink(missing_ok=True)
+    _loop.close()
+
+
+def _terminate_worker(*_args):
+    kill_switch.kill_all()
+    _sc2_pids_path(_marker_dir, os.getpid()).unlink(missing_ok=True)
+    # The job of this worker did not break the pool, so it is restarted without counting as attempt
+    if _job_marker is not None:
+        _job_marker.unlink(missing_ok=True)
+    os._exit(1)
+
+
+def _run_job(index: int, function: Callable[..., Coroutine[Any, Any, Any]], args: Tuple) -> Any:
+    global _job_marker
+    _job_marker = _marker_dir / f"job_{index}"
+    _job_marker.write_text(str(os.getpid()))
+    try:
+        return _loop.run_until_complete(function(*args))
+    finally:
+        _job_marker.unlink(missing_ok=True)
+        _job_marker = None
+
+
+async def maintain_sc2_count(count: int, proc_args: Optional[List[dict]] = None):
+    """
+    Like maintain_SCII_count for the SC2 instances of the worker process, see 'controllers'.
+    The process ids of the instances are shared with the pool, which kills them if the worker dies.
+
+    :param count:
+    :param proc_args:
+    """
+    try:
+        await maintain_SCII_count(count, controllers, proc_args)
+    finally:
+        _sc2_pids_path(_marker_dir, os.getpid()).write_text(" ".join(map(str, kill_switch.pids())))
+
+
+def _clean_markers(marker_dir: Path, unfinished: List[int]) -> Set[int]:
+    """
+    Kills the SC2 instances of the dead worker and removes all marker files.
+    Returns the unfinished jobs that were running on the dead worker.
+
+    :param marker_dir:
+    :param unfinished:
+    """
+    crashed = {index for index in unfinished if (marker_dir / f"job_{index}").exists()}
+    for path in marker_dir.iterdir():
+        if path.name.startswith("sc2_"):
+            for pid in path.read_text().split():
+                logger.info(f"Killing SC2 instance {pid} of dead worker {path.name[4:]}")
+                with suppress(OSError):
+                    os.kill(int(pid), signal.SIGTERM)
+        path.unlink()
+    return crashed
+
+
+def run_jobs(
+    function: Callable[..., Coroutine[Any, Any, Any]],
+    jobs: Sequence[Tuple],
+    processes: Optional[int] = None,
+    max_attempts: int = 2,
+) -> Iterator[Tuple[int, Any, Optional[BaseException]]]:
+    """
+    Runs 'function(*job)' for each job on a pool of worker processes and yields (job index, result, exception)
+    in the order the jobs finish. The exception is set instead of the result if the function raised,
+    or if the worker process died while running the job 'max_attempts' times.
+
+    The function and jobs are sent to the workers with pickle, so they have to be defined at module level.
+
+    :param function: Coroutine function that is run on the event loop of the worker
+    :param jobs:
+    :param processes: Number of worker processes, the number of cpus if None
+    :param max_attempts: Number of times a job is started if its worker process dies
+    """
+    if not jobs:
+        return
+    processes = min(processes or os.cpu_count() or 1, len(jobs))
+    attempts: Counter = Counter()
+    pending = list(range(len(jobs)))
+    with tempfile.TemporaryDirectory(prefix="sc2_worker_pool_") as marker_dir:
+        while pending:
+            unfinished: List[int] = []
+            with ProcessPoolExecutor(
+                max_workers=processes, initializer=_init_worker, initargs=(marker_dir, )
+            ) as executor:
+                futures = {executor.submit(_run_job, index, function, jobs[index]): index for index in pending}
+                for future in as_completed(futures):
+                    index = futures[future]
+                    try:
+                        result, error = future.result(), None
+                    except BrokenProcessPool:
+                        unfinished.append(index)
+                        continue
+                    except Exception as e:  # pylint: disable=W0703
+                        result, error = None, e
+                    yield index, result, error
+
+            pending = []
+            if not unfinished:
+                continue
+            crashed = _clean_markers(Path(marker_dir), unfinished)
+            if not crashed:
+                # The worker died between two jobs, count an attempt for all of them so that this ends
+                crashed = set(unfinished)
+            for index in sorted(unfinished):
+                if index in crashed:
+                    attempts[index] += 1
+                    if attempts[index] >= max_attempts:
+                        yield index, None, BrokenProcessPool(f"The worker process died {attempts[index]} times")
+                        continue
+                pending.append(index)
+            logger.warning(f"A worker process died, restarting {len(pending)} jobs")
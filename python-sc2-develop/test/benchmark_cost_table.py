@@ -0,0 +1,45 @@
+import random
+from test.test_pickled_data import MAPS, get_map_specific_bot
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.ids.upgrade_id import UpgradeId
+
+ITEMS = [
+    UnitTypeId.SCV,
+    UnitTypeId.MARINE,
+    UnitTypeId.MARAUDER,
+    UnitTypeId.SIEGETANK,
+    UnitTypeId.ORBITALCOMMAND,
+    UnitTypeId.REACTOR,
+    UnitTypeId.BARRACKS,
+    UnitTypeId.FACTORY,
+    UpgradeId.STIMPACK,
+    UpgradeId.TERRANINFANTRYWEAPONSLEVEL1,
+] * 5
+
+
+def _can_afford_all(bot):
+    return [bot.can_afford(item_id) for item_id in ITEMS]
+
+
+def test_bench_can_afford_cost_table(benchmark):
+    bot = get_map_specific_bot(random.choice(MAPS))
+    result = benchmark(_can_afford_all, bot)
+    assert len(result) == len(ITEMS)
+
+
+def test_bench_can_afford_game_data(benchmark):
+    bot = get_map_specific_bot(random.choice(MAPS))
+    bot.cost_table = None
+    result = benchmark(_can_afford_all, bot)
+    assert len(result) == len(ITEMS)
+
+
+def test_bench_can_afford_many(benchmark):
+    bot = get_map_specific_bot(random.choice(MAPS))
+    result = benchmark(bot.can_afford_many, ITEMS)
+    assert len(result) == len(ITEMS)
+
+
+# Run this file using
+# poetry run pytest test/benchmark_cost_table.py --benchmark-compare --benchmark-min-rounds=5
@@ -0,0 +1,76 @@
+import asyncio
+from test.fake_sc2_server import FakeSC2Server
+from test.test_pickled_data import MAPS
+from typing import Tuple
+
+from aiohttp import ClientSession, ClientWebSocketResponse
+
+from sc2.bot_ai import BotAI
+from sc2.client import Client
+from sc2.data import Race
+from sc2.main import _play_game
+from sc2.player import Bot
+from sc2.position import Point2
+
+
+class MoveWorkersBot(BotAI):
+
+    async def on_step(self, iteration: int):
+        for worker in self.workers:
+            worker.move(self.game_info.map_center)
+
+
+async def _connect(server: FakeSC2Server) -> Tuple[ClientSession, ClientWebSocketResponse]:
+    session = ClientSession()
+    ws = await session.ws_connect(server.ws_url)
+    return session, ws
+
+
+async def _play_fake_game(server: FakeSC2Server):
+    session, ws = await _connect(server)
+    await _play_game(Bot(Race.Terran, MoveWorkersBot()), Client(ws), False, None)
+    await ws.close()
+    await session.close()
+
+
+async def _query_pathings(client: Client, batched: bool, count: int):
+    pairs = [[Point2((i % 50, i // 50)), Point2((100, 100))] for i in range(count)]
+    if batched:
+        await client.query_pathings(pairs)
+    else:
+        for start, end in pairs:
+            await client.query_pathing(start, end)
+
+
+def test_bench_step_loop(benchmark):
+    # Load the pickle file and start the server outside of benchmark
+    server = FakeSC2Server(MAPS[0], game_loops=200)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    _result = benchmark(lambda: loop.run_until_complete(_play_fake_game(server)))
+    loop.run_until_complete(server.close())
+    loop.close()
+
+
+def _bench_query_pathings(benchmark, batched: bool):
+    server = FakeSC2Server(MAPS[0])
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    session, ws = loop.run_until_complete(_connect(server))
+    client = Client(ws)
+    _result = benchmark(lambda: loop.run_until_complete(_query_pathings(client, batched, 200)))
+    loop.run_until_complete(session.close())
+    loop.run_until_complete(server.close())
+    loop.close()
+
+
+def test_bench_query_pathings_batched(benchmark):
+    _bench_query_pathings(benchmark, True)
+
+
+def test_bench_query_pathings_single(benchmark):
+    _bench_query_pathings(benchmark, False)
+
+
+# Run this file using
+# poetry run pytest test/benchmark_fake_sc2_server.py --benchmark-compare --benchmark-min-rounds=5
@@ -0,0 +1,36 @@
+from test.test_pickled_data import MAPS, load_map_pickle_data
+from typing import Any, List
+
+from sc2.game_state import GameState
+
+
+def _create_game_states(observations: List[Any]):
+    for observation in observations:
+        state = GameState(observation)
+        # Fields that are read every step when preparing the bot
+        _common = state.common
+        _game_loop = state.game_loop
+
+
+def _create_game_states_all_fields(observations: List[Any]):
+    for observation in observations:
+        state = GameState(observation)
+        _fields = (
+            state.common, state.psionic_matrix, state.score, state.upgrades, state.effects, state.visibility,
+            state.creep
+        )
+
+
+def test_bench_game_state(benchmark):
+    # Load pickle files outside of benchmark
+    observations: List[Any] = [load_map_pickle_data(path)[2] for path in MAPS]
+    _result = benchmark(_create_game_states, observations)
+
+
+def test_bench_game_state_all_fields(benchmark):
+    observations: List[Any] = [load_map_pickle_data(path)[2] for path in MAPS]
+    _result = benchmark(_create_game_states_all_fields, observations)
+
+
+# Run this file using
+# poetry run pytest test/benchmark_game_state.py --benchmark-compare --benchmark-min-rounds=5
@@ -0,0 +1,59 @@
+import asyncio
+from pathlib import Path
+from test.fake_sc2_server import FakeSC2Process, FakeSC2Server
+from test.test_pickled_data import MAPS
+from types import SimpleNamespace
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.data import Race
+from sc2.player import BotProcess
+from sc2.proxy import Proxy
+
+
+async def _forward(proxy: Proxy, request_bytes: bytes, steps: int):
+    msg = SimpleNamespace(data=request_bytes)
+    for _ in range(steps):
+        await proxy.parse_request(msg)
+        response_bytes = await proxy.get_response()
+        _forwarded = await proxy.parse_response(response_bytes)
+
+
+async def _forward_parsed(proxy: Proxy, request_bytes: bytes, steps: int):
+    """ Parses and serializes every message, like the proxy did before it forwarded bytes. """
+    ws = proxy.controller._ws
+    for _ in range(steps):
+        request = sc_pb.Request()
+        request.ParseFromString(request_bytes)
+        await ws.send_bytes(request.SerializeToString())
+        response = sc_pb.Response()
+        response.ParseFromString(await ws.receive_bytes())
+        _forwarded = response.SerializeToString()
+
+
+def _bench_proxy(benchmark, forward):
+    # Load the pickle file, start the server and connect outside of benchmark
+    server = FakeSC2Server(MAPS[0])
+    process = FakeSC2Process(server)
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.start())
+    controller = loop.run_until_complete(process.__aenter__())
+    player = BotProcess(Path(__file__).parent, [], Race.Terran, name="proxied")
+    proxy = Proxy(controller, player, 1234, game_time_limit=3600)
+    request_bytes = sc_pb.Request(observation=sc_pb.RequestObservation()).SerializeToString()
+    _result = benchmark(lambda: loop.run_until_complete(forward(proxy, request_bytes, 20)))
+    loop.run_until_complete(process.__aexit__())
+    loop.run_until_complete(server.close())
+    loop.close()
+
+
+def test_bench_proxy_forward(benchmark):
+    _bench_proxy(benchmark, _forward)
+
+
+def test_bench_proxy_forward_parsed(benchmark):
+    _bench_proxy(benchmark, _forward_parsed)
+
+
+# Run this file using
+# poetry run pytest test/benchmark_proxy.py --benchmark-compare --benchmark-min-rounds=5
@@ -0,0 +1,58 @@
+import random
+from test.test_saturation_manager import Frames
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.saturation_manager import SaturationManager
+
+
+def create_frames(bases: int = 5, workers: int = 80) -> Frames:
+    """ Takes the closest expansions with ready command centers and adds idle SCVs until there are 'workers' SCVs. """
+    frames = Frames()
+    bot = frames.bot
+    bot._find_expansion_locations()
+    start = bot.townhalls.first.position
+    command_center = next(unit for unit in frames.raw_units if unit.unit_type == UnitTypeId.COMMANDCENTER.value)
+    scv = next(unit for unit in frames.raw_units if unit.unit_type == UnitTypeId.SCV.value)
+    expansions = sorted(bot.expansion_locations_list, key=start.distance_to)[1:bases]
+    for tag, expansion in enumerate(expansions, start=1):
+        new_command_center = frames.raw_units.add()
+        new_command_center.CopyFrom(command_center)
+        new_command_center.tag = tag
+        new_command_center.pos.x, new_command_center.pos.y = expansion
+    base_positions = [start] + expansions
+    for tag in range(100, 100 + workers - bot.workers.amount):
+        new_scv = frames.raw_units.add()
+        new_scv.CopyFrom(scv)
+        new_scv.tag = tag
+        new_scv.pos.x, new_scv.pos.y = random.choice(base_positions).random_on_distance(4)
+        del new_scv.orders[:]
+    frames.next_frame()
+    return frames
+
+
+def _assign_all_workers(frames: Frames):
+    bot = frames.bot
+    bot.actions.clear()
+    bot.unit_tags_received_action.clear()
+    bot._last_action_index_of_unit.clear()
+    return SaturationManager(bot).update()
+
+
+def test_bench_saturation_manager_assign(benchmark):
+    frames = create_frames()
+    commands = benchmark(_assign_all_workers, frames)
+    assert commands > 0
+
+
+def test_bench_saturation_manager_steady_state(benchmark):
+    frames = create_frames()
+    manager = SaturationManager(frames.bot)
+    manager.update()
+    frames.next_frame()
+    # All workers mine at their mineral fields, so no commands are given
+    commands = benchmark(manager.update)
+    assert commands == 0
+
+
+# Run this file using
+# poetry run pytest test/benchmark_saturation_manager.py --benchmark-compare --benchmark-min-rounds=5
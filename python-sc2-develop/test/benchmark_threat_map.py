@@ -0,0 +1,34 @@
+import random
+from test.test_pickled_data import MAPS, get_map_specific_bot
+from test.test_threat_map import create_enemy_units
+from typing import List
+
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.threat_map import ThreatMap
+from sc2.unit import Unit
+
+
+def _update_threat_map(threat_map: ThreatMap, frames: List[List[Unit]]):
+    for units in frames:
+        threat_map.update(units)
+
+
+def test_bench_threat_map_update(benchmark):
+    bot = get_map_specific_bot(random.choice(MAPS))
+    area = bot.game_info.playable_area
+    unit_types = [UnitTypeId.MARINE, UnitTypeId.STALKER, UnitTypeId.HYDRALISK, UnitTypeId.VIKINGFIGHTER]
+    positions = [
+        (random.choice(unit_types), random.uniform(area.x, area.right - 2), random.uniform(area.y, area.top - 2))
+        for _ in range(200)
+    ]
+    # Two frames where all 200 units moved to another cell
+    frames = [
+        create_enemy_units(bot, positions),
+        create_enemy_units(bot, [(unit_type, x + 1, y + 1) for unit_type, x, y in positions]),
+    ]
+    threat_map = ThreatMap(bot.game_info)
+    _result = benchmark(_update_threat_map, threat_map, frames)
+
+
+# Run this file using
+# poetry run pytest test/benchmark_threat_map.py --benchmark-compare --benchmark-min-rounds=5
@@ -0,0 +1,11 @@
+import signal
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def restore_sigint_handler():
+    """ SC2Process replaces the SIGINT handler of the test process. """
+    handler = signal.getsignal(signal.SIGINT)
+    yield
+    signal.signal(signal.SIGINT, handler)
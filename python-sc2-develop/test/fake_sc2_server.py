@@ -0,0 +1,291 @@
+"""
+Fake SC2 websocket server that answers requests with the recorded responses of a map from test/pickle_data.
+Lets the bot loop, queries and the proxy run and be benchmarked without the SC2 binary.
+
+Example::
+
+    async with FakeSC2Server(MAPS[0], game_loops=100) as server:
+        async with ClientSession() as session:
+            ws = await session.ws_connect(server.ws_url)
+            result = await _play_game(Bot(Race.Terran, MyBot()), Client(ws), False, None)
+
+    # A Controller whose SC2Process is connected to the server, for code that manages SC2 processes
+    async with FakeSC2Server(MAPS[0]) as server:
+        controller = await FakeSC2Process(server).__aenter__()
+        await maintain_SCII_count(1, [controller])
+"""
+import asyncio
+import lzma
+import math
+import pickle
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import portpicker
+from aiohttp import WSMsgType, web
+from s2clientprotocol import common_pb2 as common_pb
+from s2clientprotocol import error_pb2 as error_pb
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.controller import Controller
+from sc2.data import Result
+from sc2.sc2process import SC2Process
+
+# Result of the other players for the result of the player, a tie or undecided game stays the same for everyone
+OPPONENT_RESULTS = {Result.Victory: Result.Defeat, Result.Defeat: Result.Victory}
+
+
+class FakeSC2Server:
+
+    def __init__(
+        self,
+        map_path: Path,
+        latency: float = 0,
+        game_loops: Optional[int] = None,
+        result: Result = Result.Victory,
+        host: str = "127.0.0.1",
+    ):
+        """
+        :param map_path: Pickle file of test/pickle_data
+        :param latency: Seconds before each request is answered
+        :param game_loops: The game ends with 'result' after this many game loops, never if None
+        :param result: Result of the player at the end of the game
+        :param host:
+        """
+        with lzma.open(str(map_path.absolute()), "rb") as f:
+            raw_game_data, raw_game_info, raw_observation = pickle.load(f)
+        self.game_data: sc_pb.Response = raw_game_data
+        self.game_info: sc_pb.Response = raw_game_info
+        self.observation: sc_pb.ResponseObservation = raw_observation
+        self.player_id: int = raw_observation.observation.player_common.player_id
+        self.latency: float = latency
+        self.game_loops: Optional[int] = game_loops
+        self.result: Result = result
+        self.host: str = host
+        self.port: int = portpicker.pick_unused_port()
+        self.game_loop: int = 0
+        # Request name to the number of times it was received
+        self.requests: Dict[str, int] = {}
+        # Serialized requests in the order they were received
+        self.received: List[bytes] = []
+        self._unit_positions: Dict[int, common_pb.Point] = {
+            unit.tag: unit.pos
+            for unit in raw_observation.observation.raw_data.units
+        }
+        self._handlers: Dict[str, Callable[[sc_pb.Request, sc_pb.Response], None]] = {
+            "create_game": self._create_game,
+            "join_game": self._join_game,
+            "start_replay": self._start_replay,
+            "leave_game": self._leave_game,
+            "quit": self._quit,
+            "ping": self._ping,
+            "data": self._data,
+            "game_info": self._game_info,
+            "observation": self._observation,
+            "step": self._step,
+            "action": self._action,
+            "query": self._query,
+            "debug": self._debug,
+        }
+        self.status = sc_pb.launched
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://{self.host}:{self.port}/sc2api"
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None
+
+    @property
+    def game_over(self) -> bool:
+        return self.game_loops is not None and self.game_loop >= self.game_loops
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route("GET", "/sc2api", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, self.port).start()
+
+    async def close(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        portpicker.return_port(self.port)
+
+    async def __aenter__(self) -> "FakeSC2Server":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def _handle(self, http_request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(http_request)
+        # Sends the last response, with 'latency' the responses are sent in the background one after another,
+        # so that a close message is still read while a response waits
+        sending: Optional[asyncio.Task] = None
+        async for msg in ws:
+            if msg.type != WSMsgType.BINARY:
+                break
+            self.received.append(msg.data)
+            request = sc_pb.Request.FromString(msg.data)
+            response_bytes = self.respond(request).SerializeToString()
+            if self.latency:
+                sending = asyncio.create_task(self._send_later(ws, response_bytes, sending))
+            else:
+                await ws.send_bytes(response_bytes)
+            if request.HasField("quit"):
+                break
+        if sending is not None:
+            if ws.closed:
+                sending.cancel()
+            await asyncio.gather(sending, return_exceptions=True)
+        await ws.close()
+        return ws
+
+    async def _send_later(self, ws: web.WebSocketResponse, response_bytes: bytes, previous: Optional[asyncio.Task]):
+        if previous is not None:
+            await previous
+        await asyncio.sleep(self.latency)
+        await ws.send_bytes(response_bytes)
+
+    def respond(self, request: sc_pb.Request) -> sc_pb.Response:
+        """
+        Returns the response to a request.
+
+        :param request:
+        """
+        name = request.WhichOneof("request")
+        self.requests[name] = self.requests.get(name, 0) + 1
+        response = sc_pb.Response(id=request.id)
+        handler = self._handlers.get(name)
+        if handler is None:
+            response.error.append(f"Request {name} is not supported by the fake SC2 server")
+        else:
+            handler(request, response)
+        response.status = self.status
+        return response
+
+    def _create_game(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.create_game.SetInParent()
+        self.status = sc_pb.init_game
+
+    def _join_game(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.join_game.player_id = self.player_id
+        self.game_loop = 0
+        self.status = sc_pb.in_game
+
+    def _start_replay(self, request: sc_pb.Request, response: sc_pb.Response):
+        player_ids = {player.player_id for player in self.game_info.game_info.player_info}
+        if request.start_replay.observed_player_id not in player_ids:
+            response.start_replay.error = sc_pb.ResponseStartReplay.InvalidObservedPlayerId
+            response.start_replay.error_details = f"The replay has the players {sorted(player_ids)}"
+            return
+        response.start_replay.SetInParent()
+        self.game_loop = 0
+        self.status = sc_pb.in_replay
+
+    def _leave_game(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.leave_game.SetInParent()
+        self.status = sc_pb.launched
+
+    def _quit(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.quit.SetInParent()
+        self.status = sc_pb.quit
+
+    def _ping(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.ping.game_version = "4.10.1.75800"
+        response.ping.data_version = "fake"
+        response.ping.data_build = 75800
+        response.ping.base_build = 75689
+
+    def _data(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.data.CopyFrom(self.game_data.data)
+
+    def _game_info(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.game_info.CopyFrom(self.game_info.game_info)
+
+    def _observation(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.observation.CopyFrom(self.observation)
+        response.observation.observation.game_loop = self.game_loop
+        if self.game_over:
+            opponent_result = OPPONENT_RESULTS.get(self.result, self.result)
+            for player in self.game_info.game_info.player_info:
+                result = self.result if player.player_id == self.player_id else opponent_result
+                response.observation.player_result.add(player_id=player.player_id, result=result.value)
+            self.status = sc_pb.ended
+
+    def _step(self, request: sc_pb.Request, response: sc_pb.Response):
+        self.game_loop += max(request.step.count, 1)
+        response.step.simulation_loop = self.game_loop
+
+    def _action(self, request: sc_pb.Request, response: sc_pb.Response):
+        response.action.result.extend([error_pb.Success] * len(request.action.actions))
+
+    def _query(self, request: sc_pb.Request, response: sc_pb.Response):
+        for pathing in request.query.pathing:
+            start = self._unit_positions.get(pathing.unit_tag) if pathing.HasField("unit_tag") else pathing.start_pos
+            distance = 0 if start is None else math.hypot(pathing.end_pos.x - start.x, pathing.end_pos.y - start.y)
+            response.query.pathing.add(distance=distance)
+        for _placement in request.query.placements:
+            response.query.placements.add(result=error_pb.Success)
+        for ability_request in request.query.abilities:
+            response.query.abilities.add(unit_tag=ability_request.unit_tag)
+
+    def _debug(self, _request: sc_pb.Request, response: sc_pb.Response):
+        response.debug.SetInParent()
+
+
+class FakePopen:
+    """ A launched SC2 process that is still starting up, or exited with 'returncode'. """
+
+    def __init__(self, returncode: Optional[int] = None):
+        self.returncode: Optional[int] = returncode
+        # No real process is running
+        self.pid: Optional[int] = None
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def terminate(self):
+        self.returncode = -15
+
+    def kill(self):
+        self.returncode = -9
+
+    def wait(self) -> Optional[int]:
+        return self.returncode
+
+
+class FakeSC2Process(SC2Process):
+    """
+    SC2Process that connects to a FakeSC2Server instead of launching SC2.
+    With 'start_server' the server is started with the process and closed with its connection,
+    so that the process can stand in for SC2Process in maintain_SCII_count.
+
+    Example::
+
+        monkeypatch.setattr(main, "SC2Process", lambda **_proc_args: FakeSC2Process(FakeSC2Server(MAPS[0]), True))
+    """
+
+    def __init__(self, server: FakeSC2Server, start_server: bool = False):
+        super().__init__(host=server.host, port=server.port)
+        self.server: FakeSC2Server = server
+        self.start_server: bool = start_server
+
+    async def __aenter__(self) -> Controller:
+        if self.start_server:
+            await self.server.start()
+        return await super().__aenter__()
+
+    def _launch(self) -> FakePopen:
+        return FakePopen()
+
+    async def _close_connection(self):
+        await super()._close_connection()
+        if self.start_server and self.server.running:
+            await self.server.close()
@@ -0,0 +1,74 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_combine_actions.py
+"""
+import random
+from test.test_pickled_data import MAPS, get_map_specific_bot
+
+from sc2.action import combine_actions
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.unit_command import UnitCommand
+
+
+def test_combine_actions():
+    bot = get_map_specific_bot(random.choice(MAPS))
+    workers = bot.workers
+    assert len(workers) >= 2
+    target_a = Point2((10, 10))
+    target_b = Point2((20, 20))
+
+    # Interleaved commands are combined into one action per (ability, target, queue)
+    for i, worker in enumerate(workers):
+        worker.move(target_a if i % 2 == 0 else target_b)
+    raw_actions = list(combine_actions(bot.actions))
+    assert len(raw_actions) == 2
+    assert {raw.unit_command.target_world_space_pos.x for raw in raw_actions} == {10, 20}
+    assert sum(len(raw.unit_command.unit_tags) for raw in raw_actions) == len(workers)
+
+    # Repeating the last command of a unit is skipped
+    bot.actions.clear()
+    worker = workers[0]
+    assert worker.move(target_a)
+    assert worker.move(target_a)
+    assert len(bot.actions) == 1
+    # Queued commands are kept
+    worker.move(target_a, queue=True)
+    assert len(bot.actions) == 2
+
+    # The commands of a unit are sent in the order they were issued
+    bot.actions.clear()
+    other_worker = workers[1]
+    worker.move(target_a)
+    worker.attack(target_b)
+    other_worker.move(target_a)
+    worker.move(target_a)
+    raw_actions = list(combine_actions(bot.actions))
+    assert [raw.unit_command.ability_id for raw in raw_actions] == [
+        AbilityId.MOVE_MOVE.value,
+        AbilityId.ATTACK.value,
+        AbilityId.MOVE_MOVE.value,
+    ]
+    assert set(raw_actions[0].unit_command.unit_tags) == {worker.tag, other_worker.tag}
+    assert list(raw_actions[2].unit_command.unit_tags) == [worker.tag]
+
+    # Commands that cannot be combined stay one action per unit
+    bot.actions.clear()
+    townhall = bot.townhalls.first
+    townhall.train(UnitTypeId.SCV)
+    townhall.train(UnitTypeId.SCV)
+    assert len(list(combine_actions(bot.actions))) == 2
+
+
+def test_prevent_double_actions():
+    bot = get_map_specific_bot(random.choice(MAPS))
+    # Workers are gathering minerals at the start of the game
+    worker = bot.workers.filter(lambda unit: unit.orders).first
+    gathered_mineral_field = bot.mineral_field.find_by_tag(worker.orders[0].target)
+    other_mineral_field = bot.mineral_field.tags_not_in({gathered_mineral_field.tag}).first
+    assert not bot.prevent_double_actions(UnitCommand(AbilityId.HARVEST_GATHER, worker, gathered_mineral_field))
+    assert bot.prevent_double_actions(UnitCommand(AbilityId.HARVEST_GATHER, worker, other_mineral_field))
+    assert bot.prevent_double_actions(UnitCommand(AbilityId.HARVEST_GATHER, worker, gathered_mineral_field, True))
+    assert bot.prevent_double_actions(UnitCommand(AbilityId.MOVE_MOVE, worker, Point2((1, 2))))
+    assert bot.prevent_double_actions(UnitCommand(AbilityId.STOP, worker))
@@ -0,0 +1,90 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_cost_table.py
+"""
+import random
+from test.test_pickled_data import MAPS, get_map_specific_bot
+
+import numpy as np
+import pytest
+
+from sc2.game_data import Cost
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.ids.upgrade_id import UpgradeId
+
+
+def test_cost_table_matches_game_data():
+    bot = get_map_specific_bot(random.choice(MAPS))
+    cost_table = bot.cost_table
+    game_data = bot.game_data
+    assert len(cost_table) == len(cost_table.minerals) == len(cost_table.supply)
+
+    for item_id in cost_table._rows:
+        cost = cost_table.cost(item_id)
+        if isinstance(item_id, AbilityId):
+            assert cost == game_data.calculate_ability_cost(item_id), item_id
+        elif isinstance(item_id, UpgradeId):
+            assert cost == game_data.upgrades[item_id.value].cost, item_id
+        else:
+            unit_data = game_data.units[item_id.value]
+            if item_id in {UnitTypeId.REACTOR, UnitTypeId.TECHLAB, UnitTypeId.BANELING, UnitTypeId.ARCHON}:
+                continue
+            assert cost == game_data.calculate_ability_cost(unit_data.creation_ability.exact_id), item_id
+            assert cost_table.unit_value(item_id) == unit_data.cost
+
+    assert bot.calculate_cost(UnitTypeId.REACTOR) == Cost(50, 50)
+    assert bot.calculate_cost(UnitTypeId.TECHLAB) == Cost(50, 25)
+    assert bot.calculate_cost(UnitTypeId.BANELING) == Cost(25, 25)
+    assert bot.calculate_cost(UnitTypeId.ARCHON) == Cost(175, 275)
+    assert bot.calculate_cost(UnitTypeId.ORBITALCOMMAND) == Cost(150, 0)
+    assert bot.calculate_cost(UnitTypeId.ZERGLING) == Cost(50, 0)
+    assert bot.calculate_cost(UnitTypeId.EXTRACTOR) == Cost(25, 0)
+    assert bot.calculate_cost(AbilityId.UPGRADETOORBITAL_ORBITALCOMMAND) == Cost(150, 0)
+    assert bot.calculate_cost(UpgradeId.STIMPACK) == Cost(100, 100)
+    assert bot.calculate_supply_cost(UnitTypeId.ZERGLING) == 1
+    assert bot.calculate_supply_cost(UnitTypeId.BANELING) == 0
+    assert bot.calculate_supply_cost(UnitTypeId.RAVAGER) == 1
+    assert bot.calculate_supply_cost(UnitTypeId.OVERLORD) == 0
+    assert bot.calculate_supply_cost(UnitTypeId.THOR) == 6
+
+    # The columns are shared with all callers
+    with pytest.raises(ValueError):
+        cost_table.minerals[0] = 0
+
+
+def test_cost_table_can_afford():
+    bot = get_map_specific_bot(random.choice(MAPS))
+    items = [
+        UnitTypeId.SCV,
+        UnitTypeId.MARINE,
+        UnitTypeId.BATTLECRUISER,
+        UnitTypeId.SUPPLYDEPOT,
+        UpgradeId.STIMPACK,
+        AbilityId.COMMANDCENTERTRAIN_SCV,
+    ]
+    # Costs 50/0 1, 50/0 1, 400/300 6, 100/0 0, 100/100 and 50/0
+    # Affordable (minerals, vespene, supply left, with supply check, without supply check)
+    cases = [
+        (50, 0, 1, [True, True, False, False, False, True], [True, True, False, False, False, True]),
+        (100, 100, 0, [False, False, False, True, True, True], [True, True, False, True, True, True]),
+        (1000, 1000, 10, [True] * 6, [True] * 6),
+        (0, 0, 0, [False] * 6, [False] * 6),
+    ]
+    for minerals, vespene, supply_left, expected, expected_without_supply in cases:
+        bot.minerals, bot.vespene, bot.supply_left = minerals, vespene, supply_left
+        assert bot.can_afford_many(items).tolist() == expected
+        assert bot.can_afford_many(items, check_supply_cost=False).tolist() == expected_without_supply
+
+    # Before the table is built
+    cost_table, bot.cost_table = bot.cost_table, None
+    bot.minerals, bot.vespene, bot.supply_left = 100, 100, 0
+    assert bot.can_afford_many(items).tolist() == [False, False, False, True, True, True]
+    assert bot.calculate_cost(UnitTypeId.REACTOR) == Cost(50, 50)
+    assert bot.calculate_cost(UnitTypeId.BANELING) == Cost(25, 25)
+    assert bot.calculate_cost(UnitTypeId.ARCHON) == Cost(175, 275)
+    bot.cost_table = cost_table
+
+    assert bot.cost_table.affordable_amount(items[:4], 200, 0, 3).tolist() == [3, 3, 0, 2]
+    assert bot.cost_table.affordable_amount([AbilityId.MOVE_MOVE], 0, 0).tolist() == [-1]
+    assert np.array_equal(bot.cost_table.rows([]), np.array([], dtype=np.int64))
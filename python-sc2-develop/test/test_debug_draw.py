@@ -0,0 +1,80 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_debug_draw.py
+"""
+import asyncio
+from test.test_protocol import FakeWebSocket
+from typing import List
+
+from s2clientprotocol import debug_pb2 as debug_pb
+
+from sc2.client import Client, DrawItemLine, DrawItemWorldText
+from sc2.position import Point3
+
+
+class RecordingClient(Client):
+    """ Keeps the debug draw requests instead of sending them. """
+
+    def __init__(self):
+        super().__init__(FakeWebSocket())
+        self.draws: List[debug_pb.DebugDraw] = []
+
+    async def _execute(self, **kwargs):
+        self.draws.append(kwargs["debug"].debug[0].draw)
+
+
+def test_debug_layer():
+    client = RecordingClient()
+    layer = client.debug_layer
+    labels = {tag: layer.add(DrawItemWorldText(Point3((tag, tag, 10)), text=str(tag)), handle=tag) for tag in range(5)}
+    line = layer.add(DrawItemLine(Point3((0, 0, 10)), Point3((5, 5, 10))))
+    assert labels == {tag: tag for tag in range(5)}
+    assert len(layer) == 6 and line in layer
+
+    async def run():
+        # The layer is sent once, and again only after it changed
+        await client._send_debug()
+        await client._send_debug()
+        assert len(client.draws) == 1
+        assert len(client.draws[0].text) == 5
+        assert len(client.draws[0].lines) == 1
+
+        layer.update(0, DrawItemWorldText(Point3((0, 0, 10)), text="0"))
+        await client._send_debug()
+        assert len(client.draws) == 1
+
+        layer.update(0, DrawItemWorldText(Point3((0, 0, 10)), text="changed"))
+        client.debug_text_world("frame", Point3((1, 2, 10)))
+        await client._send_debug()
+        assert len(client.draws) == 2
+        assert sorted(text.text for text in client.draws[1].text) == ["1", "2", "3", "4", "changed", "frame"]
+
+        layer.remove(line)
+        layer.remove(line)
+        await client._send_debug()
+        assert len(client.draws[2].lines) == 0
+
+        # Nothing left to draw clears the drawings once
+        layer.clear()
+        assert layer.hash == 0
+        await client._send_debug()
+        await client._send_debug()
+        assert len(client.draws) == 4
+        assert len(client.draws[3].text) == 0
+
+    asyncio.run(run())
+
+
+def test_debug_draw_interval():
+    client = RecordingClient()
+    client.debug_draw_interval = 4
+
+    async def run():
+        for game_loop in range(10):
+            client.debug_text_world(str(game_loop), Point3((1, 2, 10)))
+            await client._send_debug(game_loop)
+        # Frame drawings are cleared even if they were not sent
+        assert not client._debug_texts
+
+    asyncio.run(run())
+    assert [draw.text[0].text for draw in client.draws] == ["0", "4", "8"]
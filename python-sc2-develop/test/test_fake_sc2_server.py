@@ -0,0 +1,60 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_fake_sc2_server.py
+"""
+import asyncio
+import random
+from test.fake_sc2_server import FakeSC2Server
+from test.test_pickled_data import MAPS
+from typing import List
+
+from aiohttp import ClientSession
+
+from sc2.bot_ai import BotAI
+from sc2.client import Client
+from sc2.data import Race, Result
+from sc2.main import _play_game
+from sc2.player import Bot
+
+
+class FakeServerBot(BotAI):
+
+    def __init__(self):
+        self.game_loops: List[int] = []
+        self.distances: List[float] = []
+        self.result = None
+
+    async def on_step(self, iteration: int):
+        self.game_loops.append(self.state.game_loop)
+        for worker in self.workers:
+            worker.move(self.game_info.map_center)
+        if iteration == 0:
+            self.distances = await self.client.query_pathings(
+                [[worker, self.game_info.map_center] for worker in self.workers]
+            )
+        self.client.debug_text_simple(str(iteration))
+
+    async def on_end(self, game_result: Result):
+        self.result = game_result
+
+
+def test_fake_sc2_server():
+    bot = FakeServerBot()
+
+    async def run():
+        async with FakeSC2Server(random.choice(MAPS), game_loops=40, result=Result.Defeat) as server:
+            async with ClientSession() as session:
+                ws = await session.ws_connect(server.ws_url)
+                result = await _play_game(Bot(Race.Terran, bot), Client(ws), False, None)
+                await ws.close()
+        return server, result
+
+    server, result = asyncio.run(run())
+    assert result == Result.Defeat
+    assert bot.result == Result.Defeat
+    assert bot.game_loops == list(range(0, 40, 4))
+    assert len(bot.distances) == len(bot.workers)
+    assert all(distance > 0 for distance in bot.distances)
+    assert server.requests["step"] == 10
+    assert server.requests["action"] == 10
+    assert server.requests["query"] == 1
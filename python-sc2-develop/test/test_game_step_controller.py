@@ -0,0 +1,65 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_game_step_controller.py
+"""
+import asyncio
+import random
+from test.test_pickled_data import MAPS, build_bot_object_from_pickle_data, load_map_pickle_data
+
+from sc2.game_state import GameState
+from sc2.game_step_controller import GameStepController
+
+
+def test_game_step_controller():
+    controller = GameStepController(min_step=1, max_step=8, enemy_threshold=3, calm_loops=20)
+    # Quiet game: the game step rises gradually up to max_step
+    steps = [4]
+    for game_loop in range(0, 40, 4):
+        steps.append(controller.update(game_loop, steps[-1], 0, 0, 0.001))
+    assert steps[:3] == [4, 8, 8]
+    assert max(steps) == 8
+
+    # Fights lower the game step immediately
+    assert controller.update(100, 8, 0, 1, 0.001) == 1
+    assert controller.update(101, 1, 5, 0, 0.001) == 1
+    # A few enemy units are not a fight, but the game step stays low shortly after a fight
+    assert controller.update(102, 1, 2, 0, 0.001) == 1
+    assert controller.update(115, 1, 0, 0, 0.001) == 1
+    assert controller.update(121, 1, 0, 0, 0.001) == 2
+    assert controller.update(123, 2, 0, 0, 0.001) == 4
+
+
+def test_game_step_controller_step_duration():
+    controller = GameStepController(min_step=1, max_step=6)
+    # In realtime a game loop takes 1 / 22.4 seconds, a slow on_step needs a larger game step even in fights
+    assert controller.update(0, 1, 10, 5, 0.1, realtime=True) == 2
+    assert controller.update(2, 2, 10, 5, 0.1, realtime=True) == 3
+    assert controller.update(5, 3, 10, 5, 1, realtime=True) == 6
+    assert controller.update(11, 6, 10, 5, 0.001, realtime=True) == 1
+    # Without realtime the duration is only used if a budget is given
+    assert controller.update(12, 1, 10, 5, 0.1) == 1
+    controller.loop_time_budget = 0.05
+    assert controller.update(13, 1, 10, 5, 0.1) == 2
+
+
+def test_game_step_controller_bot():
+    raw_game_data, raw_game_info, raw_observation = load_map_pickle_data(random.choice(MAPS))
+    bot = build_bot_object_from_pickle_data(raw_game_data, raw_game_info, raw_observation)
+    bot._update_game_step()
+    assert bot.client.game_step == 4
+
+    bot.game_step_controller = GameStepController(min_step=2, max_step=8, enemy_threshold=1000)
+    bot._update_game_step()
+    assert bot.client.game_step == 8
+
+    # A worker lost health since the last step
+    next_observation = type(raw_observation)()
+    next_observation.CopyFrom(raw_observation)
+    raw_worker = next(unit for unit in next_observation.observation.raw_data.units if unit.tag == bot.workers[0].tag)
+    raw_worker.health -= 5
+    bot._prepare_step(GameState(next_observation))
+    assert bot._damage_events == 0
+    asyncio.run(bot.issue_events())
+    assert bot._damage_events == 1
+    bot._update_game_step()
+    assert bot.client.game_step == 2
@@ -0,0 +1,82 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_observation_recorder.py
+"""
+import random
+from pathlib import Path
+from test.test_pickled_data import MAPS, load_map_pickle_data
+from typing import List
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.bot_ai import BotAI
+from sc2.data import Result
+from sc2.main import run_recorded
+from sc2.observation_recorder import ObservationReader, ObservationRecorder
+
+
+class RecordedBot(BotAI):
+
+    def __init__(self):
+        self.game_loops: List[int] = []
+        self.result = None
+
+    async def on_step(self, iteration: int):
+        assert iteration == len(self.game_loops)
+        self.game_loops.append(self.state.game_loop)
+        for worker in self.workers:
+            worker.move(self.game_info.map_center)
+
+    async def on_end(self, game_result: Result):
+        self.result = game_result
+
+
+def record_game(path: Path, steps: int, result: Result = None):
+    raw_game_data, raw_game_info, raw_observation = load_map_pickle_data(random.choice(MAPS))
+    player_id = raw_observation.observation.player_common.player_id
+    with ObservationRecorder(path) as recorder:
+        recorder.record(raw_game_data)
+        recorder.record(raw_game_info)
+        recorder.record(sc_pb.Response(ping=sc_pb.ResponsePing(base_build=12345)))
+        # Like in a live game: one observation to start the bot, then one per step
+        for step in range(steps + 1):
+            response = sc_pb.Response(observation=raw_observation)
+            response.observation.observation.game_loop = max(step - 1, 0) * 4
+            recorder.record(response)
+            recorder.record(raw_game_info)
+        # Requests that are not needed to play the recorded game are ignored
+        recorder.record(sc_pb.Response(step=sc_pb.ResponseStep()))
+        if result is not None:
+            response = sc_pb.Response(observation=raw_observation)
+            response.observation.player_result.add(player_id=player_id, result=result.value)
+            recorder.record(response)
+
+
+def test_observation_recorder(tmp_path: Path):
+    path = tmp_path / "game.sc2obs"
+    record_game(path, 5, Result.Victory)
+    reader = ObservationReader(path)
+    assert len(reader) == 7
+    assert reader.observation(3).observation.observation.game_loop == 8
+    assert [name for name, _response in reader][:4] == ["data", "game_info", "ping", "observation"]
+
+    # A partially written last record is skipped
+    with open(path, "ab") as f:
+        f.write(b"\x04\xff\x00\x00\x00abc")
+    assert len(ObservationReader(path)) == 7
+
+
+def test_run_recorded(tmp_path: Path):
+    path = tmp_path / "game.sc2obs"
+    record_game(path, 5, Result.Victory)
+    bot = RecordedBot()
+    assert run_recorded(bot, path) == Result.Victory
+    assert bot.result == Result.Victory
+    assert bot.game_loops == [0, 4, 8, 12, 16]
+    assert bot.base_build == 12345
+
+    record_game(path, 3)
+    bot = RecordedBot()
+    assert run_recorded(bot, path) == Result.Undecided
+    assert bot.result == Result.Undecided
+    assert bot.game_loops == [0, 4, 8]
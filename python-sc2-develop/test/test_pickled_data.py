@@ -8,6 +8,7 @@ It will load the pickle files, recreate the bot object from scratch and tests mo
 All functions that require some kind of query or interaction with the API directly will have to be tested in the "autotest_bot.py" in a live game.
 """
 
+import asyncio
 import lzma
 import math
 import pickle
@@ -18,6 +19,7 @@ from contextlib import suppress
 from pathlib import Path
 from typing import Any, List, Tuple
 
+import numpy as np
 from google.protobuf.internal import api_implementation
 from hypothesis import given, settings
 from hypothesis import strategies as st
@@ -34,7 +36,7 @@ from sc2.ids.ability_id import AbilityId
 from sc2.ids.buff_id import BuffId
 from sc2.ids.unit_typeid import UnitTypeId
 from sc2.ids.upgrade_id import UpgradeId
-from sc2.pixel_map import PixelMap
+from sc2.pixel_map import PixelMap, PixelMapRecorder
 from sc2.position import Point2, Point3, Rect, Size
 from sc2.unit import Unit
 from sc2.units import Units
@@ -511,6 +513,176 @@ def test_pixelmap():
     pathing_grid.copy()
     pathing_grid.print()
 
+    # Copies of writable maps are independent, the original stays writable
+    pathing_grid_copy: PixelMap = pathing_grid.copy()
+    assert not np.shares_memory(pathing_grid.data_numpy, pathing_grid_copy.data_numpy)
+    changed_value = 1 - pathing_grid[Point2((1, 1))]
+    pathing_grid.data_numpy[1, 1] = changed_value
+    assert pathing_grid[Point2((1, 1))] == changed_value
+    assert pathing_grid_copy[Point2((1, 1))] != changed_value
+    pathing_grid_copy[Point2((0, 0))] = 0
+    assert pathing_grid_copy.is_empty(Point2((0, 0)))
+    assert pathing_grid.is_set(Point2((0, 0)))
+
+    # Byte maps are read-only views on the proto data until changed, copies share them until the copy is changed
+    terrain_height: PixelMap = bot.game_info.terrain_height
+    assert not terrain_height.data_numpy.flags.writeable
+    terrain_height_copy: PixelMap = terrain_height.copy()
+    assert np.shares_memory(terrain_height.data_numpy, terrain_height_copy.data_numpy)
+    original_height = terrain_height[Point2((0, 0))]
+    changed_height = 0 if original_height else 1
+    terrain_height_copy[Point2((0, 0))] = changed_height
+    assert terrain_height_copy[Point2((0, 0))] == changed_height
+    assert terrain_height[Point2((0, 0))] == original_height
+    assert not np.shares_memory(terrain_height.data_numpy, terrain_height_copy.data_numpy)
+    terrain_height[Point2((0, 0))] = 1
+    assert terrain_height[Point2((0, 0))] == 1
+
+
+def test_pixelmap_export(tmp_path: Path, capsys):
+    bot: BotAI = get_map_specific_bot(random.choice(MAPS))
+    pathing_grid: PixelMap = bot.game_info.pathing_grid
+
+    pathing_grid.print(wide=True)
+    rows = capsys.readouterr().out.splitlines()
+    assert len(rows) == pathing_grid.height
+    assert all(len(row) == 2 * pathing_grid.width for row in rows)
+    x, y = bot.game_info.map_center.rounded
+    assert rows[y][2 * x] == ("#" if pathing_grid.is_set((x, y)) else " ")
+
+    image_path = tmp_path / "pathing_grid.png"
+    pathing_grid.save_image(image_path)
+    # pylint: disable=C0415
+    from PIL import Image
+
+    with Image.open(image_path) as image:
+        assert image.size == (pathing_grid.width, pathing_grid.height)
+        assert image.getpixel((x, y)) == (0, 0, pathing_grid[x, y])
+
+    recorder = PixelMapRecorder()
+    for game_loop in range(3):
+        recorder.add(game_loop, visibility=bot.state.visibility, pathing_grid=pathing_grid)
+    assert len(recorder) == 3
+    recorder.save(tmp_path / "frames.npz")
+    with np.load(tmp_path / "frames.npz") as frames:
+        assert frames["game_loop"].tolist() == [0, 1, 2]
+        assert frames["pathing_grid"].shape == (3, pathing_grid.height, pathing_grid.width)
+        assert (frames["visibility"][2] == bot.state.visibility.data_numpy).all()
+
+    recorder = PixelMapRecorder(memmap_folder=tmp_path / "frames", max_frames=2)
+    for game_loop in range(3):
+        recorder.add(game_loop, creep=bot.state.creep)
+    recorder.save()
+    assert np.load(tmp_path / "frames" / "game_loop.npy").tolist() == [0, 1]
+    creep = np.load(tmp_path / "frames" / "creep.npy", mmap_mode="r")
+    assert (creep[1] == bot.state.creep.data_numpy).all()
+
+
+def test_visibility_and_creep_changes():
+    raw_game_data, raw_game_info, raw_observation = load_map_pickle_data(random.choice(MAPS))
+    map_state = raw_observation.observation.raw_data.map_state
+    height, width = map_state.visibility.size.y, map_state.visibility.size.x
+
+    def set_map_state(observation, visible_area: Tuple[slice, slice], creep_points: List[Tuple[int, int]]):
+        visibility = np.zeros((height, width), dtype=np.uint8)
+        visibility[visible_area] = 2
+        observation.observation.raw_data.map_state.visibility.data = visibility.tobytes()
+        creep = np.zeros((height, width), dtype=np.uint8)
+        for x, y in creep_points:
+            creep[y, x] = 1
+        observation.observation.raw_data.map_state.creep.data = np.packbits(creep).tobytes()
+
+    # First step: a visible square from (10, 10) to (11, 11) and no creep
+    set_map_state(raw_observation, (slice(10, 12), slice(10, 12)), [])
+    bot: BotAI = build_bot_object_from_pickle_data(raw_game_data, raw_game_info, raw_observation)
+    # A pathable grid point whose four neighbors are pathable as well
+    pathing = bot.game_info.pathing_grid.data_numpy != 0
+    inner = pathing[1:-1, 1:-1] & pathing[:-2, 1:-1] & pathing[2:, 1:-1] & pathing[1:-1, :-2] & pathing[1:-1, 2:]
+    creep_y, creep_x = (int(value) + 1 for value in np.argwhere(inner)[0])
+    # In the first step, everything visible and all creep is new
+    assert bot.newly_visible.sum() == 4
+    assert bot.creep_spread.tolist() == []
+    assert bot.creep_front.tolist() == []
+
+    # Second step: the visible square grows to (10, 10) to (13, 13) and creep appears on one grid point
+    next_observation = type(raw_observation)()
+    next_observation.CopyFrom(raw_observation)
+    next_observation.observation.game_loop += 4
+    set_map_state(next_observation, (slice(10, 14), slice(10, 14)), [(creep_x, creep_y)])
+    bot._prepare_step(state=GameState(next_observation), proto_game_info=raw_game_info)
+
+    assert bot.visibility_changed.sum() == 12
+    assert not bot.visibility_changed[10, 10]
+    assert bot.visibility_changed[13, 13]
+    assert bot.newly_visible.sum() == 12
+    assert not bot.newly_visible[11, 11]
+    assert bot.newly_visible_areas == [Rect((10, 10, 4, 4))]
+    assert bot.creep_changed.sum() == 1
+    assert bot.creep_changed[creep_y, creep_x]
+    assert bot.creep_spread.tolist() == [[creep_x, creep_y]]
+    assert bot.creep_front.tolist() == [[creep_x, creep_y]]
+
+    # Third step: the creep recedes and nothing becomes visible
+    next_observation.observation.game_loop += 4
+    set_map_state(next_observation, (slice(10, 14), slice(10, 14)), [])
+    bot._prepare_step(state=GameState(next_observation), proto_game_info=raw_game_info)
+
+    assert not bot.visibility_changed.any()
+    assert not bot.newly_visible.any()
+    assert bot.newly_visible_areas == []
+    assert bot.creep_changed.sum() == 1
+    assert bot.creep_spread.tolist() == []
+    assert bot.creep_front.tolist() == []
+
+
+def test_pathing_grid_requests():
+    raw_game_data, raw_game_info, raw_observation = load_map_pickle_data(random.choice(MAPS))
+    bot: BotAI = build_bot_object_from_pickle_data(raw_game_data, raw_game_info, raw_observation)
+    requests = []
+
+    async def execute(**kwargs):
+        requests.append(kwargs)
+        return raw_game_info
+
+    bot.client._execute = execute
+    # Same structures and neutral units as in the last game info, no request needed
+    bot._prepare_step(state=GameState(raw_observation))
+    asyncio.run(bot._request_pathing_grid())
+    assert not requests
+
+    # Moving a worker does not change the pathing grid
+    next_observation = type(raw_observation)()
+    next_observation.CopyFrom(raw_observation)
+    raw_units = next_observation.observation.raw_data.units
+    worker_index = next(i for i, unit in enumerate(raw_units) if unit.tag == bot.workers.first.tag)
+    raw_units[worker_index].pos.x += 1
+    bot._prepare_step(state=GameState(next_observation))
+    asyncio.run(bot._request_pathing_grid())
+    assert not requests
+
+    # A destroyed structure does
+    townhall_index = next(i for i, unit in enumerate(raw_units) if unit.tag == bot.townhalls.first.tag)
+    del raw_units[townhall_index]
+    bot._prepare_step(state=GameState(next_observation))
+    asyncio.run(bot._request_pathing_grid())
+    assert len(requests) == 1
+    asyncio.run(bot._request_pathing_grid())
+    assert len(requests) == 1
+
+    # Structures built or destroyed in the fog of war are caught by the periodic update
+    next_observation.observation.game_loop += bot.pathing_grid_refresh_loops - 1
+    bot._prepare_step(state=GameState(next_observation))
+    asyncio.run(bot._request_pathing_grid())
+    assert len(requests) == 1
+    next_observation.observation.game_loop += 1
+    bot._prepare_step(state=GameState(next_observation))
+    asyncio.run(bot._request_pathing_grid())
+    assert len(requests) == 2
+
+    bot.update_pathing_grid_every_step = True
+    asyncio.run(bot._request_pathing_grid())
+    assert len(requests) == 3
+
 
 def test_blip():
     bot: BotAI = get_map_specific_bot(random.choice(MAPS))
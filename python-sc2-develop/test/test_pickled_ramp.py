@@ -18,6 +18,10 @@ from sc2.game_info import Ramp
 from sc2.position import Point2
 from sc2.unit import Unit
 from sc2.units import Units
+from sc2.wall_solver import Wall
+
+# Maps where the main base ramp is wider than the standard ramp, the upper side of the ramp has 4 tiles
+WIDE_MAIN_RAMP_MAPS = {"HonorgroundsLE"}
 
 
 # From https://docs.pytest.org/en/latest/example/parametrize.html#a-quick-port-of-testscenarios
@@ -85,6 +89,64 @@ class TestClass:
                 assert ramp.protoss_wall_buildings == frozenset()
                 assert ramp.protoss_wall_warpin is None
 
+    def test_ramp_walls(self, map_path: Path):
+        bot = get_map_specific_bot(map_path)
+        bot.game_info.map_ramps, bot.game_info.vision_blockers = bot.game_info._find_ramps_and_vision_blockers()
+        bot.game_info.player_start_location = bot.townhalls[0].position
+        ramp: Ramp = bot.main_base_ramp
+
+        terran_footprints, protoss_footprints = [2, 3, 2], [3, 3]
+        if map_path.stem in WIDE_MAIN_RAMP_MAPS:
+            # The top of the ramp is too wide for 2 supply depots and a barracks or 2 gateways
+            assert ramp.find_wall(terran_footprints) is None
+            assert ramp.find_wall(protoss_footprints, gap=True) is None
+            terran_footprints, protoss_footprints = [2, 3, 2, 2], [3, 3, 3]
+
+        # Terran wall with supply depots and a barracks
+        wall: Wall = ramp.find_wall(terran_footprints)
+        assert wall
+        assert wall.gap is None
+        assert len(wall.buildings) == len(terran_footprints)
+        assert ramp.find_wall(terran_footprints) is wall
+        for position, (width, height) in zip(wall.buildings, wall.footprints):
+            for x in range(int(position.x - width / 2), int(position.x + width / 2)):
+                for y in range(int(position.y - height / 2), int(position.y + height / 2)):
+                    assert bot.game_info.placement_grid[(x, y)]
+                    assert bot.game_info.pathing_grid[(x, y)]
+            assert position.distance_to(ramp.top_center) < 8
+
+        # Protoss wall with gateways and a gap for a unit
+        wall = ramp.find_wall(protoss_footprints, gap=True)
+        assert wall
+        assert wall.gap
+        assert len(wall.buildings) == len(protoss_footprints)
+        assert bot.game_info.pathing_grid[(int(wall.gap.x), int(wall.gap.y))]
+
+    def test_map_analysis(self, map_path: Path):
+        bot = get_map_specific_bot(map_path)
+        bot.game_info.map_ramps, bot.game_info.vision_blockers = bot.game_info._find_ramps_and_vision_blockers()
+        bot.game_info.player_start_location = bot.townhalls[0].position
+        analysis = bot.game_info.map_analysis
+        assert analysis is bot.game_info.map_analysis
+
+        main = analysis.region_at(bot.townhalls[0].position)
+        assert main
+        # The main base ramp is a choke between two regions
+        ramp: Ramp = bot.main_base_ramp
+        lower = analysis.region_at(ramp.bottom_center)
+        assert lower and analysis.region_at(ramp.top_center) == main != lower
+        assert all(analysis.choke_between(main, neighbor) for neighbor in analysis.neighbors(main))
+
+        for start_location in bot.game_info.start_locations:
+            if start_location.distance_to(bot.townhalls[0].position) < 5:
+                continue
+            enemy_main = analysis.region_at(start_location)
+            assert enemy_main and enemy_main != main
+            path = analysis.region_path(main, enemy_main)
+            assert path[0] == main and path[-1] == enemy_main
+            for a, b in zip(path, path[1:]):
+                assert analysis.choke_between(a, b).other(a.label) == b.label
+
     def test_bot_ai(self, map_path: Path):
         bot = get_map_specific_bot(map_path)
 
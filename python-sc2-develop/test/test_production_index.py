@@ -0,0 +1,89 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_production_index.py
+"""
+import random
+from test.test_pickled_data import MAPS, build_bot_object_from_pickle_data, load_map_pickle_data
+
+import pytest
+
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.ids.upgrade_id import UpgradeId
+
+
+def add_structure(raw_units, template, tag: int, unit_type: UnitTypeId, build_progress: float = 1, x: float = 0):
+    structure = raw_units.add()
+    structure.CopyFrom(template)
+    structure.tag = tag
+    structure.unit_type = unit_type.value
+    structure.build_progress = build_progress
+    structure.pos.x += x
+    del structure.orders[:]
+    return structure
+
+
+def build_production_bot():
+    """ Terran bot with an SCV in production, an upgrade in research, a barracks with reactor,
+    a bunker whose construction is resumed by an SCV and an SCV on its way to build a barracks. """
+    raw_game_data, raw_game_info, raw_observation = load_map_pickle_data(random.choice(MAPS))
+    observation = raw_observation.observation
+    observation.player_common.minerals = 1000
+    raw_units = observation.raw_data.units
+    command_center = next(
+        unit for unit in raw_units if unit.alliance == 1 and unit.unit_type == UnitTypeId.COMMANDCENTER.value
+    )
+    command_center.orders.add(ability_id=AbilityId.COMMANDCENTERTRAIN_SCV.value, progress=0.4)
+    add_structure(raw_units, command_center, 1, UnitTypeId.SUPPLYDEPOT, x=6)
+    engineering_bay = add_structure(raw_units, command_center, 2, UnitTypeId.ENGINEERINGBAY, x=-6)
+    engineering_bay.orders.add(
+        ability_id=AbilityId.ENGINEERINGBAYRESEARCH_TERRANINFANTRYWEAPONSLEVEL1.value, progress=0.3
+    )
+    barracks = add_structure(raw_units, command_center, 3, UnitTypeId.BARRACKS, x=10)
+    barracks.add_on_tag = 4
+    add_structure(raw_units, command_center, 4, UnitTypeId.BARRACKSREACTOR, x=12.5)
+    add_structure(raw_units, command_center, 5, UnitTypeId.BUNKER, build_progress=0.5, x=-10)
+    scvs = [unit for unit in raw_units if unit.alliance == 1 and unit.unit_type == UnitTypeId.SCV.value]
+    del scvs[0].orders[:]
+    scvs[0].orders.add(ability_id=AbilityId.TERRANBUILD_BUNKER.value, target_unit_tag=5)
+    del scvs[1].orders[:]
+    scvs[1].orders.add(ability_id=AbilityId.TERRANBUILD_BARRACKS.value).target_world_space_pos.x = 30
+    return build_bot_object_from_pickle_data(raw_game_data, raw_game_info, raw_observation)
+
+
+def test_production_index():
+    bot = build_production_bot()
+    production_index = bot._production_index
+    # Built once per frame
+    assert bot._production_index is production_index
+
+    assert bot.already_pending(UnitTypeId.SCV) == 1
+    assert bot.already_pending_upgrade(UpgradeId.TERRANINFANTRYWEAPONSLEVEL1) == pytest.approx(0.3)
+    assert bot.already_pending_upgrade(UpgradeId.STIMPACK) == 0
+    # The bunker is counted once, from the order of the SCV that resumes it
+    assert bot.already_pending(UnitTypeId.BUNKER) == 1
+    assert bot.already_pending(UnitTypeId.BARRACKS) == 1
+    assert bot.worker_en_route_to_build(UnitTypeId.BARRACKS) == 1
+    assert bot.worker_en_route_to_build(UnitTypeId.BUNKER) == 0
+    assert bot.structure_type_build_progress(UnitTypeId.BUNKER) == 0.5
+    assert bot.structure_type_build_progress(UnitTypeId.BARRACKS) == 1
+    assert bot.structure_type_build_progress(UnitTypeId.FACTORY) == 0
+    assert bot.structure_type_build_progress(UnitTypeId.SUPPLYDEPOT) == 1
+    assert bot.tech_requirement_progress(UnitTypeId.MARINE) == 1
+    assert not bot.structures_without_construction_SCVs
+
+    barracks = bot.structures.find_by_tag(3)
+    assert production_index.reactor_structure_tags == {3}
+    assert not production_index.techlab_structure_tags
+    assert production_index.build_slots(barracks) == 2
+    assert production_index.build_slots(bot.townhalls.first) == 0
+
+    # Both marines are trained in the barracks with reactor, the busy command center does not train an SCV
+    assert bot.train(UnitTypeId.MARINE, 3) == 2
+    assert [action.unit.tag for action in bot.actions] == [3, 3]
+    assert bot.train(UnitTypeId.SCV) == 0
+
+    # Structures of several types are in the order of the observation, not in the order of the types
+    structure_types = [UnitTypeId.BARRACKS, UnitTypeId.ENGINEERINGBAY, UnitTypeId.SUPPLYDEPOT]
+    for type_ids in [structure_types, structure_types[::-1]]:
+        assert [structure.tag for structure in production_index.structures_of_types(type_ids)] == [1, 2, 3]
@@ -0,0 +1,51 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_profiler.py
+"""
+import asyncio
+import time
+from pathlib import Path
+
+from sc2.profiler import AWAIT_FRAME, StepProfiler
+
+
+def slow_selector(duration: float) -> int:
+    end = time.perf_counter() + duration
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(100))
+    return total
+
+
+async def on_step():
+    slow_selector(0.1)
+    # Samples while waiting for a response are recorded as a separate stack
+    await asyncio.sleep(0.05)
+
+
+def test_step_profiler(tmp_path: Path):
+    profiler = StepProfiler(interval=0.001)
+    profiler.start()
+    # Samples are only taken in the sampling block
+    slow_selector(0.05)
+    with profiler.sampling():
+        asyncio.run(on_step())
+    slow_selector(0.05)
+    profiler.stop()
+
+    assert profiler.samples > 10
+    assert all(stack[0].startswith("on_step") or stack == (AWAIT_FRAME, ) for stack in profiler.stacks)
+    slow_selector_stacks = [stack for stack in profiler.stacks if stack[-1].startswith("slow_selector")]
+    assert slow_selector_stacks
+    function, self_fraction, total_fraction = profiler.top(1)[0]
+    assert function.startswith("slow_selector") or function == AWAIT_FRAME
+    assert 0 < self_fraction <= total_fraction <= 1
+    assert "slow_selector" in profiler.summary()
+
+    path = tmp_path / "profile.txt"
+    profiler.write(path)
+    lines = path.read_text().splitlines()
+    assert len(lines) == len(profiler.stacks)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) == max(profiler.stacks.values())
+    assert tuple(stack.split(";")) in profiler.stacks
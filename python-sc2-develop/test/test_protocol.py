@@ -0,0 +1,180 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_protocol.py
+"""
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.protocol import ConnectionAlreadyClosed, Protocol
+
+
+class FakeWebSocket:
+    """ Answers each request after 'latency' seconds, in the order the requests were sent. """
+
+    def __init__(self, latency: float = 0.01):
+        self.latency = latency
+        # If set, send_bytes waits for it after the request was written, like aiohttp waiting for the drain
+        self.drain: Optional[asyncio.Event] = None
+        self.sent = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.closed = False
+        self._responses: asyncio.Queue = asyncio.Queue()
+
+    async def send_bytes(self, data: bytes):
+        if self.closed:
+            raise TypeError("Connection closed")
+        request = sc_pb.Request()
+        request.ParseFromString(data)
+        self.sent += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.in_flight, self.max_in_flight)
+        response = sc_pb.Response(status=sc_pb.in_game)
+        # Answer with the number of the request, to check that responses are matched to the right request
+        response.ping.game_version = str(self.sent)
+        asyncio.get_running_loop().call_later(self.latency, self._responses.put_nowait, response.SerializeToString())
+        if self.drain is not None:
+            await self.drain.wait()
+
+    async def receive_bytes(self) -> bytes:
+        if self.closed:
+            raise TypeError("Connection closed")
+        response_bytes = await self._responses.get()
+        if response_bytes is None:
+            # Like aiohttp, receiving a close message instead of binary data raises a TypeError
+            raise TypeError("Connection closed")
+        self.in_flight -= 1
+        return response_bytes
+
+    def close(self):
+        self.closed = True
+        self._responses.put_nowait(None)
+
+
+async def ping_versions(protocol: Protocol, count: int) -> List[str]:
+    responses = await asyncio.gather(*(protocol.ping() for _ in range(count)))
+    return [response.ping.game_version for response in responses]
+
+
+def test_protocol_sequential():
+
+    async def run():
+        ws = FakeWebSocket()
+        protocol = Protocol(ws)
+        assert await ping_versions(protocol, 5) == ["1", "2", "3", "4", "5"]
+        assert ws.max_in_flight == 1
+
+    asyncio.run(run())
+
+
+def test_protocol_pipelined():
+
+    async def run():
+        ws = FakeWebSocket(latency=0.05)
+        protocol = Protocol(ws)
+        protocol.pipelined = True
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        assert await ping_versions(protocol, 5) == ["1", "2", "3", "4", "5"]
+        # All requests were sent before the first response arrived
+        assert ws.max_in_flight == 5
+        assert loop.time() - t0 < 5 * ws.latency
+        assert not protocol._pending
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_protocol_cancel(pipelined: bool):
+
+    async def run():
+        ws = FakeWebSocket()
+        protocol = Protocol(ws)
+        protocol.pipelined = pipelined
+        task = asyncio.create_task(protocol.ping())
+        await asyncio.sleep(0)
+        # Cancelling a request multiple times must not break the connection
+        task.cancel()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The response to the cancelled request is dropped, the next request gets its own response
+        assert (await protocol.ping()).ping.game_version == "2"
+        assert ws.in_flight == 0
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("pipelined", [False, True])
+def test_protocol_cancel_while_sending(pipelined: bool):
+
+    async def run():
+        ws = FakeWebSocket()
+        ws.drain = asyncio.Event()
+        protocol = Protocol(ws)
+        protocol.pipelined = pipelined
+        task = asyncio.create_task(protocol.ping())
+        await asyncio.sleep(0)
+        # The request was written and waits for the drain
+        assert ws.sent == 1
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        ws.drain.set()
+        # The response to the cancelled request is dropped, the next request gets its own response
+        assert (await protocol.ping()).ping.game_version == "2"
+        assert ws.in_flight == 0
+        assert not protocol._pending
+
+    asyncio.run(run())
+
+
+def test_protocol_connection_closed():
+
+    async def run():
+        ws = FakeWebSocket()
+        protocol = Protocol(ws)
+        protocol.pipelined = True
+        ws.closed = True
+        with pytest.raises(ConnectionAlreadyClosed):
+            await protocol.ping()
+        ws.closed = False
+        requests = [asyncio.create_task(protocol.ping()) for _ in range(2)]
+        await asyncio.sleep(0)
+        # Requests that wait for a response when the connection closes fail instead of waiting forever
+        ws.close()
+        for result in await asyncio.gather(*requests, return_exceptions=True):
+            assert isinstance(result, ConnectionAlreadyClosed)
+        assert not protocol._pending
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("error", [ConnectionResetError("Connection reset"), ValueError("Bug in the reader")])
+def test_protocol_receive_error(error: Exception):
+
+    async def run():
+        ws = FakeWebSocket()
+        protocol = Protocol(ws)
+        protocol.pipelined = True
+
+        async def receive_bytes():
+            raise error
+
+        ws.receive_bytes = receive_bytes
+        requests = [asyncio.create_task(protocol.ping()) for _ in range(2)]
+        for result in await asyncio.gather(*requests, return_exceptions=True):
+            assert result is error
+        assert not protocol._pending
+        if isinstance(error, ConnectionError):
+            # Connection errors end the reader
+            assert protocol._reader.exception() is None
+        else:
+            # Other errors are raised in the reader task as well
+            assert protocol._reader.exception() is error
+
+    asyncio.run(run())
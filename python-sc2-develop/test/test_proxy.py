@@ -0,0 +1,108 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_proxy.py
+"""
+import asyncio
+import random
+from pathlib import Path
+from test.fake_sc2_server import FakeSC2Process, FakeSC2Server
+from test.test_pickled_data import MAPS, load_map_pickle_data
+from types import SimpleNamespace
+
+import pytest
+from google.protobuf.message import DecodeError
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2.controller import Controller
+from sc2.data import Race, Result, Status
+from sc2.player import BotProcess
+from sc2.proxy import (
+    OBSERVATION_GAME_LOOP,
+    OBSERVATION_OBSERVATION,
+    OBSERVATION_PLAYER_RESULT,
+    RESPONSE_OBSERVATION,
+    RESPONSE_STATUS,
+    Proxy,
+)
+from sc2.wire_format import find_field, read_varint, scan_fields
+
+
+def create_proxy(controller: Controller, game_time_limit: int = None) -> Proxy:
+    player = BotProcess(Path(__file__).parent, [], Race.Terran, name="proxied")
+    return Proxy(controller, player, 1234, game_time_limit)
+
+
+def test_scan_fields():
+    _raw_game_data, _raw_game_info, raw_observation = load_map_pickle_data(random.choice(MAPS))
+    response = sc_pb.Response(observation=raw_observation, status=sc_pb.in_game)
+    data = response.SerializeToString()
+    fields = {number: (start, end) for number, _wire_type, start, end in scan_fields(data)}
+    assert read_varint(data, fields[RESPONSE_STATUS][0])[0] == sc_pb.in_game
+    start, end = fields[RESPONSE_OBSERVATION]
+    assert sc_pb.ResponseObservation.FromString(data[start:end]) == raw_observation
+    observation_field = find_field(data, OBSERVATION_OBSERVATION, start, end)
+    game_loop_field = find_field(data, OBSERVATION_GAME_LOOP, *observation_field)
+    assert read_varint(data, game_loop_field[0])[0] == raw_observation.observation.game_loop
+    assert find_field(data, OBSERVATION_PLAYER_RESULT, start, end) is None
+    with pytest.raises(DecodeError):
+        list(scan_fields(data[:-1]))
+
+
+def test_proxy_requests():
+
+    async def run():
+        async with FakeSC2Server(MAPS[0]) as server, FakeSC2Process(server) as controller:
+            proxy = create_proxy(controller)
+            # Requests that the proxy does not need to look at are forwarded as they are
+            observation_request = sc_pb.Request(observation=sc_pb.RequestObservation(game_loop=5)).SerializeToString()
+            await proxy.parse_request(SimpleNamespace(data=observation_request))
+            await proxy.get_response()
+            assert server.received[-1] == observation_request
+            # The player name is added to join game requests
+            join_request = sc_pb.Request(join_game=sc_pb.RequestJoinGame(race=Race.Terran.value))
+            await proxy.parse_request(SimpleNamespace(data=join_request.SerializeToString()))
+            await proxy.get_response()
+            assert sc_pb.Request.FromString(server.received[-1]).join_game.player_name == "proxied"
+            # Quit is turned into leave game
+            quit_request = sc_pb.Request(quit=sc_pb.RequestQuit()).SerializeToString()
+            await proxy.parse_request(SimpleNamespace(data=quit_request))
+            await proxy.get_response()
+            assert server.requests == {"observation": 1, "join_game": 1, "leave_game": 1}
+
+    asyncio.run(run())
+
+
+def test_proxy_responses():
+    _raw_game_data, _raw_game_info, raw_observation = load_map_pickle_data(random.choice(MAPS))
+    game_loop = raw_observation.observation.game_loop
+
+    async def run():
+        async with FakeSC2Server(MAPS[0]) as server, FakeSC2Process(server) as controller:
+            proxy = create_proxy(controller, game_time_limit=1)
+            proxy.timeout_loop = game_loop + 1
+            join_response = sc_pb.Response(join_game=sc_pb.ResponseJoinGame(player_id=2), status=sc_pb.in_game)
+            await proxy.parse_response(join_response.SerializeToString())
+            assert proxy.player_id == 2
+            assert proxy.controller._status == Status.in_game
+
+            # Observations are forwarded as they are
+            observation_bytes = sc_pb.Response(observation=raw_observation, status=sc_pb.in_game).SerializeToString()
+            assert await proxy.parse_response(observation_bytes) is observation_bytes
+            assert proxy.result is None
+
+            response = sc_pb.Response(observation=raw_observation, status=sc_pb.ended)
+            response.observation.player_result.add(player_id=1, result=Result.Victory.value)
+            response.observation.player_result.add(player_id=2, result=Result.Defeat.value)
+            await proxy.parse_response(response.SerializeToString())
+            assert proxy.controller._status == Status.ended
+            assert proxy.result == {1: Result.Victory, 2: Result.Defeat}
+
+            # The game is declared a tie after the game time limit
+            proxy.result = None
+            response = sc_pb.Response(observation=raw_observation, status=sc_pb.in_game)
+            response.observation.observation.game_loop = game_loop + 2
+            await proxy.parse_response(response.SerializeToString())
+            assert proxy.result == {1: Result.Tie, 2: Result.Tie}
+            assert server.requests == {"action": 1}
+
+    asyncio.run(run())
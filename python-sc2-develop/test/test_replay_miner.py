@@ -0,0 +1,106 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_replay_miner.py
+"""
+import asyncio
+import multiprocessing
+import shutil
+from pathlib import Path
+from test.fake_sc2_server import FakeSC2Process, FakeSC2Server
+from test.test_pickled_data import MAPS
+
+import numpy as np
+import pytest
+from aiohttp import ClientSession
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2 import main, replay_miner
+from sc2.client import Client
+
+REPLAY_FOLDER = Path(__file__).parent / "replays"
+
+
+def test_group_replays_by_version(tmp_path: Path):
+    broken_replay = tmp_path / "broken.SC2Replay"
+    broken_replay.write_bytes(b"not a replay")
+    replay_paths = sorted(REPLAY_FOLDER.glob("*.SC2Replay"))
+    groups, errors = replay_miner.group_replays_by_version(replay_paths + [broken_replay])
+    assert groups == {("Base86383", "22EAC562CD0C6A31FB2C2C21E3AA3680"): replay_paths}
+    assert list(errors) == [broken_replay]
+
+
+def test_feature_columns(tmp_path: Path):
+    columns = replay_miner.FeatureColumns()
+    for game_loop in range(0, 40, 8):
+        columns.append({"game_loop": game_loop, "position": np.array([game_loop, 1.5])})
+    with pytest.raises(ValueError):
+        columns.append({"game_loop": 40})
+    path = tmp_path / "replay_1.npz"
+    columns.save(path)
+    assert [p.name for p in tmp_path.iterdir()] == ["replay_1.npz"]
+    with np.load(path) as data:
+        assert data["game_loop"].tolist() == [0, 8, 16, 24, 32]
+        assert data["position"].shape == (5, 2)
+
+
+def test_mine_replay_with_client():
+
+    async def run():
+        async with FakeSC2Server(MAPS[0], game_loops=40) as server:
+            # The fake SCII plays the recorded observation as replay
+            server.status = sc_pb.in_replay
+            async with ClientSession() as session:
+                ws = await session.ws_connect(server.ws_url)
+                features = await replay_miner.mine_replay_with_client(
+                    Client(ws), observed_id=server.player_id, game_step=8
+                )
+                await ws.close()
+        return features, server
+
+    features, server = asyncio.run(run())
+    assert features.frames == 5
+    arrays = features.to_arrays()
+    assert arrays["game_loop"].tolist() == [0, 8, 16, 24, 32]
+    observation = server.observation.observation
+    assert arrays["minerals"][0] == observation.player_common.minerals
+    assert arrays["supply_used"][0] == observation.player_common.food_used
+    assert all(len(column) == 5 for column in arrays.values())
+
+
+def launch_fake_sc2(**_proc_args) -> FakeSC2Process:
+    # The fake SCII plays the recorded observation as replay, the game ends after 5 steps of 8 game loops
+    return FakeSC2Process(FakeSC2Server(MAPS[0], game_loops=40), start_server=True)
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Patches are only inherited by forked workers")
+def test_mine_replays(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(main, "SC2Process", launch_fake_sc2)
+    # Linux workers copy the replays into the home folder
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    replay_dir = tmp_path / "replays"
+    replay_path = sorted(REPLAY_FOLDER.glob("*.SC2Replay"))[0]
+    # Replays with the same name in different folders
+    for folder in ["a", "b"]:
+        (replay_dir / folder).mkdir(parents=True)
+        shutil.copy(replay_path, replay_dir / folder)
+    output_dir = tmp_path / "features"
+    (output_dir / "a").mkdir(parents=True)
+    # Mined by an earlier run
+    (output_dir / "a" / f"{replay_path.stem}_1.npz").touch()
+
+    # The replay has no player 3
+    results = replay_miner.mine_replays(replay_dir, output_dir, processes=2, observed_ids=(1, 3))
+    assert len(results) == 4
+    results = {(Path(result.replay).parent.name, result.observed_id): result for result in results}
+    assert results["a", 1].skipped
+    assert results["b", 1].output == str(output_dir / "b" / f"{replay_path.stem}_1.npz")
+    assert results["b", 1].frames == 5
+    assert results["b", 1].error is None
+    for folder in ["a", "b"]:
+        assert "The replay has the players [1, 2]" in results[folder, 3].error
+    with np.load(output_dir / "b" / f"{replay_path.stem}_1.npz") as data:
+        assert data["game_loop"].tolist() == [0, 8, 16, 24, 32]
+    assert sorted(str(p.relative_to(output_dir)) for p in output_dir.rglob("*.npz")
+                  ) == [f"{folder}/{replay_path.stem}_1.npz" for folder in ["a", "b"]]
+    # The copied replays are removed again
+    assert not list((tmp_path / "home").rglob("*.SC2Replay"))
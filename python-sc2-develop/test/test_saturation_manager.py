@@ -0,0 +1,130 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_saturation_manager.py
+"""
+import random
+from test.test_pickled_data import MAPS, build_bot_object_from_pickle_data, load_map_pickle_data
+
+from sc2.game_state import GameState
+from sc2.ids.ability_id import AbilityId
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.saturation_manager import SaturationManager
+
+
+class Frames:
+    """ Plays the gather commands of the bot into the pickled observation, one frame at a time. """
+
+    def __init__(self):
+        self.raw_game_data, self.raw_game_info, self.raw_observation = load_map_pickle_data(random.choice(MAPS))
+        self.raw_units = self.raw_observation.observation.raw_data.units
+        self.bot = build_bot_object_from_pickle_data(self.raw_game_data, self.raw_game_info, self.raw_observation)
+
+    def raw_unit(self, tag: int):
+        return next(unit for unit in self.raw_units if unit.tag == tag)
+
+    def next_frame(self, game_loops: int = 1):
+        bot = self.bot
+        for action in bot.actions:
+            orders = self.raw_unit(action.unit.tag).orders
+            del orders[:]
+            orders.add(ability_id=AbilityId.HARVEST_GATHER_SCV.value, target_unit_tag=action.target.tag)
+        bot.actions.clear()
+        bot.unit_tags_received_action.clear()
+        bot._last_action_index_of_unit.clear()
+        self.raw_observation.observation.game_loop += game_loops
+        bot._prepare_step(GameState(self.raw_observation), self.raw_game_info)
+
+
+def test_saturation_manager():
+    frames = Frames()
+    bot = frames.bot
+    manager = SaturationManager(bot)
+    commands = manager.update()
+    assert commands == len(bot.actions) > 0
+    assert set(manager.bindings) == bot.workers.tags
+    assert sum(manager.assigned.values()) == bot.workers.amount
+    assert max(manager.assigned.values()) == 2
+    mineral_tags = bot.mineral_field.closer_than(8, bot.townhalls.first).tags
+    assert set(manager.bindings.values()) <= mineral_tags
+    # Workers that already gathered at a mineral field with room were adopted without a command
+    assert len({action.unit.tag for action in bot.actions}) == commands
+
+    # Workers that follow their binding do not receive commands
+    frames.next_frame()
+    bindings = dict(manager.bindings)
+    assert manager.update() == 0
+    assert manager.bindings == bindings
+
+    # Workers with other orders are released, idle workers are sent back to their mineral field
+    scout, idle_worker = bot.workers[:2]
+    del frames.raw_unit(scout.tag).orders[:]
+    frames.raw_unit(scout.tag).orders.add(ability_id=AbilityId.MOVE_MOVE.value).target_world_space_pos.x = 10
+    del frames.raw_unit(idle_worker.tag).orders[:]
+    frames.next_frame()
+    assert manager.update() == 1
+    assert scout.tag not in manager.bindings
+    assert bot.actions[0].unit.tag == idle_worker.tag
+    assert bot.actions[0].target.tag == bindings[idle_worker.tag]
+
+    # Workers that gather from a resource that is not managed, e.g. long distance mining, are left alone
+    long_distance_miner = bot.workers[3]
+    far_mineral = bot.mineral_field.furthest_to(bot.townhalls.first)
+    orders = frames.raw_unit(long_distance_miner.tag).orders
+    del orders[:]
+    orders.add(ability_id=AbilityId.HARVEST_GATHER_SCV.value, target_unit_tag=far_mineral.tag)
+    frames.next_frame()
+    manager.update()
+    assert long_distance_miner.tag not in manager.bindings
+    assert long_distance_miner.tag not in {action.unit.tag for action in bot.actions}
+    frames.next_frame()
+    manager.update()
+    assert long_distance_miner.tag not in {action.unit.tag for action in bot.actions}
+
+    # Workers that are not visible keep their binding for a moment, e.g. while they are inside a gas building
+    hidden_worker = bot.workers[2]
+    frames.raw_units.remove(frames.raw_unit(hidden_worker.tag))
+    frames.next_frame()
+    manager.update()
+    assert hidden_worker.tag in manager.bindings
+    frames.next_frame(manager.missing_worker_loops + 1)
+    manager.update()
+    assert hidden_worker.tag not in manager.bindings
+
+
+def test_saturation_manager_surplus_and_gas():
+    frames = Frames()
+    bot = frames.bot
+    command_center = next(unit for unit in frames.raw_units if unit.unit_type == UnitTypeId.COMMANDCENTER.value)
+    scv = next(unit for unit in frames.raw_units if unit.unit_type == UnitTypeId.SCV.value)
+    for tag in range(1, 21):
+        new_scv = frames.raw_units.add()
+        new_scv.CopyFrom(scv)
+        new_scv.tag = tag
+        del new_scv.orders[:]
+    geyser = bot.vespene_geyser.closest_to(bot.townhalls.first)
+    refinery = frames.raw_units.add()
+    refinery.CopyFrom(command_center)
+    refinery.tag = 100
+    refinery.unit_type = UnitTypeId.REFINERY.value
+    refinery.pos.x, refinery.pos.y = geyser.position
+    refinery.vespene_contents = 2250
+    frames.next_frame()
+
+    manager = SaturationManager(bot)
+    manager.update(prefer_gas=True)
+    # 8 mineral fields with 2 workers each and one refinery with 3 workers
+    assert bot.workers.amount == 32
+    assert len(manager.bindings) == 19
+    assert manager.assigned[100] == 3
+    # The other idle workers mine at the closest mineral field without being bound
+    unbound_tags = bot.workers.tags - set(manager.bindings)
+    busy_tags = {worker.tag for worker in bot.workers if not worker.is_idle}
+    assert {action.unit.tag for action in bot.actions} >= unbound_tags - busy_tags
+
+    # A mined out refinery releases its workers
+    refinery_workers = {tag for tag, resource_tag in manager.bindings.items() if resource_tag == 100}
+    frames.raw_unit(100).vespene_contents = 0
+    frames.next_frame()
+    manager.update()
+    assert not refinery_workers & set(manager.bindings)
+    assert 100 not in manager.assigned
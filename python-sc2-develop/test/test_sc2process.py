@@ -0,0 +1,62 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_sc2process.py
+"""
+import asyncio
+from test.fake_sc2_server import FakePopen
+
+import portpicker
+import pytest
+from aiohttp import web
+
+from sc2.sc2process import SC2Process
+
+
+async def websocket_handler(request):
+    ws = web.WebSocketResponse()
+    await ws.prepare(request)
+    await ws.close()
+    return ws
+
+
+async def start_server_later(port: int, delay: float) -> web.AppRunner:
+    await asyncio.sleep(delay)
+    app = web.Application()
+    app.router.add_get("/sc2api", websocket_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def test_connect_with_backoff(monkeypatch):
+    monkeypatch.setattr(SC2Process, "_launch", lambda self: FakePopen())
+
+    async def run():
+        port = portpicker.pick_unused_port()
+        server_task = asyncio.create_task(start_server_later(port, 0.5))
+        process = SC2Process(host="127.0.0.1", port=port)
+        async with process:
+            runner = await server_task
+        await runner.cleanup()
+        # Connected soon after the server became ready, the bounds leave room for slow machines
+        assert 0.5 <= process.startup_time < 5
+
+    asyncio.run(run())
+
+
+def test_connect_process_exited(monkeypatch):
+    returncodes = [1, None]
+    monkeypatch.setattr(SC2Process, "_launch", lambda self: FakePopen(returncodes.pop(0)))
+    # Gives up after 0.3 seconds instead of waiting for a slow SC2 to start
+    monkeypatch.setattr("sc2.sc2process.SC2Process._connect.__defaults__", (0.3, 0.1))
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            async with SC2Process(host="127.0.0.1", port=portpicker.pick_unused_port()):
+                pass
+        with pytest.raises(TimeoutError):
+            async with SC2Process(host="127.0.0.1", port=portpicker.pick_unused_port()):
+                pass
+
+    asyncio.run(run())
@@ -0,0 +1,80 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_scheduler.py
+"""
+import asyncio
+import time
+from pathlib import Path
+from test.test_observation_recorder import RecordedBot, record_game
+from typing import List
+
+from sc2.main import run_recorded
+from sc2.scheduler import StepScheduler
+
+
+def test_step_scheduler_frequency():
+    scheduler = StepScheduler(budget=1)
+    calls: List[str] = []
+
+    async def micro():
+        calls.append("micro")
+
+    scheduler.add("micro", micro, priority=10)
+    scheduler.add("macro", lambda: calls.append("macro"), priority=5, frequency=8)
+    scheduler.add("sync", lambda: calls.append("sync"), frequency=25)
+    assert len(scheduler) == 3
+
+    ran = {game_loop: asyncio.run(scheduler.run(game_loop)) for game_loop in range(0, 40, 4)}
+    assert ran[0] == ["micro", "macro", "sync"]
+    assert ran[4] == ["micro"]
+    assert ran[8] == ["micro", "macro"]
+    assert ran[24] == ["micro", "macro"]
+    # The sync task is due at game loop 25, it runs at the next step
+    assert ran[28] == ["micro", "sync"]
+    assert calls.count("micro") == 10
+    assert scheduler.tasks["micro"].runs == 10
+
+    scheduler.remove("micro")
+    assert asyncio.run(scheduler.run(100)) == ["macro", "sync"]
+
+
+def test_step_scheduler_budget():
+    scheduler = StepScheduler(budget=0.01)
+    scheduler.add("micro", lambda: None, priority=10, max_deferral=0)
+    scheduler.add("macro", lambda: None, priority=5, max_deferral=2)
+    scheduler.add("expensive", lambda: time.sleep(0.02), priority=1, max_deferral=2)
+
+    # The budget is used up by on_step, only tasks that can not be deferred run
+    over_budget = time.perf_counter() - 1
+    assert asyncio.run(scheduler.run(0, over_budget)) == ["micro"]
+    assert scheduler.tasks["macro"].deferred == 1
+    assert asyncio.run(scheduler.run(1, over_budget)) == ["micro"]
+    # Tasks that were deferred too often run even if the budget is used up
+    assert asyncio.run(scheduler.run(2, over_budget)) == ["micro", "macro", "expensive"]
+    assert scheduler.tasks["macro"].deferred == 0
+
+    # With time left, the expensive task uses up the budget and the next due task is deferred
+    scheduler.add("late", lambda: None, priority=0)
+    assert asyncio.run(scheduler.run(3)) == ["micro", "macro", "expensive"]
+    assert scheduler.tasks["late"].deferred == 1
+    assert scheduler.tasks["expensive"].average_time >= 0.02
+
+
+def test_step_scheduler_aging():
+    scheduler = StepScheduler(budget=0.01, aging=2)
+    scheduler.add("low", lambda: time.sleep(0.02), priority=0, max_deferral=100)
+    scheduler.add("high", lambda: time.sleep(0.02), priority=3, max_deferral=100)
+    order = [asyncio.run(scheduler.run(game_loop)) for game_loop in range(4)]
+    # The low priority task is deferred twice, then its aged priority is higher
+    assert order == [["high"], ["high"], ["low"], ["high"]]
+
+
+def test_step_scheduler_bot(tmp_path: Path):
+    recording = tmp_path / "game.sc2obs"
+    record_game(recording, 5)
+    bot = RecordedBot()
+    bot.scheduler = StepScheduler(budget=1)
+    game_loops: List[int] = []
+    bot.scheduler.add("macro", lambda: game_loops.append(bot.state.game_loop), frequency=8)
+    run_recorded(bot, recording)
+    assert game_loops == [0, 8, 16]
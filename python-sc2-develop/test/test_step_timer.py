@@ -0,0 +1,75 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_step_timer.py
+"""
+import asyncio
+import json
+from pathlib import Path
+from test.test_observation_recorder import RecordedBot, record_game
+from test.test_protocol import FakeWebSocket
+
+import pytest
+
+from sc2.main import run_recorded
+from sc2.protocol import Protocol
+from sc2.step_timer import StepTimer
+
+
+def test_step_timer(tmp_path: Path):
+    path = tmp_path / "timings.csv"
+    timer = StepTimer(window=3, sink=path)
+    for game_loop, duration in enumerate([0.001, 0.002, 0.003, 0.004]):
+        timer.add("on_step", duration)
+        with timer.measure("events"):
+            pass
+        # Phases that are measured multiple times in a step are summed up
+        timer.add("request_query", duration)
+        timer.add("request_query", duration)
+        timer.end_step(game_loop)
+    timer.close()
+
+    assert set(timer.phases) == {"on_step", "events", "request_query"}
+    # Only the last 3 steps are kept
+    stats = timer.stats("on_step")
+    assert stats["count"] == 3
+    assert stats["min"] == pytest.approx(2)
+    assert stats["max"] == pytest.approx(4)
+    assert stats["mean"] == pytest.approx(3)
+    assert timer.stats("request_query")["max"] == pytest.approx(8)
+    counts, edges = timer.histogram("on_step", bins=2)
+    assert counts.sum() == 3
+    assert edges[0] == pytest.approx(2)
+    assert list(timer.summary())[0] == "request_query"
+    assert timer.stats("unknown") == {}
+
+    lines = path.read_text().splitlines()
+    assert lines[0] == "game_loop,phase,duration_ms"
+    assert len(lines) == 1 + 4 * 3
+    assert lines[1] == "0,on_step,1.0000"
+
+
+def test_step_timer_protocol():
+
+    async def run():
+        protocol = Protocol(FakeWebSocket(latency=0.01))
+        protocol.step_timer = StepTimer()
+        await protocol.ping()
+        protocol.step_timer.end_step(0)
+        assert protocol.step_timer.stats("request_ping")["min"] >= 10
+        assert protocol.step_timer.stats("parse_ping")
+
+    asyncio.run(run())
+
+
+def test_step_timer_run_recorded(tmp_path: Path):
+    recording = tmp_path / "game.sc2obs"
+    record_game(recording, 5)
+    bot = RecordedBot()
+    bot.step_timer = StepTimer(sink=tmp_path / "timings.jsonl")
+    run_recorded(bot, recording)
+
+    for phase in ["prepare_step", "prepare_units", "issue_events", "on_step", "combine_actions", "after_step"]:
+        assert bot.step_timer.stats(phase)["count"] == 5
+    rows = [json.loads(line) for line in (tmp_path / "timings.jsonl").read_text().splitlines()]
+    assert [row["game_loop"] for row in rows] == [0, 4, 8, 12, 16]
+    assert all(row["on_step"] >= 0 for row in rows)
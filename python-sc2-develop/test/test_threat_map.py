@@ -0,0 +1,68 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_threat_map.py
+"""
+import random
+from test.test_pickled_data import MAPS, get_map_specific_bot
+from typing import List, Tuple
+
+import pytest
+
+from s2clientprotocol import common_pb2 as common_pb
+from s2clientprotocol import raw_pb2 as raw_pb
+
+from sc2.bot_ai import BotAI
+from sc2.ids.unit_typeid import UnitTypeId
+from sc2.position import Point2
+from sc2.threat_map import ThreatMap
+from sc2.unit import Unit
+
+
+def create_enemy_units(bot: BotAI, units: List[Tuple[UnitTypeId, float, float]]) -> List[Unit]:
+    return [
+        Unit(
+            raw_pb.Unit(
+                tag=tag,
+                unit_type=unit_type.value,
+                alliance=raw_pb.Enemy,
+                pos=common_pb.Point(x=x, y=y, z=10),
+                radius=0.5,
+                build_progress=1,
+            ),
+            bot,
+        ) for tag, (unit_type, x, y) in enumerate(units, start=1)
+    ]
+
+
+def test_threat_map():
+    bot: BotAI = get_map_specific_bot(random.choice(MAPS))
+    threat_map = ThreatMap(bot.game_info)
+    center = bot.game_info.map_center.rounded
+    marine, = create_enemy_units(bot, [(UnitTypeId.MARINE, center.x + 0.5, center.y + 0.5)])
+
+    threat_map.update([marine])
+    assert threat_map.threat_at(center) == pytest.approx(marine.ground_dps, abs=1e-3)
+    assert threat_map.threat_at(center, air=True) == pytest.approx(marine.air_dps, abs=1e-3)
+    assert threat_map.threat_at(center.offset((marine.ground_range + 3, 0))) == 0
+    assert threat_map.ground_grid.shape == bot.game_info.pathing_grid.data_numpy.shape
+    assert threat_map.threat_along_path([center.offset((-20, 0)), center.offset((20, 0))]) > 0
+    assert threat_map.threat_along_path([center.offset((-20, 20)), center.offset((20, 20))]) == 0
+
+    # Safest point is outside of the marine range
+    safe_point: Point2 = threat_map.safest_point_near(center, 10, air=True)
+    assert threat_map.threat_at(safe_point, air=True) == 0
+    assert safe_point.distance_to(center) > marine.air_range
+
+    # Moving the marine removes the old stamp
+    moved_marine, = create_enemy_units(bot, [(UnitTypeId.MARINE, center.x + 15.5, center.y + 0.5)])
+    threat_map.update([moved_marine])
+    assert threat_map.threat_at(center) == 0
+    assert threat_map.threat_at(center.offset((15, 0))) == pytest.approx(marine.ground_dps, abs=1e-3)
+
+    # Stamps of multiple units add up and missing units are removed
+    units = create_enemy_units(bot, [(UnitTypeId.MARINE, center.x + 0.5, center.y + 0.5)] * 3)
+    threat_map.update(units)
+    assert threat_map.threat_at(center) == pytest.approx(3 * marine.ground_dps, abs=1e-2)
+    threat_map.update([])
+    assert not threat_map.ground_grid.any()
+    assert not threat_map.air_grid.any()
@@ -0,0 +1,126 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_tournament.py
+"""
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from sc2 import tournament, worker_pool
+from sc2.data import Difficulty, Race, Result
+from sc2.main import GameMatch
+from sc2.maps import Map
+from sc2.player import Bot, Computer
+from sc2.sc2process import kill_switch
+
+# Created by the first worker that crashes on purpose, so that the retry succeeds
+CRASH_MARKER: Path = None
+# Process ids of all started fake SC2 instances
+SC2_PIDS: Path = None
+
+
+class FakeSC2Process:
+    """ Stands in for SC2Process in the kill_switch, the worker pool has to stop it if its worker dies. """
+
+    def __init__(self):
+        self.process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        with open(SC2_PIDS, "a") as f:
+            f.write(f"{self.process.pid}\n")
+
+    @property
+    def pid(self):
+        return self.process.pid if self.process.poll() is None else None
+
+    def _clean(self, verbose=True):
+        self.process.kill()
+        self.process.wait()
+
+
+async def fake_maintain_SCII_count(count, controllers, proc_args=None):
+    while len(controllers) > count:
+        controllers.pop()._clean()
+    while len(controllers) < count:
+        process = FakeSC2Process()
+        kill_switch.add(process)
+        controllers.append(process)
+
+
+async def fake_run_match(controllers, match: GameMatch, close_ws=True):
+    if match.random_seed == 2:
+        raise RuntimeError("Game crashed")
+    if match.random_seed == 3 and not CRASH_MARKER.exists():
+        CRASH_MARKER.touch()
+        # Kills the worker process
+        os._exit(1)
+    bot, computer = match.players
+    return {bot: Result.Victory, computer: Result.Defeat}
+
+
+def is_running(pid: int) -> bool:
+    try:
+        state = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return False
+    return state not in {"Z", "X"}
+
+
+def run_tournament(tmp_path: Path, monkeypatch, max_attempts: int) -> Tuple[List[GameMatch], List[Optional[Dict]]]:
+    global CRASH_MARKER, SC2_PIDS
+    CRASH_MARKER = tmp_path / "crashed"
+    SC2_PIDS = tmp_path / "sc2_pids"
+    SC2_PIDS.touch()
+    monkeypatch.setattr(worker_pool, "maintain_SCII_count", fake_maintain_SCII_count)
+    monkeypatch.setattr(tournament, "run_match", fake_run_match)
+    matches = [
+        GameMatch(
+            Map(Path("Test.SC2Map")),
+            [Bot(Race.Zerg, None, name="bot"), Computer(Race.Terran, Difficulty.Easy)],
+            random_seed=seed,
+        ) for seed in range(5)
+    ]
+    results = tournament.run_tournament(
+        matches, processes=2, summary_path=tmp_path / "summary.json", max_attempts=max_attempts
+    )
+
+    assert CRASH_MARKER.exists()
+    assert len(results) == 5
+    assert results[2] is None
+    for index in [0, 1, 4]:
+        assert results[index] == {matches[index].players[0]: Result.Victory, matches[index].players[1]: Result.Defeat}
+    # Including the instance of the worker that died
+    pids = [int(pid) for pid in SC2_PIDS.read_text().split()]
+    assert pids
+    assert not any(is_running(pid) for pid in pids)
+    return matches, results
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Patches are only inherited by forked workers")
+def test_run_tournament(tmp_path: Path, monkeypatch):
+    matches, results = run_tournament(tmp_path, monkeypatch, max_attempts=2)
+    assert results[3] == {matches[3].players[0]: Result.Victory, matches[3].players[1]: Result.Defeat}
+
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["matches"] == 5
+    assert summary["errors"] == 1
+    assert summary["players"]["bot"] == {"Victory": 4, "Error": 1}
+    assert [game["index"] for game in summary["games"]] == [0, 1, 2, 3, 4]
+    assert "Game crashed" in summary["games"][2]["error"]
+    assert summary["games"][0]["results"] == ["Victory", "Defeat"]
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="Patches are only inherited by forked workers")
+def test_run_tournament_charges_crash_to_its_match(tmp_path: Path, monkeypatch):
+    # The matches that were interrupted on the other worker are restarted without counting as attempt
+    _matches, results = run_tournament(tmp_path, monkeypatch, max_attempts=1)
+    assert results[3] is None
+
+    summary = json.loads((tmp_path / "summary.json").read_text())
+    assert summary["errors"] == 2
+    assert summary["players"]["bot"] == {"Victory": 3, "Error": 2}
+    assert "BrokenProcessPool" in summary["games"][3]["error"]
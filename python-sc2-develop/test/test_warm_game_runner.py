@@ -0,0 +1,87 @@
+"""
+You can execute this test running the following command from the root python-sc2 folder:
+poetry run pytest test/test_warm_game_runner.py
+"""
+import asyncio
+import os
+from test.fake_sc2_server import FakePopen, FakeSC2Process, FakeSC2Server
+from test.test_pickled_data import MAPS
+
+from s2clientprotocol import sc2api_pb2 as sc_pb
+
+from sc2 import main
+from sc2.main import WarmGameRunner, maintain_SCII_count
+from sc2.sc2process import kill_switch
+
+
+class CrashingSC2Process(FakeSC2Process):
+    """ Exits during startup. """
+
+    def _launch(self) -> FakePopen:
+        return FakePopen(returncode=1)
+
+
+def test_maintain_SCII_count_replaces_stuck_processes():
+
+    async def run():
+        # The stuck server does not answer within the ping timeout
+        async with FakeSC2Server(MAPS[0], latency=0.01) as server, FakeSC2Server(MAPS[0], latency=60) as stuck_server:
+            healthy = await FakeSC2Process(server).__aenter__()
+            stuck = await FakeSC2Process(stuck_server).__aenter__()
+            controllers = [healthy, stuck]
+            await asyncio.wait_for(maintain_SCII_count(1, controllers, ping_timeout=0.2), timeout=5)
+            assert controllers == [healthy]
+            assert not stuck.running
+            assert healthy.running
+            await maintain_SCII_count(0, controllers)
+            assert not healthy.running
+
+    asyncio.run(run())
+
+
+def test_maintain_SCII_count_retries_failed_launches(monkeypatch):
+    processes = []
+
+    def create_process(**_proc_args):
+        # The second process fails its first attempt
+        process_type = CrashingSC2Process if len(processes) == 1 else FakeSC2Process
+        process = process_type(FakeSC2Server(MAPS[0]), start_server=True)
+        processes.append(process)
+        return process
+
+    monkeypatch.setattr(main, "SC2Process", create_process)
+
+    async def run():
+        controllers = []
+        await maintain_SCII_count(3, controllers)
+        assert len(controllers) == 3
+        # Only the failed slot was started again, by a new process with its own temporary folder
+        assert len(processes) == 4
+        crashed = processes[1]
+        assert crashed not in [controller._process for controller in controllers]
+        assert not os.path.exists(crashed._tmp_dir)
+        assert crashed not in kill_switch._to_kill
+        assert all(os.path.exists(controller._process._tmp_dir) for controller in controllers)
+        assert all(controller.running for controller in controllers)
+        await maintain_SCII_count(0, controllers)
+        assert not any(process.server.running for process in processes)
+
+    asyncio.run(run())
+
+
+def test_warm_game_runner_leaves_games():
+
+    async def run():
+        async with FakeSC2Server(MAPS[0]) as server:
+            runner = WarmGameRunner(ping_timeout=1)
+            controller = await FakeSC2Process(server).__aenter__()
+            runner.controllers.append(controller)
+            server.status = sc_pb.in_game
+            await runner._leave_games()
+            assert server.requests == {"ping": 1, "leave_game": 1}
+            assert server.status == sc_pb.launched
+            await runner.close()
+            assert not runner.controllers
+            assert not controller.running
+
+    asyncio.run(run())